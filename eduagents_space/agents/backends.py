@@ -0,0 +1,356 @@
+# agents/backends.py
+"""
+Pluggable model backends for LLMAgent.
+
+A backend is async: complete() returns the whole completion, stream() yields
+tokens as they arrive. All I/O runs on one event loop owned by the backend
+(started lazily in a daemon thread), so pooled connections are reused no
+matter which thread or loop the caller is on:
+
+    backend = HTTPBackend("http://127.0.0.1:8808")
+    agent = LLMAgent(mock=False, backend=backend)
+    agent.generate("Explain fractions")            # sync callers
+    await agent.agenerate("Explain fractions")     # async callers
+
+HTTPBackend speaks a small JSON protocol (see stub_llm_server.py):
+    POST /v1/completions {"prompt", "max_tokens", "context", "stream"}
+    -> {"text": ...}, or a chunked stream of {"token": ...} lines
+"""
+import asyncio
+import json
+import random
+import threading
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Awaitable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+class BackendError(RuntimeError):
+    pass
+
+
+class _RetryableError(BackendError):
+    pass
+
+
+class LLMBackend:
+    """
+    Base class. Subclasses implement complete() and optionally stream().
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+
+    async def complete(self, prompt: str, max_tokens: int = 200, context: Optional[Dict[str, Any]] = None) -> str:
+        raise NotImplementedError
+
+    async def stream(
+        self, prompt: str, max_tokens: int = 200, context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        # Default: one chunk with the full completion
+        yield await self.complete(prompt, max_tokens, context)
+
+    async def aclose(self) -> None:
+        pass
+
+    # -------------------------------------------------------------------------
+    # LOOP BRIDGING
+    # -------------------------------------------------------------------------
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="llm-backend", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def submit(self, coro: Awaitable) -> Future:
+        """
+        Schedules a coroutine on the backend loop and returns a concurrent Future.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def complete_sync(self, prompt: str, max_tokens: int = 200, context: Optional[Dict[str, Any]] = None) -> str:
+        return self.submit(self.complete(prompt, max_tokens, context)).result()
+
+    async def acomplete(self, prompt: str, max_tokens: int = 200, context: Optional[Dict[str, Any]] = None) -> str:
+        """
+        complete() for callers running on a different event loop.
+        """
+        return await asyncio.wrap_future(self.submit(self.complete(prompt, max_tokens, context)))
+
+    async def astream(
+        self, prompt: str, max_tokens: int = 200, context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        stream() for callers running on a different event loop.
+        """
+        caller = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        async def pump():
+            try:
+                async for token in self.stream(prompt, max_tokens, context):
+                    caller.call_soon_threadsafe(queue.put_nowait, token)
+                caller.call_soon_threadsafe(queue.put_nowait, done)
+            except BaseException as exc:  # forwarded to the consumer below
+                caller.call_soon_threadsafe(queue.put_nowait, exc)
+
+        self.submit(pump())
+        while True:
+            item = await queue.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+    def close(self) -> None:
+        """
+        Closes the backend and stops its loop thread. The next call starts a new one.
+        """
+        with self._loop_lock:
+            loop, thread = self._loop, self._thread
+            if loop is None:
+                return
+            self._loop = self._thread = None
+        try:
+            asyncio.run_coroutine_threadsafe(self.aclose(), loop).result()
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+
+# -------------------------------------------------------------------------
+# HTTP BACKEND
+# -------------------------------------------------------------------------
+class _ConnectionPool:
+    """
+    Keep-alive HTTP/1.1 connections to one host, bounded by max_connections.
+    """
+
+    def __init__(self, host: str, port: int, max_connections: int, ssl=None):
+        self.host = host
+        self.port = port
+        self.ssl = ssl
+        self._idle: asyncio.LifoQueue = asyncio.LifoQueue()
+        self._slots = asyncio.Semaphore(max_connections)
+
+    async def acquire(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        await self._slots.acquire()
+        try:
+            while not self._idle.empty():
+                reader, writer = self._idle.get_nowait()
+                if not writer.is_closing() and not reader.at_eof():
+                    return reader, writer
+                writer.close()
+            return await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, conn: Tuple[asyncio.StreamReader, asyncio.StreamWriter], reuse: bool) -> None:
+        if reuse:
+            self._idle.put_nowait(conn)
+        else:
+            conn[1].close()
+        self._slots.release()
+
+    async def close(self) -> None:
+        while not self._idle.empty():
+            _, writer = self._idle.get_nowait()
+            writer.close()
+
+
+class HTTPBackend(LLMBackend):
+    """
+    JSON-over-HTTP model backend with pooled keep-alive connections.
+    base_url is http:// or https:// (TLS with the default certificate checks).
+
+    timeout:         seconds per attempt (per chunk when streaming)
+    retries:         extra attempts on connection errors, timeouts, 429 and 5xx
+    backoff:         base delay for exponential backoff with jitter
+    max_connections: size of the connection pool
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 30.0,
+        retries: int = 2,
+        backoff: float = 0.2,
+        max_connections: int = 32,
+        path: str = "/v1/completions"
+    ):
+        super().__init__()
+        url = urlsplit(base_url)
+        if url.scheme not in ("http", "https"):
+            raise ValueError(f"unsupported URL scheme in {base_url!r}; use http:// or https://")
+        self.tls = url.scheme == "https"
+        self.host = url.hostname or "127.0.0.1"
+        self.port = url.port or (443 if self.tls else 80)
+        self.path = path
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_connections = max_connections
+        self._pool: Optional[_ConnectionPool] = None
+
+    @property
+    def pool(self) -> _ConnectionPool:
+        # Created lazily so it binds to the backend loop
+        if self._pool is None:
+            context = None
+            if self.tls:
+                import ssl  # only https backends pay for it
+                context = ssl.create_default_context()
+            self._pool = _ConnectionPool(self.host, self.port, self.max_connections, context)
+        return self._pool
+
+    async def complete(self, prompt: str, max_tokens: int = 200, context: Optional[Dict[str, Any]] = None) -> str:
+        body = self._body(prompt, max_tokens, context, stream=False)
+        for attempt in range(self.retries + 1):
+            try:
+                payload = await asyncio.wait_for(self._post(body), self.timeout)
+                return self._field(payload, "text")
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, _RetryableError) as exc:
+                if attempt == self.retries:
+                    raise BackendError(f"completion failed after {attempt + 1} attempts: {exc!r}") from exc
+                await asyncio.sleep(self._delay(attempt))
+
+    async def stream(
+        self, prompt: str, max_tokens: int = 200, context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        body = self._body(prompt, max_tokens, context, stream=True)
+        for attempt in range(self.retries + 1):
+            sent_any = False
+            try:
+                async for line in self._post_stream(body):
+                    sent_any = True
+                    yield self._field(line, "token")
+                return
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, _RetryableError) as exc:
+                # Tokens already handed out can't be taken back, so only retry clean failures
+                if sent_any or attempt == self.retries:
+                    raise BackendError(f"stream failed after {attempt + 1} attempts: {exc!r}") from exc
+                await asyncio.sleep(self._delay(attempt))
+
+    async def aclose(self) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            # The next request builds a new pool bound to whichever loop runs it
+            await pool.close()
+
+    # -------------------------------------------------------------------------
+    # HTTP/1.1 PLUMBING
+    # -------------------------------------------------------------------------
+    def _body(self, prompt: str, max_tokens: int, context: Optional[Dict[str, Any]], stream: bool) -> bytes:
+        # Only JSON-friendly context fields go over the wire
+        ctx = {k: v for k, v in (context or {}).items() if isinstance(v, (str, int, float, bool, type(None)))}
+        return json.dumps({"prompt": prompt, "max_tokens": max_tokens, "context": ctx, "stream": stream}).encode()
+
+    def _delay(self, attempt: int) -> float:
+        return self.backoff * (2 ** attempt) * (0.5 + random.random())
+
+    async def _send(self, conn, body: bytes) -> Dict[str, str]:
+        reader, writer = conn
+        writer.write(
+            f"POST {self.path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: keep-alive\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+
+        status_line = await reader.readuntil(b"\r\n")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        headers[":status"] = str(status)
+        return headers
+
+    async def _read_body(self, reader: asyncio.StreamReader, headers: Dict[str, str]) -> bytes:
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            parts = []
+            async for chunk in self._iter_chunks(reader):
+                parts.append(chunk)
+            return b"".join(parts)
+        return await reader.readexactly(int(headers.get("content-length", 0)))
+
+    async def _iter_chunks(self, reader: asyncio.StreamReader) -> AsyncIterator[bytes]:
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            if size == 0:
+                await reader.readuntil(b"\r\n")
+                return
+            chunk = await reader.readexactly(size)
+            await reader.readexactly(2)
+            yield chunk
+
+    async def _post(self, body: bytes) -> bytes:
+        conn = await self.pool.acquire()
+        reuse = False
+        try:
+            headers = await self._send(conn, body)
+            payload = await self._read_body(conn[0], headers)
+            reuse = headers.get("connection", "").lower() != "close"
+        finally:
+            self.pool.release(conn, reuse)
+        self._check_status(int(headers[":status"]), payload)
+        return payload
+
+    async def _post_stream(self, body: bytes) -> AsyncIterator[bytes]:
+        conn = await self.pool.acquire()
+        reuse = False
+        try:
+            headers = await asyncio.wait_for(self._send(conn, body), self.timeout)
+            status = int(headers[":status"])
+            if status != 200:
+                payload = await self._read_body(conn[0], headers)
+                reuse = True
+                self._check_status(status, payload)
+
+            buffer = b""
+            chunks = self._iter_chunks(conn[0]).__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), self.timeout)
+                except StopAsyncIteration:
+                    break
+                buffer += chunk
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    if line.strip():
+                        yield line
+            if buffer.strip():
+                yield buffer
+            reuse = headers.get("connection", "").lower() != "close"
+        finally:
+            self.pool.release(conn, reuse)
+
+    @staticmethod
+    def _field(payload: bytes, name: str) -> str:
+        # A 200 with a body we can't read is a backend failure like any other
+        try:
+            value = json.loads(payload)[name]
+        except (ValueError, KeyError, TypeError) as exc:
+            raise BackendError(f"malformed response: {payload[:200]!r}") from exc
+        if not isinstance(value, str):
+            raise BackendError(f"malformed response: {payload[:200]!r}")
+        return value
+
+    @staticmethod
+    def _check_status(status: int, payload: bytes) -> None:
+        if status == 429 or status >= 500:
+            raise _RetryableError(f"HTTP {status}: {payload[:200]!r}")
+        if status != 200:
+            raise BackendError(f"HTTP {status}: {payload[:200]!r}")
@@ -0,0 +1,275 @@
+# agents/batch_pipeline.py
+"""
+Offline recommendation pipeline.
+
+Streams a full session log into mastery aggregates, then generates top-k
+recommendations for every student_id on a process pool. Students are split
+into fixed-size shards; each shard is written to its own part file in the
+output directory (JSONL, or Parquet when pyarrow is installed) through a
+temp file + rename, so an interrupted run picks up at the first missing part.
+
+    python -m agents.batch_pipeline student_sessions.csv out/ --workers 8 --top-k 5
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from agents.ingest import ingest_sessions
+
+MANIFEST = "_manifest.json"
+
+# Per-worker state, built once by _init_worker
+_worker: Dict[str, Any] = {}
+
+
+class PipelineStats:
+    def __init__(self, students: int, shards: int):
+        self.students = students
+        self.shards = shards
+        self.done_students = 0
+        self.done_shards = 0
+        self.skipped_shards = 0
+        self.seconds = 0.0
+
+    @property
+    def students_per_sec(self) -> float:
+        return self.done_students / self.seconds if self.seconds else 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"PipelineStats(shards={self.done_shards}/{self.shards}, skipped={self.skipped_shards}, "
+            f"students={self.done_students}/{self.students}, students_per_sec={self.students_per_sec:,.0f})"
+        )
+
+
+# -------------------------------------------------------------------------
+# WORKER
+# -------------------------------------------------------------------------
+def _init_worker(options: Dict[str, Any]) -> None:
+    from agents.llm_agent import LLMAgent
+    from agents.recommend_agent import RecommendationAgent
+
+    _worker["options"] = options
+    _worker["llm"] = LLMAgent(mock=True, max_sessions=1)
+    _worker["recommender"] = RecommendationAgent()
+
+
+def recommend_students(
+    students: List[Tuple[str, Dict[str, float]]],
+    recommender,
+    llm_agent,
+    top_k: int = 5,
+    subject_filter: Optional[str] = None,
+    difficulty_filter: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    One record {"student_id", "recommendations"} per (student_id, estimates).
+    """
+    from agents.given_problems import GivenProblems
+
+    rows = []
+    for student_id, estimates in students:
+        recs = recommender.generate_recommendations(
+            history=[],
+            skill_estimates=estimates,
+            llm_agent=llm_agent,
+            top_k=top_k,
+            subject_filter=subject_filter,
+            difficulty_filter=difficulty_filter,
+            context={"given_problems": GivenProblems()},
+        )
+        rows.append({"student_id": student_id, "recommendations": recs})
+    return rows
+
+
+def _write_part(path: str, rows: List[Dict[str, Any]], fmt: str) -> None:
+    tmp = path + ".tmp"
+    if fmt == "parquet":
+        import pyarrow as pa  # optional dependency, only needed for Parquet output
+        import pyarrow.parquet as pq
+
+        flat = [
+            {"student_id": row["student_id"], "rank": rank, **rec}
+            for row in rows
+            for rank, rec in enumerate(row["recommendations"])
+        ]
+        pq.write_table(pa.Table.from_pylist(flat), tmp)
+    else:
+        with open(tmp, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    os.replace(tmp, path)
+
+
+def _run_shard(path: str, students: List[Tuple[str, Dict[str, float]]]) -> int:
+    opts = _worker["options"]
+    rows = recommend_students(
+        students,
+        _worker["recommender"],
+        _worker["llm"],
+        top_k=opts["top_k"],
+        subject_filter=opts["subject_filter"],
+        difficulty_filter=opts["difficulty_filter"],
+    )
+    _write_part(path, rows, opts["format"])
+    return len(rows)
+
+
+# -------------------------------------------------------------------------
+# DRIVER
+# -------------------------------------------------------------------------
+def _part_path(out_dir: str, shard: int, fmt: str) -> str:
+    return os.path.join(out_dir, f"part-{shard:05d}.{'parquet' if fmt == 'parquet' else 'jsonl'}")
+
+
+def _log_stat(log_path: str) -> Dict[str, Any]:
+    st = os.stat(log_path)
+    return {"log_size": st.st_size, "log_mtime_ns": st.st_mtime_ns}
+
+
+def _check_manifest(out_dir: str, manifest: Dict[str, Any]) -> bool:
+    """
+    Raises if out_dir holds a run with other settings. Returns whether
+    out_dir has a manifest yet (see _write_manifest).
+    """
+    path = os.path.join(out_dir, MANIFEST)
+    if not os.path.exists(path):
+        return False
+    with open(path, encoding="utf-8") as f:
+        previous = json.load(f)
+    if previous != manifest:
+        raise ValueError(
+            f"{out_dir} holds a run with different settings ({previous}); use a new output directory"
+        )
+    return True
+
+
+def _write_manifest(out_dir: str, manifest: Dict[str, Any]) -> None:
+    with open(os.path.join(out_dir, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def _report(stats: PipelineStats, start: float, progress) -> None:
+    stats.seconds = time.perf_counter() - start
+    if progress is not None:
+        progress(stats)
+
+
+def _collect(done, stats: PipelineStats, start: float, progress) -> None:
+    for fut in done:
+        stats.done_students += fut.result()
+        stats.done_shards += 1
+    _report(stats, start, progress)
+
+
+def run_pipeline(
+    log_path: str,
+    out_dir: str,
+    top_k: int = 5,
+    subject_filter: Optional[str] = None,
+    difficulty_filter: Optional[str] = None,
+    workers: Optional[int] = None,
+    shard_size: int = 2_000,
+    fmt: str = "jsonl",
+    chunksize: int = 250_000,
+    progress: Optional[Callable[[PipelineStats], None]] = None
+) -> PipelineStats:
+    """
+    Computes mastery for every student in log_path and writes their top_k
+    recommendations under out_dir. Re-running with the same arguments on
+    the same, unchanged log skips the part files that already exist.
+    """
+    if fmt not in ("jsonl", "parquet"):
+        raise ValueError(f"unknown output format {fmt!r}")
+    os.makedirs(out_dir, exist_ok=True)
+    options = {
+        "top_k": top_k,
+        "subject_filter": subject_filter,
+        "difficulty_filter": difficulty_filter,
+        "format": fmt,
+    }
+    # Size and mtime identify the log's contents: a log that grew or was
+    # rewritten in place shards differently, so its old parts can't be reused
+    log_stat = _log_stat(log_path)
+    manifest = {"log": os.path.abspath(log_path), **log_stat, "shard_size": shard_size, **options}
+    resuming = _check_manifest(out_dir, manifest)
+    store, _ = ingest_sessions(log_path, chunksize=chunksize)
+    if _log_stat(log_path) != log_stat:
+        raise ValueError(f"{log_path} changed while it was being read; run again")
+    # Only a log that was read whole is recorded, so the rerun above can start fresh
+    if not resuming:
+        _write_manifest(out_dir, manifest)
+    students = sorted(store.students())
+    shards = [students[i:i + shard_size] for i in range(0, len(students), shard_size)]
+
+    stats = PipelineStats(len(students), len(shards))
+    start = time.perf_counter()
+
+    def pending() -> Iterator[Tuple[str, List[Tuple[str, Dict[str, float]]]]]:
+        for shard, ids in enumerate(shards):
+            path = _part_path(out_dir, shard, fmt)
+            if os.path.exists(path):
+                stats.skipped_shards += 1
+                stats.done_shards += 1
+                stats.done_students += len(ids)
+                _report(stats, start, progress)
+                continue
+            # Estimates are materialized per shard, only while it is in flight
+            yield path, [(sid, store.snapshot(sid)) for sid in ids]
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(options,)) as pool:
+        in_flight = set()
+        for path, batch in pending():
+            in_flight.add(pool.submit(_run_shard, path, batch))
+            if len(in_flight) < 2 * workers:
+                continue
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            _collect(done, stats, start, progress)
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            _collect(done, stats, start, progress)
+
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute recommendations for every student in a session log.")
+    parser.add_argument("log")
+    parser.add_argument("out_dir")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--subject", default=None)
+    parser.add_argument("--difficulty", default=None)
+    parser.add_argument("--workers", type=int, default=None, help="default: all cores")
+    parser.add_argument("--shard-size", type=int, default=2_000)
+    parser.add_argument("--format", choices=("jsonl", "parquet"), default="jsonl")
+    parser.add_argument("--chunksize", type=int, default=250_000)
+    args = parser.parse_args()
+
+    def report(stats: PipelineStats):
+        print(
+            f"  {stats.done_shards:>6}/{stats.shards} shards  {stats.done_students:>10,} students"
+            f"  {stats.students_per_sec:>10,.0f} students/s"
+        )
+
+    stats = run_pipeline(
+        args.log,
+        args.out_dir,
+        top_k=args.top_k,
+        subject_filter=args.subject,
+        difficulty_filter=args.difficulty,
+        workers=args.workers,
+        shard_size=args.shard_size,
+        fmt=args.format,
+        chunksize=args.chunksize,
+        progress=report,
+    )
+    print(stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# agents/catalog.py
+"""
+Load-once content catalog.
+
+Explanations, recommendation samples and practice pools live in data files
+under agents/content/ (JSON, or YAML when PyYAML is installed). They are
+read once into normalized lookup indexes and the problem-bank index, and
+are swapped atomically when the files change on disk.
+
+    explanations.json   { topic: text }
+    skill_samples.json  { "samples": { key: [question, hint] }, "aliases": { skill: key } }
+    problem_pools.json  { "Subject|topic": [[question, hint], ...] }
+
+For many worker processes, compile them into one shared memory-mapped file
+with `python -m agents.packed_bank build` and set EDUAGENTS_CATALOG_PACK.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from agents.metrics import METRICS
+from agents.problem_bank import ProblemBank
+
+logger = logging.getLogger(__name__)
+
+CONTENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "content")
+CONTENT_FILES = ("explanations", "skill_samples", "problem_pools")
+
+
+def normalize(name: Optional[str]) -> str:
+    return " ".join((name or "").lower().replace("_", " ").split())
+
+
+def _read(path: str) -> Any:
+    if path.endswith((".yaml", ".yml")):
+        import yaml  # optional, only needed for YAML content files
+        with open(path, encoding="utf-8") as f:
+            return yaml.safe_load(f)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class _Content:
+    """
+    One immutable load of the content files plus its indexes.
+    """
+
+    def __init__(self, explanations: Dict[str, str], samples: Dict[str, Any], pools: Dict[str, List]):
+        self.explanations = {normalize(k): v for k, v in explanations.items()}
+
+        sample_map = samples.get("samples", samples)
+        # Substring keys in file order, matching the old `k in skill` scan
+        self.sample_keys: Tuple[Tuple[str, Tuple[str, str]], ...] = tuple(
+            (k.lower(), (v[0], v[1])) for k, v in sample_map.items()
+        )
+        by_key = dict(self.sample_keys)
+        self.aliases = {
+            normalize(skill): by_key[key.lower()]
+            for skill, key in samples.get("aliases", {}).items() if key.lower() in by_key
+        }
+
+        self.problem_pools = {k: [(q, h) for q, h in items] for k, items in pools.items()}
+        self.problem_bank = ProblemBank.from_pools(self.problem_pools)
+        self.sample_for = lru_cache(maxsize=4096)(self._sample_for)
+
+    def _sample_for(self, skill: str) -> Optional[Tuple[str, str]]:
+        for key, sample in self.sample_keys:
+            if key in skill:
+                return sample
+        return self.aliases.get(normalize(skill))
+
+
+class ContentCatalog:
+    """
+    Content loaded once from content_dir.
+
+    reload_interval: if set, accessors check file mtimes at most this often
+                     (seconds) and reload changed content without a restart.
+    """
+
+    def __init__(self, content_dir: str = CONTENT_DIR, reload_interval: Optional[float] = None):
+        self.content_dir = content_dir
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+        self._mtimes: Dict[str, float] = {}
+        self._failed_mtimes: Optional[Dict[str, float]] = None
+        # Bumped on every reload, so caches can tell content generations apart
+        self.version = 0
+        self._content: _Content = self._load()
+
+    # -------------------------------------------------------------------------
+    # LOADING
+    # -------------------------------------------------------------------------
+    def _path(self, name: str) -> str:
+        for ext in (".json", ".yaml", ".yml"):
+            path = os.path.join(self.content_dir, name + ext)
+            if os.path.exists(path):
+                return path
+        raise FileNotFoundError(f"no {name}.json/.yaml in {self.content_dir}")
+
+    def _stat(self) -> Dict[str, float]:
+        return {name: os.stat(self._path(name)).st_mtime for name in CONTENT_FILES}
+
+    def _load(self) -> _Content:
+        mtimes = self._stat()
+        data = {name: _read(self._path(name)) for name in CONTENT_FILES}
+        content = _Content(data["explanations"], data["skill_samples"], data["problem_pools"])
+        self._mtimes = mtimes
+        return content
+
+    def reload(self) -> None:
+        """
+        Re-reads all content files. Readers keep using the old content until
+        the new one is fully built; if loading fails it is kept and the error
+        is raised.
+        """
+        with self._lock:
+            self._content = self._load()
+            self.version += 1
+
+    def reload_if_changed(self) -> bool:
+        """
+        Reloads when a file changed. A file that is half-written or invalid
+        is logged and the last good content stays in use; its mtime is not
+        recorded, so the next check tries again.
+        """
+        with self._lock:
+            mtimes = None
+            try:
+                mtimes = self._stat()
+                if mtimes == self._mtimes:
+                    return False
+                content = self._load()
+            except Exception as e:
+                METRICS.inc("catalog_reload_errors_total")
+                if mtimes != self._failed_mtimes:
+                    logger.error("content reload from %s failed, keeping version %d: %s", self.content_dir, self.version, e)
+                    self._failed_mtimes = mtimes
+                return False
+            self._content = content
+            self._failed_mtimes = None
+            self.version += 1
+            return True
+
+    @property
+    def content(self) -> _Content:
+        if self.reload_interval is not None:
+            now = time.monotonic()
+            if now >= self._next_check:
+                self._next_check = now + self.reload_interval
+                self.reload_if_changed()
+        return self._content
+
+    # -------------------------------------------------------------------------
+    # LOOKUPS
+    # -------------------------------------------------------------------------
+    @property
+    def problem_bank(self) -> ProblemBank:
+        return self.content.problem_bank
+
+    def explanation(self, subject: Optional[str], topic: Optional[str]) -> Optional[str]:
+        return self.content.explanations.get(normalize(topic or subject))
+
+    def sample_for_skill(self, skill: str) -> Optional[Tuple[str, str]]:
+        return self.content.sample_for(skill.lower())
+
+
+@lru_cache(maxsize=1)
+def default_catalog() -> ContentCatalog:
+    """
+    The shared catalog: the memory-mapped pack named by EDUAGENTS_CATALOG_PACK
+    (see agents/packed_bank.py) when set, else the files in agents/content/.
+    """
+    pack = os.environ.get("EDUAGENTS_CATALOG_PACK")
+    if pack:
+        from agents.packed_bank import PackedCatalog
+        return PackedCatalog(pack)
+    return ContentCatalog()
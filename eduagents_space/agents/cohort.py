@@ -0,0 +1,440 @@
+# agents/cohort.py
+"""
+Cohort analytics: class-wide mastery views.
+
+Mastery for every student and skill lives in one float32 matrix
+(students × ALL_SKILLS, grown by doubling) next to a uint16 answer count
+per cell. Per-skill sums and a fine mastery histogram over the answered
+cells are updated together with the cells they cover, so distributions,
+percentiles, weak-skill heatmaps and the weakest skills by subject cost
+O(skills × bins) no matter how many students there are. Answer scores are
+also summed per time bucket for trends.
+
+Results are cached per data version and recomputed only after new answers
+arrive. Named groups (a class, a school) are computed from their rows.
+
+    cohort = CohortMatrix()
+    cohort.ingest(df)                                # session log, any size
+    cohort.record("s1", "algebra", 0.8, timestamp)   # one live answer
+    cohort.skill_distribution()                      # {skill: mean, std, percentiles, histogram}
+    cohort.weakest_skills("Mathematics", k=5)
+    cohort.trend(subject="Physics")
+"""
+import math
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from agents.recommend_agent import EASY_BELOW
+from agents.skill_agent import ALL_SKILLS, SKILL_CATALOG
+
+DAY = 86400
+
+# Resolution of the per-skill histograms that percentiles are read from
+FINE_BINS = 1000
+
+# Mastery below this gets "Easy" recommendations; reported as the weak share
+WEAK_BELOW = EASY_BELOW
+
+# Cell counts saturate here; the mean then moves like a very slow average
+MAX_COUNT = np.iinfo(np.uint16).max
+
+# Rows per pass when scanning the matrix (bounds temporary memory)
+CHUNK_ROWS = 1 << 16
+
+
+class CohortMatrix:
+    """
+    default_mastery: value of cells with no answers (not counted in the statistics)
+    bucket_seconds:  width of a trend bucket (a day by default)
+    """
+
+    def __init__(
+        self,
+        default_mastery: float = 0.65,
+        bucket_seconds: float = DAY,
+        capacity: int = 1024,
+        skills: Sequence[str] = ALL_SKILLS
+    ):
+        self.default_mastery = default_mastery
+        self.bucket_seconds = bucket_seconds
+        self.skills = tuple(skills)
+        self.column = {s: i for i, s in enumerate(self.skills)}
+
+        self.students: List[str] = []
+        self.rows: Dict[str, int] = {}
+        n_skills = len(self.skills)
+        self._mastery = np.full((capacity, n_skills), default_mastery, dtype=np.float32)
+        self._counts = np.zeros((capacity, n_skills), dtype=np.uint16)
+
+        # Running statistics over answered cells, per skill
+        self._n = np.zeros(n_skills, dtype=np.int64)
+        self._sum = np.zeros(n_skills)
+        self._sumsq = np.zeros(n_skills)
+        self._hist = np.zeros((n_skills, FINE_BINS), dtype=np.int64)
+
+        # { bucket: per-skill score sums / answer counts }
+        self._trend_sum: Dict[int, np.ndarray] = {}
+        self._trend_n: Dict[int, np.ndarray] = {}
+
+        self._groups: Dict[str, np.ndarray] = {}
+        self._cache: Dict[Tuple, Tuple[int, Any]] = {}
+        self.version = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.students)
+
+    @property
+    def mastery(self) -> np.ndarray:
+        """
+        students × skills float32 view (rows in self.students order).
+        """
+        return self._mastery[:len(self.students)]
+
+    @property
+    def counts(self) -> np.ndarray:
+        return self._counts[:len(self.students)]
+
+    # -------------------------------------------------------------------------
+    # ROWS
+    # -------------------------------------------------------------------------
+    def _rows_for(self, student_ids: Sequence[str]) -> np.ndarray:
+        """
+        Row of each student, adding rows for new ones.
+        """
+        rows = self.rows
+        out = [rows.get(sid) for sid in student_ids]
+        for i, row in enumerate(out):
+            if row is None:
+                sid = student_ids[i]
+                row = rows.get(sid)  # repeated new student
+                if row is None:
+                    row = rows[sid] = len(self.students)
+                    self.students.append(sid)
+                out[i] = row
+        self._reserve(len(self.students))
+        return np.array(out, dtype=np.int64)
+
+    def _reserve(self, n: int) -> None:
+        capacity = len(self._mastery)
+        if n <= capacity:
+            return
+        while capacity < n:
+            capacity *= 2
+        mastery = np.full((capacity, len(self.skills)), self.default_mastery, dtype=np.float32)
+        counts = np.zeros((capacity, len(self.skills)), dtype=np.uint16)
+        used = len(self._mastery)
+        mastery[:used] = self._mastery
+        counts[:used] = self._counts
+        self._mastery, self._counts = mastery, counts
+
+    def set_group(self, name: str, student_ids: Iterable[str]) -> None:
+        """
+        Names a subset of students (e.g. a class) for the group= queries.
+        """
+        with self._lock:
+            self._groups[name] = np.unique(self._rows_for(list(student_ids)))
+            self.version += 1
+
+    # -------------------------------------------------------------------------
+    # UPDATES
+    # -------------------------------------------------------------------------
+    def _stats_delta(self, cols: np.ndarray, values: np.ndarray, sign: int) -> None:
+        n_skills = len(self.skills)
+        self._n += sign * np.bincount(cols, minlength=n_skills)
+        self._sum += sign * np.bincount(cols, weights=values, minlength=n_skills)
+        self._sumsq += sign * np.bincount(cols, weights=values * values, minlength=n_skills)
+        bins = np.minimum((values * FINE_BINS).astype(np.int64), FINE_BINS - 1)
+        self._hist += sign * np.bincount(cols * FINE_BINS + bins, minlength=n_skills * FINE_BINS).reshape(n_skills, FINE_BINS)
+
+    def _cell_delta(self, col: int, value: float, sign: int) -> None:
+        self._n[col] += sign
+        self._sum[col] += sign * value
+        self._sumsq[col] += sign * value * value
+        self._hist[col, min(int(value * FINE_BINS), FINE_BINS - 1)] += sign
+
+    def _update_cells(self, rows: np.ndarray, cols: np.ndarray, sums: np.ndarray, counts: np.ndarray) -> None:
+        """
+        Folds answers into distinct (row, col) cells: sums of 0–1 scores and
+        answer counts per cell.
+        """
+        old_n = self._counts[rows, cols].astype(np.int64)
+        old_m = self._mastery[rows, cols].astype(np.float64)
+        seen = old_n > 0
+        self._stats_delta(cols[seen], old_m[seen], -1)
+
+        new_n = old_n + counts
+        new_m = np.clip((old_m * old_n + sums) / new_n, 0.0, 1.0)
+        self._mastery[rows, cols] = new_m
+        self._counts[rows, cols] = np.minimum(new_n, MAX_COUNT)
+        self._stats_delta(cols, self._mastery[rows, cols].astype(np.float64), 1)
+
+    def _add_trend(self, timestamps: np.ndarray, cols: np.ndarray, scores: np.ndarray) -> None:
+        valid = np.isfinite(timestamps)
+        if not valid.any():
+            return
+        buckets = np.floor(timestamps[valid] / self.bucket_seconds).astype(np.int64)
+        unique, inverse = np.unique(buckets, return_inverse=True)
+        n_skills = len(self.skills)
+        key = inverse * n_skills + cols[valid]
+        size = len(unique) * n_skills
+        sums = np.bincount(key, weights=scores[valid], minlength=size).reshape(len(unique), n_skills)
+        counts = np.bincount(key, minlength=size).reshape(len(unique), n_skills)
+        for i, bucket in enumerate(unique.tolist()):
+            if bucket in self._trend_sum:
+                self._trend_sum[bucket] += sums[i]
+                self._trend_n[bucket] += counts[i]
+            else:
+                self._trend_sum[bucket] = sums[i].copy()
+                self._trend_n[bucket] = counts[i].copy()
+
+    def ingest(self, df) -> int:
+        """
+        Adds an interaction log (the mastery_engine schemas: 'student_id',
+        'skill' and 'score' or 'correct', optional 'timestamp'). Unknown
+        skills are skipped. Returns the number of answers added.
+        """
+        import pandas as pd
+
+        from agents.mastery_engine import score_values, skill_values, timestamp_values
+
+        # Normalize each distinct skill / student once, not once per row
+        skill_codes, skills = pd.factorize(df["skill"])
+        skill_cols = skill_values(pd.DataFrame({"skill": skills})).map(self.column).to_numpy()
+        cols = np.append(skill_cols, np.nan)[skill_codes]  # code -1 (missing) -> NaN
+        keep = ~np.isnan(cols)
+        if not keep.any():
+            return 0
+        cols = cols[keep].astype(np.int64)
+        scores = np.clip(score_values(df)[keep], 0.0, 1.0)
+        codes, uniques = pd.factorize(df["student_id"][keep], use_na_sentinel=False)
+        uniques = [str(sid) for sid in uniques]
+
+        with self._lock:
+            rows = self._rows_for(uniques)[codes]
+            n_skills = len(self.skills)
+            cells, inverse = np.unique(rows * n_skills + cols, return_inverse=True)
+            self._update_cells(
+                cells // n_skills, cells % n_skills,
+                np.bincount(inverse, weights=scores), np.bincount(inverse),
+            )
+            if "timestamp" in df.columns:
+                self._add_trend(timestamp_values(df)[keep], cols, scores)
+            self.version += 1
+        return len(cols)
+
+    def record(self, student_id: str, skill: str, score: float, timestamp: Optional[float] = None) -> None:
+        """
+        Adds one answer (score in 0–1, or 0–100).
+        """
+        col = self.column.get(skill)
+        if col is None:
+            return
+        score = float(score)
+        score = min(1.0, max(0.0, score / 100.0 if score > 1.0 else score))
+        with self._lock:
+            row = self.rows.get(student_id)
+            if row is None:
+                row = int(self._rows_for([student_id])[0])
+            # Scalar twin of _update_cells: numpy calls on 1-element arrays cost more than the work
+            n = int(self._counts[row, col])
+            old = float(self._mastery[row, col])
+            if n:
+                self._cell_delta(col, old, -1)
+            self._mastery[row, col] = (old * n + score) / (n + 1)
+            self._counts[row, col] = min(n + 1, MAX_COUNT)
+            self._cell_delta(col, float(self._mastery[row, col]), 1)
+            if timestamp is not None:
+                bucket = math.floor(float(timestamp) / self.bucket_seconds)
+                if bucket not in self._trend_sum:
+                    self._trend_sum[bucket] = np.zeros(len(self.skills))
+                    self._trend_n[bucket] = np.zeros(len(self.skills), dtype=np.int64)
+                self._trend_sum[bucket][col] += score
+                self._trend_n[bucket][col] += 1
+            self.version += 1
+
+    def on_event(self, event: Dict[str, Any]) -> None:
+        """
+        EventLog on_event hook: answer events update the cohort.
+        """
+        if event.get("type") == "answer" and event.get("score") is not None:
+            self.record(event["sid"], event.get("skill"), event["score"], event.get("t"))
+
+    @classmethod
+    def from_store(cls, store, **kwargs) -> "CohortMatrix":
+        """
+        Builds the matrix from a MasteryStore's running aggregates.
+        """
+        cohort = cls(default_mastery=store.default_mastery, **kwargs)
+        rows, cols, sums, counts = [], [], [], []
+        for sid in store.students():
+            row = cohort._rows_for([sid])[0]
+            for skill in cohort.skills:
+                st = store.stats(sid, skill)
+                if st is not None and st.count:
+                    rows.append(row)
+                    cols.append(cohort.column[skill])
+                    sums.append(st.total)
+                    counts.append(st.count)
+        if rows:
+            cohort._update_cells(np.array(rows), np.array(cols), np.array(sums, dtype=np.float64), np.array(counts))
+            cohort.version += 1
+        return cohort
+
+    # -------------------------------------------------------------------------
+    # STATISTICS
+    # -------------------------------------------------------------------------
+    def _scan(self, rows: Optional[np.ndarray] = None):
+        """
+        (n, sum, sumsq, hist) over the answered cells of rows (all rows if
+        None), computed from the matrix in chunks.
+        """
+        n_skills = len(self.skills)
+        n = np.zeros(n_skills, dtype=np.int64)
+        total = np.zeros(n_skills)
+        sumsq = np.zeros(n_skills)
+        hist = np.zeros(n_skills * FINE_BINS + 1, dtype=np.int64)
+        col_offset = np.arange(n_skills, dtype=np.int64) * FINE_BINS
+        size = len(self.students) if rows is None else len(rows)
+        for start in range(0, size, CHUNK_ROWS):
+            if rows is None:
+                m = self._mastery[start:start + CHUNK_ROWS]
+                seen = self._counts[start:start + CHUNK_ROWS] > 0
+            else:
+                chunk = rows[start:start + CHUNK_ROWS]
+                m, seen = self._mastery[chunk], self._counts[chunk] > 0
+            m = m.astype(np.float64)  # bin exactly as _stats_delta does
+            masked = np.where(seen, m, 0.0)
+            n += seen.sum(axis=0)
+            total += masked.sum(axis=0)
+            sumsq += (masked * masked).sum(axis=0)
+            bins = np.minimum((m * FINE_BINS).astype(np.int64), FINE_BINS - 1) + col_offset
+            # Unanswered cells go to a spare slot past the end
+            hist += np.bincount(np.where(seen, bins, n_skills * FINE_BINS).ravel(), minlength=len(hist))
+        return n, total, sumsq, hist[:-1].reshape(n_skills, FINE_BINS)
+
+    def rebuild(self) -> None:
+        """
+        Recomputes the running statistics from the matrix (drops float drift).
+        """
+        with self._lock:
+            self._n, self._sum, self._sumsq, self._hist = self._scan()
+            self.version += 1
+
+    def _stats(self, group: Optional[str]):
+        if group is None:
+            return self._n, self._sum, self._sumsq, self._hist
+        if group not in self._groups:
+            raise KeyError(f"unknown group {group!r}")
+        return self._scan(self._groups[group])
+
+    def _cached(self, key: Tuple, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is not None and hit[0] == self.version:
+                return hit[1]
+            value = compute()
+            self._cache[key] = (self.version, value)
+            return value
+
+    # -------------------------------------------------------------------------
+    # QUERIES
+    # -------------------------------------------------------------------------
+    def skill_distribution(self, bins: int = 10, group: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        { skill: {"students", "mean", "std", "p10", "p25", "p50", "p75", "p90",
+                  "weak_share", "histogram" (students per mastery bin)} }
+        over students who answered the skill; skills nobody answered are omitted.
+        """
+        if FINE_BINS % bins:
+            raise ValueError(f"bins must divide {FINE_BINS}")
+        return self._cached(("distribution", bins, group), lambda: self._distribution(bins, group))
+
+    def _distribution(self, bins: int, group: Optional[str]) -> Dict[str, Dict[str, Any]]:
+        n, total, sumsq, hist = self._stats(group)
+        safe = np.maximum(n, 1)
+        mean = total / safe
+        std = np.sqrt(np.maximum(sumsq / safe - mean * mean, 0.0))
+        cum = hist.cumsum(axis=1)
+        pct = {
+            f"p{q}": (np.minimum((cum < q / 100.0 * n[:, None]).sum(axis=1), FINE_BINS - 1) + 0.5) / FINE_BINS
+            for q in (10, 25, 50, 75, 90)
+        }
+        weak = hist[:, :int(round(WEAK_BELOW * FINE_BINS))].sum(axis=1) / safe
+        coarse = hist.reshape(len(self.skills), bins, FINE_BINS // bins).sum(axis=2)
+
+        out = {}
+        for i in np.flatnonzero(n).tolist():
+            out[self.skills[i]] = {
+                "students": int(n[i]),
+                "mean": float(mean[i]),
+                "std": float(std[i]),
+                **{name: float(values[i]) for name, values in pct.items()},
+                "weak_share": float(weak[i]),
+                "histogram": coarse[i].tolist(),
+            }
+        return out
+
+    def heatmap(self, subject: Optional[str] = None, bins: int = 10, group: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Share of students per mastery bin for each answered skill (optionally
+        one subject's), weakest skill first: {"skills", "bin_edges", "share"}.
+        """
+        dist = self.skill_distribution(bins, group)
+        skills = [s for s in (SKILL_CATALOG.get(subject, ()) if subject else self.skills) if s in dist]
+        skills.sort(key=lambda s: dist[s]["mean"])
+        return {
+            "skills": skills,
+            "bin_edges": [i / bins for i in range(bins + 1)],
+            "share": [[c / dist[s]["students"] for c in dist[s]["histogram"]] for s in skills],
+        }
+
+    def weakest_skills(
+        self, subject: Optional[str] = None, k: int = 5, group: Optional[str] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        { subject: [{"skill", "mean", "weak_share", "students"}, ...] } with the
+        k lowest mean-mastery skills per subject (every subject if None).
+        """
+        def compute():
+            dist = self.skill_distribution(group=group)
+            subjects = [subject] if subject else list(SKILL_CATALOG)
+            out = {}
+            for subj in subjects:
+                ranked = sorted((s for s in SKILL_CATALOG.get(subj, ()) if s in dist), key=lambda s: dist[s]["mean"])
+                out[subj] = [
+                    {"skill": s, "mean": dist[s]["mean"], "weak_share": dist[s]["weak_share"], "students": dist[s]["students"]}
+                    for s in ranked[:k]
+                ]
+            return out
+
+        return self._cached(("weakest", subject, k, group), compute)
+
+    def trend(
+        self, skill: Optional[str] = None, subject: Optional[str] = None, last: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        [{"bucket_start", "answers", "mean_score"}] per time bucket, oldest
+        first, for one skill, one subject's skills, or all skills.
+        """
+        def compute():
+            if skill is not None:
+                cols = [self.column[skill]] if skill in self.column else []
+            elif subject is not None:
+                cols = [self.column[s] for s in SKILL_CATALOG.get(subject, ()) if s in self.column]
+            else:
+                cols = list(range(len(self.skills)))
+            out = []
+            for bucket in sorted(self._trend_sum)[-last if last else None:]:
+                answers = int(self._trend_n[bucket][cols].sum())
+                if answers:
+                    out.append({
+                        "bucket_start": bucket * self.bucket_seconds,
+                        "answers": answers,
+                        "mean_score": float(self._trend_sum[bucket][cols].sum() / answers),
+                    })
+            return out
+
+        return self._cached(("trend", skill, subject, last), compute)
@@ -0,0 +1,300 @@
+# agents/event_log.py
+"""
+Durable, append-only log of student interactions.
+
+Every event (a problem served, an answer and whether it was correct, time
+spent, a chat turn) is one JSON line appended to the current segment file.
+Writes only go to the OS buffer; a background flusher fsyncs at most every
+`fsync_interval` seconds or `fsync_batch` events (group commit), so an
+append costs a few microseconds and a crash loses at most that window.
+
+Answers are folded into a MasteryStore as they are appended. Every
+`snapshot_every` events the store is written out as a compacted snapshot
+tagged with the last event it includes, a new segment is started and the
+segments the snapshot covers are deleted. Recovery loads the newest
+snapshot and replays only the events after it.
+
+    log/
+      snapshot-000000120000.json    mastery aggregates up to event 120000
+      events-000000120001.jsonl     events 120001 ...
+
+    log = EventLog("log/", store=skill_agent.store)
+    log.append("answer", "s1", skill="algebra", score=1.0, correct=True, seconds=42)
+    log.close()
+
+One process writes a log directory at a time (enforced with a lock file).
+"""
+import fcntl
+import glob
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from agents.mastery_store import MasteryStore
+from agents.metrics import METRICS
+
+EVENT_TYPES = ("served", "answer", "chat")
+
+_SEGMENT = "events-{:012d}.jsonl"
+_SNAPSHOT = "snapshot-{:012d}.json"
+
+
+def _seq_of(path: str) -> int:
+    return int(os.path.basename(path).split("-", 1)[1].split(".", 1)[0])
+
+
+def read_segment(path: str) -> List[Dict[str, Any]]:
+    """
+    Events in a segment file. A torn last line (crash mid-write) is dropped;
+    a corrupt line elsewhere is skipped.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    lines = data.split(b"\n")
+    if lines and not data.endswith(b"\n"):
+        lines.pop()  # incomplete final write
+    lines = [line for line in lines if line]
+    if not lines:
+        return []
+    try:
+        # One C-level parse for the whole segment
+        return json.loads(b"[" + b",".join(lines) + b"]")
+    except ValueError:
+        events = []
+        for line in lines:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+        return events
+
+
+class EventLog:
+    """
+    log_dir:        directory holding segments and snapshots (created if missing)
+    store:          MasteryStore that answer events are applied to; restored
+                    from the log on open
+    on_event:       optional callback for every appended or replayed event
+    fsync_interval: max seconds an event may sit unsynced
+    fsync_batch:    sync as soon as this many events are pending
+    snapshot_every: events between automatic snapshots (None disables them)
+    """
+
+    def __init__(
+        self,
+        log_dir: str,
+        store: Optional[MasteryStore] = None,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+        fsync_interval: float = 0.2,
+        fsync_batch: int = 512,
+        snapshot_every: Optional[int] = 100_000,
+        clock: Callable[[], float] = time.time
+    ):
+        self.log_dir = log_dir
+        self.store = store if store is not None else MasteryStore()
+        self.on_event = on_event
+        self.fsync_interval = fsync_interval
+        self.fsync_batch = fsync_batch
+        self.snapshot_every = snapshot_every
+        self.clock = clock
+
+        os.makedirs(log_dir, exist_ok=True)
+        self._lock_file = open(os.path.join(log_dir, "LOCK"), "w")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock_file.close()
+            raise RuntimeError(f"{log_dir} is already open by another process")
+
+        # Lock order: _snapshot_lock, then _sync_lock, then _lock
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._snapshot_lock = threading.Lock()
+        self.recovered = self._recover()
+        self._segment = None
+        self._open_segment(self.seq + 1)
+
+        self._pending = 0
+        self._since_snapshot = self.recovered["replayed"]
+        self._closed = False
+        self._wake = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="event-log-flusher", daemon=True)
+        self._flusher.start()
+
+    # -------------------------------------------------------------------------
+    # RECOVERY
+    # -------------------------------------------------------------------------
+    def _recover(self) -> Dict[str, Any]:
+        start = time.perf_counter()
+        self.seq = 0
+        snapshot_seq = 0
+        for path in sorted(glob.glob(os.path.join(self.log_dir, "snapshot-*.json")), reverse=True):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    snap = json.load(f)
+            except ValueError:
+                continue  # unfinished or damaged snapshot: fall back to an older one
+            self.store.load_dict(snap["store"])
+            snapshot_seq = self.seq = snap["seq"]
+            break
+
+        replayed = 0
+        for event in self.events(after=snapshot_seq):
+            self._apply(event)
+            self.seq = event["seq"]
+            replayed += 1
+        return {"snapshot_seq": snapshot_seq, "replayed": replayed, "seconds": time.perf_counter() - start}
+
+    def events(self, after: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        Events with seq > after still on disk, in order.
+        """
+        segments = sorted(glob.glob(os.path.join(self.log_dir, "events-*.jsonl")), key=_seq_of)
+        for i, path in enumerate(segments):
+            # Skip segments that end before `after`
+            if i + 1 < len(segments) and _seq_of(segments[i + 1]) <= after + 1:
+                continue
+            for event in read_segment(path):
+                if event["seq"] > after:
+                    yield event
+
+    # -------------------------------------------------------------------------
+    # WRITES
+    # -------------------------------------------------------------------------
+    def append(self, event_type: str, student_id: str, **fields: Any) -> int:
+        """
+        Appends one event and returns its sequence number. Answer events
+        (skill, score) are applied to the store right away.
+        """
+        if event_type not in EVENT_TYPES:
+            raise ValueError(f"unknown event type {event_type!r}")
+        with self._lock:
+            if self._closed:
+                raise ValueError("event log is closed")
+            self.seq += 1
+            event = {"seq": self.seq, "t": round(self.clock(), 3), "type": event_type, "sid": student_id, **fields}
+            self._segment.write(json.dumps(event, separators=(",", ":"), default=str) + "\n")
+            self._pending += 1
+            self._since_snapshot += 1
+            self._apply(event)
+            wake = self._pending >= self.fsync_batch or (
+                self.snapshot_every is not None and self._since_snapshot >= self.snapshot_every
+            )
+        METRICS.inc("event_log_events_total", type=event_type)
+        if wake:
+            self._wake.set()
+        return event["seq"]
+
+    def _apply(self, event: Dict[str, Any]) -> None:
+        if event.get("type") == "answer" and event.get("skill") is not None and event.get("score") is not None:
+            self.store.update(event["sid"], event["skill"], event["score"], event.get("t"))
+        if self.on_event is not None:
+            self.on_event(event)
+
+    def flush(self) -> None:
+        """
+        Makes every event appended so far durable.
+        """
+        with self._sync_lock:
+            with self._lock:
+                if self._pending == 0 or self._closed:
+                    return
+                self._segment.flush()
+                self._pending = 0
+                fd = self._segment.fileno()
+            # Appends continue while the disk syncs
+            with METRICS.span("event_log_fsync_seconds"):
+                os.fsync(fd)
+
+    def _flush_loop(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.fsync_interval)
+            self._wake.clear()
+            if self._closed:
+                return
+            self.flush()
+            if self.snapshot_every is not None and self._since_snapshot >= self.snapshot_every:
+                self.snapshot()
+
+    def _open_segment(self, first_seq: int) -> None:
+        path = os.path.join(self.log_dir, _SEGMENT.format(first_seq))
+        if os.path.exists(path):
+            # Left over from a crash before its first complete event
+            with open(path, "rb+") as f:
+                data = f.read()
+                f.truncate(data.rfind(b"\n") + 1)
+        # Line-buffering would write per event; let flush() decide
+        self._segment = open(path, "a", encoding="utf-8", buffering=1 << 16)
+
+    # -------------------------------------------------------------------------
+    # SNAPSHOTS
+    # -------------------------------------------------------------------------
+    def snapshot(self) -> int:
+        """
+        Writes the store as of the latest event, starts a new segment and
+        deletes the segments and snapshots the new one supersedes. Appends
+        only wait while the store is copied, not while it is written.
+        Returns the snapshot's sequence number.
+        """
+        with self._snapshot_lock:
+            with self._sync_lock, self._lock:
+                if self._closed:
+                    return self.seq
+                seq = self.seq
+                state = self.store.to_dict()
+                old = self._segment
+                old.flush()
+                os.fsync(old.fileno())
+                old.close()
+                self._pending = 0
+                self._since_snapshot = 0
+                self._open_segment(seq + 1)
+
+            with METRICS.span("event_log_snapshot_seconds"):
+                path = os.path.join(self.log_dir, _SNAPSHOT.format(seq))
+                tmp = path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump({"seq": seq, "created_at": self.clock(), "store": state}, f, separators=(",", ":"))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, path)
+                self._compact(seq)
+            return seq
+
+    def _compact(self, seq: int) -> None:
+        for path in glob.glob(os.path.join(self.log_dir, "snapshot-*.json")):
+            if _seq_of(path) < seq:
+                os.remove(path)
+        for path in glob.glob(os.path.join(self.log_dir, "events-*.jsonl")):
+            if _seq_of(path) <= seq:
+                os.remove(path)  # every event in it is <= seq (segments rotate at snapshots)
+
+    # -------------------------------------------------------------------------
+    # LIFECYCLE
+    # -------------------------------------------------------------------------
+    def stats(self) -> Dict[str, Any]:
+        return {"seq": self.seq, "pending": self._pending, "since_snapshot": self._since_snapshot, **self.recovered}
+
+    def close(self, snapshot: bool = False) -> None:
+        if self._closed:
+            return
+        if snapshot:
+            self.snapshot()
+        self.flush()
+        with self._snapshot_lock, self._sync_lock, self._lock:
+            self._closed = True
+            self._segment.flush()
+            os.fsync(self._segment.fileno())
+            self._segment.close()
+        self._wake.set()
+        self._flusher.join(timeout=1.0)
+        fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+        self._lock_file.close()
+
+    def __enter__(self) -> "EventLog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,169 @@
+# agents/given_problems.py
+"""
+Compact per-student record of problems already given.
+
+Instead of lists of (question, hint) strings, each "Subject|topic" key maps
+to an integer bitmask of used positions in the matching problem-bank pool.
+A session's whole state is a few small ints, merging two states is a
+bitwise OR per key, and an optional window bounds how far back
+non-repetition is remembered.
+"""
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from agents.problem_bank import Problem, ProblemBank
+
+
+def bank_key(key: str) -> str:
+    """
+    given_problems keys are "Subject|topic", or just the topic when no subject
+    is set; the bank always uses "Subject|topic".
+    """
+    return key if "|" in key else f"None|{key}"
+
+
+class GivenProblems:
+    """
+    { "Subject|topic": bitmask of used pool positions }
+
+    window: if set, only the last `window` problems per key are remembered,
+            so older ones may be served again.
+    """
+
+    __slots__ = ("masks", "window", "_recent")
+
+    def __init__(self, window: Optional[int] = None):
+        self.masks: Dict[str, int] = {}
+        self.window = window
+        self._recent: Dict[str, Deque[int]] = {}
+
+    # -------------------------------------------------------------------------
+    # CONVERSION
+    # -------------------------------------------------------------------------
+    @classmethod
+    def coerce(cls, obj: Any, bank: ProblemBank, window: Optional[int] = None) -> "GivenProblems":
+        """
+        Accepts a GivenProblems or the legacy { key: [(q, h)] } dict (which
+        gets the given window).
+        """
+        if isinstance(obj, cls):
+            return obj
+        given = cls(window)
+        if isinstance(obj, dict):
+            for key, items in obj.items():
+                for item in items:
+                    pos = bank.position(bank_key(key), item)
+                    if pos is not None:
+                        given.add(key, pos)
+        return given
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        JSON-serializable state: {"masks", "window", "recent"}, where recent
+        holds each key's remembered positions, oldest first, when windowed.
+        """
+        return {
+            "masks": dict(self.masks),
+            "window": self.window,
+            "recent": {key: list(recent) for key, recent in self._recent.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], window: Optional[int] = None) -> "GivenProblems":
+        """
+        Restores to_dict() output, or a plain { key: mask } dict. window
+        overrides the saved one.
+        """
+        if not isinstance(data.get("masks"), dict):
+            data = {"masks": data}
+        given = cls(window if window is not None else data.get("window"))
+        for key, mask in data["masks"].items():
+            given.masks[key] = int(mask)
+        if given.window is not None:
+            for key, positions in data.get("recent", {}).items():
+                mask = given.masks.get(key, 0)
+                given._recent[key] = deque(pos for pos in positions if mask >> pos & 1)
+            # A smaller window than the saved one forgets the oldest problems
+            for key, recent in given._recent.items():
+                while len(recent) > given.window:
+                    given.masks[key] &= ~(1 << recent.popleft())
+        return given
+
+    def items(self, bank: ProblemBank) -> Dict[str, List[Tuple[str, str]]]:
+        """
+        Expands back to { key: [(question, hint)] } for display or export.
+        """
+        out = {}
+        for key, mask in self.masks.items():
+            pool = bank.pool(bank_key(key))
+            out[key] = [(p.question, p.hint) for pos, p in enumerate(pool) if mask >> pos & 1]
+        return out
+
+    # -------------------------------------------------------------------------
+    # UPDATES
+    # -------------------------------------------------------------------------
+    def add(self, key: str, pos: int) -> None:
+        self.masks[key] = self.masks.get(key, 0) | (1 << pos)
+        if self.window is not None:
+            recent = self._recent.setdefault(key, deque())
+            recent.append(pos)
+            if len(recent) > self.window:
+                self.masks[key] &= ~(1 << recent.popleft())
+
+    def draw(self, bank: ProblemBank, key: str, rng=None) -> Problem:
+        """
+        Draws an unused problem for key from bank and records it.
+        """
+        mask = self.masks.get(key, 0)
+        problem, new_mask = bank.draw(bank_key(key), mask, rng)
+        if new_mask & mask != mask or new_mask == mask:
+            # Pool exhausted and restarted (a fresh draw always adds a bit)
+            self._recent.pop(key, None)
+            mask = 0
+        pos = (new_mask & ~mask).bit_length() - 1
+        self.masks[key] = mask
+        self.add(key, pos)
+        return problem
+
+    def merge(self, other: "GivenProblems") -> "GivenProblems":
+        """
+        In-place union with another record. Linear in the number of keys.
+        """
+        if other is self:
+            return self
+        for key, mask in other.masks.items():
+            if self.window is None:
+                self.masks[key] = self.masks.get(key, 0) | mask
+            else:
+                new = mask & ~self.masks.get(key, 0)
+                while new:
+                    low = new & -new
+                    self.add(key, low.bit_length() - 1)
+                    new ^= low
+        return self
+
+    def reset(self, key: Optional[str] = None) -> None:
+        if key is None:
+            self.masks.clear()
+            self._recent.clear()
+        else:
+            self.masks.pop(key, None)
+            self._recent.pop(key, None)
+
+    # -------------------------------------------------------------------------
+    # READS
+    # -------------------------------------------------------------------------
+    def count(self, key: str) -> int:
+        return bin(self.masks.get(key, 0)).count("1")
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.masks
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.masks)
+
+    def __len__(self) -> int:
+        return len(self.masks)
+
+    def __repr__(self) -> str:
+        return f"GivenProblems({ {k: self.count(k) for k in self.masks} })"
@@ -0,0 +1,130 @@
+# agents/ingest.py
+"""
+Streaming ingestion of student session logs.
+
+Reads student_sessions.csv-style files in fixed-size chunks (or Parquet in
+record batches), folds each chunk into a MasteryStore and drops it, so peak
+memory depends on the chunk size and the number of (student, skill) pairs,
+not on the file size.
+
+    python -m agents.ingest dataset_sample/student_sessions.csv --chunksize 500000
+"""
+import argparse
+import time
+from typing import Callable, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from agents.mastery_engine import aggregate_mastery
+from agents.mastery_store import MasteryStore
+
+# Columns the mastery aggregates need; everything else is skipped at parse time.
+SESSION_COLUMNS = ("student_id", "timestamp", "skill", "score", "correct")
+
+CSV_DTYPES = {"student_id": "string", "skill": "string", "correct": "float32", "score": "float32"}
+
+
+class IngestStats:
+    def __init__(self):
+        self.rows = 0
+        self.chunks = 0
+        self.seconds = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __repr__(self) -> str:
+        return f"IngestStats(rows={self.rows}, chunks={self.chunks}, seconds={self.seconds:.2f}, rows_per_sec={self.rows_per_sec:,.0f})"
+
+
+# -------------------------------------------------------------------------
+# CHUNK READERS
+# -------------------------------------------------------------------------
+def iter_csv_chunks(path: str, chunksize: int = 250_000) -> Iterator[pd.DataFrame]:
+    reader = pd.read_csv(
+        path,
+        chunksize=chunksize,
+        usecols=lambda c: c in SESSION_COLUMNS,
+        dtype=CSV_DTYPES,
+    )
+    with reader:
+        for chunk in reader:
+            yield chunk
+
+
+def iter_parquet_chunks(path: str, chunksize: int = 250_000) -> Iterator[pd.DataFrame]:
+    import pyarrow.parquet as pq  # optional dependency, only needed for Parquet logs
+
+    pf = pq.ParquetFile(path)
+    columns = [c for c in pf.schema_arrow.names if c in SESSION_COLUMNS]
+    for batch in pf.iter_batches(batch_size=chunksize, columns=columns):
+        yield batch.to_pandas()
+
+
+def iter_session_chunks(path: str, chunksize: int = 250_000) -> Iterator[pd.DataFrame]:
+    if path.endswith((".parquet", ".pq")):
+        return iter_parquet_chunks(path, chunksize)
+    return iter_csv_chunks(path, chunksize)
+
+
+# -------------------------------------------------------------------------
+# INGESTION
+# -------------------------------------------------------------------------
+def fold_chunk(store: MasteryStore, chunk: pd.DataFrame) -> None:
+    """
+    Aggregates one chunk and merges it into the store.
+    """
+    agg = aggregate_mastery(chunk)
+    last_seen = agg["last_seen"].to_numpy() if "last_seen" in agg else np.full(len(agg), np.nan)
+    for sid, skill, total, count, ts in zip(
+        agg["student_id"], agg["skill"], agg["total"].to_numpy(), agg["count"].to_numpy(), last_seen
+    ):
+        store.add_aggregate(sid, skill, float(total), int(count), None if np.isnan(ts) else float(ts))
+
+
+def ingest_sessions(
+    path: str,
+    store: Optional[MasteryStore] = None,
+    chunksize: int = 250_000,
+    progress: Optional[Callable[[IngestStats], None]] = None
+) -> Tuple[MasteryStore, IngestStats]:
+    """
+    Streams a session log into a MasteryStore.
+    progress, if given, is called with the running IngestStats after each chunk.
+    """
+    store = store if store is not None else MasteryStore()
+    stats = IngestStats()
+    start = time.perf_counter()
+
+    for chunk in iter_session_chunks(path, chunksize):
+        fold_chunk(store, chunk)
+        stats.rows += len(chunk)
+        stats.chunks += 1
+        stats.seconds = time.perf_counter() - start
+        if progress is not None:
+            progress(stats)
+
+    stats.seconds = time.perf_counter() - start
+    return store, stats
+
+
+def main():
+    import resource
+
+    parser = argparse.ArgumentParser(description="Stream a session log into mastery aggregates.")
+    parser.add_argument("path")
+    parser.add_argument("--chunksize", type=int, default=250_000)
+    args = parser.parse_args()
+
+    def report(stats: IngestStats):
+        print(f"  {stats.rows:>12,} rows  {stats.rows_per_sec:>12,.0f} rows/s")
+
+    store, stats = ingest_sessions(args.path, chunksize=args.chunksize, progress=report)
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{stats}\nstudents={len(store)} peak_rss={peak_mb:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+# agents/intent_router.py
+"""
+Compiled intent router for chat messages.
+
+All trigger phrases are compiled into one prefix-factored regex alternation
+that findall() runs over the message in a single pass, instead of one
+`any(t in text ...)` scan per intent. Terms hidden inside a longer match
+come from a precomputed table; the few terms that can start inside a match
+and run past its end are checked directly. The route for each distinct set
+of terms found is resolved once and cached.
+
+New intents register phrases (any of them matches) or keyword sets (all of
+them must appear) with a priority; the lowest priority value wins when
+several intents match.
+
+    router = IntentRouter()
+    router.register("practice", ["practice problem", "another problem"], priority=10)
+    router.register("explain", ["explain", "what is"], priority=20)
+    router.register("answer:newton", all_of=["newton", "law"])
+    router.route("Explain Newton's second law")    # -> "explain"
+    router.match("Explain Newton's second law")    # -> RouteMatch(best='explain', intents=['answer:newton', 'explain'])
+"""
+import re
+from typing import Dict, FrozenSet, Iterable, List, Optional, Pattern, Tuple
+
+# Distinct match results whose route is kept; real traffic has few
+MAX_CACHED_ROUTES = 4096
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """
+    Regex for a set of literal terms with shared prefixes factored out, so
+    each position is tested against one branch per distinct next character.
+    Optional tails are greedy, so the longest term at a position wins.
+    """
+    trie: Dict[str, dict] = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: Dict[str, dict]) -> str:
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            return "(?:" + body + ")?" if len(branches) == 1 else body + "?"
+        return body
+
+    return emit(trie)
+
+
+class RouteMatch:
+    __slots__ = ("intents", "best")
+
+    def __init__(self, intents: FrozenSet[str], best: Optional[str]):
+        self.intents = intents
+        self.best = best
+
+    def __contains__(self, intent: str) -> bool:
+        return intent in self.intents
+
+    def __repr__(self) -> str:
+        return f"RouteMatch(best={self.best!r}, intents={sorted(self.intents)})"
+
+
+class IntentRouter:
+    def __init__(self):
+        # (priority, registration order, intent, any_of, all_of)
+        self._rules: List[Tuple[int, int, str, FrozenSet[str], FrozenSet[str]]] = []
+        self._pattern: Optional[Pattern] = None
+        # term -> registered terms it contains (itself included)
+        self._implied: Dict[str, FrozenSet[str]] = {}
+        # term -> terms that can start inside it and end past it
+        self._overlaps: Dict[str, Tuple[str, ...]] = {}
+        # findall() result -> (terms found, overlapping terms to check, route)
+        self._by_terms: Dict[Tuple[str, ...], Tuple[FrozenSet[str], Tuple[str, ...], "RouteMatch"]] = {}
+        # terms found, overlaps included -> route
+        self._routes: Dict[FrozenSet[str], "RouteMatch"] = {}
+        # term -> intents whose phrase list it satisfies
+        self._term_intents: Dict[str, FrozenSet[str]] = {}
+        # term -> all_of rules it contributes to
+        self._term_all_of: Dict[str, Tuple[Tuple[str, FrozenSet[str]], ...]] = {}
+        self._rank: Dict[str, int] = {}
+
+    # -------------------------------------------------------------------------
+    # REGISTRY
+    # -------------------------------------------------------------------------
+    def register(
+        self,
+        intent: str,
+        phrases: Iterable[str] = (),
+        all_of: Iterable[str] = (),
+        priority: int = 100
+    ) -> "IntentRouter":
+        """
+        Adds a rule for intent: it matches if any of `phrases` occurs, or if
+        every term in `all_of` occurs. Matching is case-insensitive substring
+        matching, like the scans it replaces.
+        """
+        any_of = frozenset(p.lower() for p in phrases)
+        every = frozenset(t.lower() for t in all_of)
+        if not any_of and not every:
+            raise ValueError(f"intent {intent!r} needs phrases or all_of terms")
+        self._rules.append((priority, len(self._rules), intent, any_of, every))
+        self._rules.sort()
+        self._pattern = None
+        return self
+
+    def intents(self) -> List[str]:
+        return list(dict.fromkeys(rule[2] for rule in self._rules))
+
+    def compile(self) -> None:
+        terms = {t for rule in self._rules for t in rule[3] | rule[4]}
+        # Matches don't overlap and the longest term at a position wins;
+        # shorter terms inside a match are recovered through _implied, terms
+        # running past its end through _overlaps.
+        self._pattern = re.compile(_trie_pattern(terms))
+        self._implied = {t: frozenset(u for u in terms if u in t) for t in terms}
+        prefixes: Dict[str, List[str]] = {}
+        for u in terms:
+            for n in range(1, len(u)):
+                prefixes.setdefault(u[:n], []).append(u)
+        self._overlaps = {
+            t: tuple(dict.fromkeys(u for n in range(1, len(t)) for u in prefixes.get(t[-n:], ())))
+            for t in terms
+        }
+        self._by_terms = {}
+        self._routes = {}
+        self._term_intents = {
+            t: frozenset(rule[2] for rule in self._rules if not rule[3].isdisjoint(implied))
+            for t, implied in self._implied.items()
+        }
+        self._term_all_of = {
+            t: tuple((rule[2], rule[4]) for rule in self._rules if not rule[4].isdisjoint(implied))
+            for t, implied in self._implied.items()
+        }
+        self._rank = {}
+        for i, rule in enumerate(self._rules):
+            self._rank.setdefault(rule[2], i)
+
+    # -------------------------------------------------------------------------
+    # MATCHING
+    # -------------------------------------------------------------------------
+    def _scan(self, text: str) -> Tuple[FrozenSet[str], RouteMatch]:
+        """
+        (terms found, route) for lowercased text. Besides the matches this
+        finds terms that run past a match's end ("generate a practice
+        exercise": "practice exercise" past "generate a practice").
+        """
+        if self._pattern is None:
+            self.compile()
+        terms = self._pattern.findall(text)
+        if not terms:
+            return _NOTHING, _NO_MATCH
+        key = tuple(terms)
+        entry = self._by_terms.get(key)
+        if entry is None:
+            found = frozenset(terms)
+            hits = self._closure(found)
+            checks = tuple(dict.fromkeys(u for t in found for u in self._overlaps[t] if u not in hits))
+            entry = _remember(self._by_terms, key, (found, checks, self._resolve(found)))
+        found, checks, route = entry
+        if checks:
+            extra = [u for u in checks if u in text]
+            if extra:
+                found = found.union(extra)
+                route = self._routes.get(found)
+                if route is None:
+                    route = _remember(self._routes, found, self._resolve(found))
+        return found, route
+
+    def _closure(self, found: Iterable[str]) -> set:
+        out = set()
+        for term in found:
+            out |= self._implied[term]
+        return out
+
+    def hits(self, text: str) -> FrozenSet[str]:
+        """
+        Every registered term that occurs in text.
+        """
+        return frozenset(self._closure(self._scan(text.lower())[0]))
+
+    def match(self, text: str) -> RouteMatch:
+        return self._scan(text.lower())[1]
+
+    def _resolve(self, found: FrozenSet[str]) -> RouteMatch:
+        intents = set()
+        all_of_rules = ()
+        for term in found:
+            intents |= self._term_intents[term]
+            all_of_rules += self._term_all_of[term]
+        if all_of_rules:
+            hits = self._closure(found)
+            for intent, every in all_of_rules:
+                if every <= hits:
+                    intents.add(intent)
+
+        if not intents:
+            return _NO_MATCH
+        return RouteMatch(frozenset(intents), min(intents, key=self._rank.__getitem__))
+
+    def route(self, text: str) -> Optional[str]:
+        return self.match(text).best
+
+
+def _remember(cache: dict, key, value):
+    if len(cache) >= MAX_CACHED_ROUTES:
+        cache.clear()
+    cache[key] = value
+    return value
+
+
+_NOTHING: FrozenSet[str] = frozenset()
+_NO_MATCH = RouteMatch(_NOTHING, None)
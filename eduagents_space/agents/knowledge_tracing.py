@@ -0,0 +1,255 @@
+# agents/knowledge_tracing.py
+"""
+Bayesian Knowledge Tracing (BKT) mastery model.
+
+Unlike the mean score, BKT follows each (student, skill) answer sequence in
+time order: every answer updates P(known) through the slip/guess rates, and
+every step may move the student from "not known" to "known" with P(learn).
+
+The batch path runs all sequences together. Answers are kept in one flat
+array sorted by sequence and time, with the longest sequences first, so
+step t updates only the sequences that are still running, in one NumPy
+expression. This is the padded-matrix update without storing the padding.
+Cost is O(total answers) array work plus one Python step per position in
+the longest sequence.
+
+Scores in 0–1 (or 'correct' 0/1) are used as soft evidence, so 0/1 answers
+give the textbook update.
+
+    tracer = KnowledgeTracer().fit(df)
+    mastery = tracer.trace(df)               # {student_id: {skill: P(known)}}
+    tracer.update("s1", "algebra", 1)        # online, O(1)
+"""
+from typing import Any, Dict, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from agents.mastery_engine import score_values, skill_values, timestamp_values
+from agents.mastery_store import normalize_score
+from agents.skill_agent import ALL_SKILLS
+
+PARAM_NAMES = ("p_init", "p_learn", "p_slip", "p_guess")
+
+# Slip and guess stay below 0.5 so "known" always means "more likely correct"
+PARAM_GRIDS = {
+    "p_init": np.linspace(0.05, 0.95, 10),
+    "p_learn": np.array([0.01, 0.03, 0.05, 0.1, 0.15, 0.2, 0.3, 0.4, 0.5]),
+    "p_slip": np.array([0.01, 0.05, 0.1, 0.15, 0.2, 0.25, 0.3, 0.4]),
+    "p_guess": np.array([0.01, 0.05, 0.1, 0.15, 0.2, 0.25, 0.3, 0.4]),
+}
+
+_EPS = 1e-6
+
+
+class BKTParams(NamedTuple):
+    p_init: float = 0.4
+    p_learn: float = 0.15
+    p_slip: float = 0.1
+    p_guess: float = 0.2
+
+
+class Sequences:
+    """
+    Answer sequences of a log, one per (student, skill), flattened and
+    ordered by time inside each sequence, longest sequence first.
+    """
+
+    __slots__ = ("students", "skill_codes", "starts", "lengths", "active", "obs", "row_skill", "rows")
+
+    def __init__(self, df: pd.DataFrame, skills: Sequence[str] = ALL_SKILLS, by_student: bool = True):
+        # -1 for skills outside `skills`
+        skill_code = pd.Index(list(skills)).get_indexer(skill_values(df)).astype(np.int64)
+        keep = np.flatnonzero(skill_code >= 0)
+        skill_code = skill_code[keep]
+        obs = np.clip(score_values(df)[keep], 0.0, 1.0)
+
+        if by_student:
+            student_code, students = pd.factorize(df["student_id"].astype(str).to_numpy()[keep])
+        else:
+            student_code, students = np.zeros(len(keep), dtype=np.int64), np.array([None], dtype=object)
+        group = student_code.astype(np.int64) * len(skills) + skill_code
+
+        ts = timestamp_values(df)[keep] if "timestamp" in df.columns else np.zeros(len(keep))
+        # By sequence, then time, then file order for equal/missing timestamps
+        order = np.lexsort((np.arange(len(keep)), ts, group))
+        group = group[order]
+
+        uniq, starts, lengths = np.unique(group, return_index=True, return_counts=True)
+        by_len = np.argsort(-lengths, kind="stable")
+        uniq, starts, lengths = uniq[by_len], starts[by_len], lengths[by_len]
+
+        self.students = students[uniq // len(skills)]
+        self.skill_codes = uniq % len(skills)
+        self.starts = starts
+        self.lengths = lengths
+        # active[t] = number of sequences longer than t (a prefix, as lengths are sorted)
+        counts = np.bincount(lengths, minlength=int(lengths.max(initial=0)) + 1)
+        self.active = len(lengths) - np.cumsum(counts)[:-1]
+        self.obs = obs[order]
+        self.row_skill = skill_code[order]
+        # Position in df of every flat answer
+        self.rows = keep[order]
+
+    def __len__(self) -> int:
+        return len(self.obs)
+
+
+def forward(seq: Sequences, params: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Runs BKT over every sequence at once.
+    params maps PARAM_NAMES to per-skill arrays.
+    Returns (P(known) after each sequence's last answer, per-answer P(correct)
+    predicted before seeing that answer, in flat order).
+    """
+    codes = seq.skill_codes
+    learn = params["p_learn"][codes]
+    slip = params["p_slip"][codes]
+    guess = params["p_guess"][codes]
+    p = params["p_init"][codes].astype(np.float64)
+    pred = np.empty(len(seq.obs), dtype=np.float64)
+
+    for t, n in enumerate(seq.active):
+        idx = seq.starts[:n] + t
+        o = seq.obs[idx]
+        pk, s, g = p[:n], slip[:n], guess[:n]
+        right = pk * (1.0 - s)
+        pc = right + (1.0 - pk) * g
+        pred[idx] = pc
+        post = o * (right / pc) + (1.0 - o) * (pk * s / (1.0 - pc))
+        p[:n] = post + (1.0 - post) * learn[:n]
+    return p, pred
+
+
+def log_likelihood(seq: Sequences, pred: np.ndarray, n_skills: int) -> np.ndarray:
+    """
+    Per-skill log-likelihood of the observed answers under pred.
+    """
+    pc = np.clip(pred, _EPS, 1.0 - _EPS)
+    ll = seq.obs * np.log(pc) + (1.0 - seq.obs) * np.log(1.0 - pc)
+    return np.bincount(seq.row_skill, weights=ll, minlength=n_skills)
+
+
+class KnowledgeTracer:
+    """
+    BKT with one parameter set per skill and the latest P(known) per
+    (student, skill) for online updates.
+    """
+
+    def __init__(self, params: BKTParams = BKTParams(), skills: Sequence[str] = ALL_SKILLS):
+        self.skills = list(skills)
+        self.index = {s: i for i, s in enumerate(self.skills)}
+        self.params: Dict[str, np.ndarray] = {
+            name: np.full(len(self.skills), getattr(params, name), dtype=np.float64) for name in PARAM_NAMES
+        }
+        self.state: Dict[str, Dict[str, float]] = {}
+
+    def params_for(self, skill: str) -> BKTParams:
+        i = self.index[skill]
+        return BKTParams(*(float(self.params[name][i]) for name in PARAM_NAMES))
+
+    # -------------------------------------------------------------------------
+    # FITTING
+    # -------------------------------------------------------------------------
+    def fit(self, df: pd.DataFrame, sweeps: int = 2, per_skill: bool = True) -> "KnowledgeTracer":
+        """
+        Maximum-likelihood parameters by coordinate ascent over PARAM_GRIDS.
+        Each grid value is scored for all skills with one forward pass, so a
+        fit costs sweeps * sum(grid sizes) passes. per_skill=False fits one
+        shared parameter set.
+        """
+        seq = Sequences(df, self.skills)
+        if len(seq) == 0:
+            return self
+        n_skills = len(self.skills)
+        params = {name: arr.copy() for name, arr in self.params.items()}
+
+        for _ in range(sweeps):
+            for name in PARAM_NAMES:
+                best_ll = np.full(n_skills, -np.inf)
+                best = params[name].copy()
+                for value in PARAM_GRIDS[name]:
+                    trial = dict(params)
+                    trial[name] = np.full(n_skills, value)
+                    ll = log_likelihood(seq, forward(seq, trial)[1], n_skills)
+                    if not per_skill:
+                        ll = np.full(n_skills, ll.sum())
+                    better = ll > best_ll
+                    best_ll[better] = ll[better]
+                    best[better] = value
+                params[name] = best
+
+        # Skills with no answers keep their previous parameters
+        seen = np.bincount(seq.row_skill, minlength=n_skills) > 0
+        for name in PARAM_NAMES:
+            self.params[name] = np.where(seen | (not per_skill), params[name], self.params[name])
+        return self
+
+    # -------------------------------------------------------------------------
+    # BATCH ESTIMATES
+    # -------------------------------------------------------------------------
+    def trace(self, df: pd.DataFrame, by_student: bool = True) -> Dict[Any, Dict[str, float]]:
+        """
+        Runs the whole log and returns {student_id: {skill: P(known)}} for
+        the (student, skill) pairs present in df. The result also becomes the
+        starting state for update(). With by_student=False every row is one
+        student and the key is None.
+        """
+        seq = Sequences(df, self.skills, by_student)
+        mastery, _ = forward(seq, self.params)
+        out: Dict[Any, Dict[str, float]] = {}
+        for sid, code, m in zip(seq.students.tolist(), seq.skill_codes.tolist(), mastery.tolist()):
+            out.setdefault(sid, {})[self.skills[code]] = m
+        if by_student:
+            for sid, skills in out.items():
+                self.state.setdefault(sid, {}).update(skills)
+        return out
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        P(correct) of every row of df given only the answers before it in
+        its (student, skill) sequence; NaN for rows with unknown skills.
+        """
+        seq = Sequences(df, self.skills)
+        _, pred = forward(seq, self.params)
+        out = np.full(len(df), np.nan)
+        out[seq.rows] = pred
+        return out
+
+    # -------------------------------------------------------------------------
+    # ONLINE UPDATES
+    # -------------------------------------------------------------------------
+    def update(self, student_id: str, skill: str, score: Any) -> float:
+        """
+        Folds one answer into the student's P(known) for skill and returns it.
+        """
+        i = self.index.get(skill)
+        if i is None:
+            raise KeyError(f"unknown skill {skill!r}")
+        init, learn, slip, guess = (float(self.params[name][i]) for name in PARAM_NAMES)
+        skills = self.state.setdefault(student_id, {})
+        p = skills.get(skill, init)
+        o = min(1.0, max(0.0, normalize_score(score)))
+
+        right = p * (1.0 - slip)
+        pc = right + (1.0 - p) * guess
+        post = o * (right / pc) + (1.0 - o) * (p * slip / (1.0 - pc))
+        p = post + (1.0 - post) * learn
+        skills[skill] = p
+        return p
+
+    def mastery(self, student_id: str, skill: str) -> float:
+        return self.state.get(student_id, {}).get(skill, float(self.params["p_init"][self.index[skill]]))
+
+    def snapshot(self, student_id: str, default_mastery: Optional[float] = None) -> Dict[str, float]:
+        """
+        {skill: P(known)} over all skills. Unseen skills get default_mastery,
+        or the skill's p_init when it is None.
+        """
+        seen = self.state.get(student_id, {})
+        if default_mastery is None:
+            return {s: seen.get(s, float(self.params["p_init"][i])) for i, s in enumerate(self.skills)}
+        return {s: seen.get(s, default_mastery) for s in self.skills}
+
+    def forget(self, student_id: str) -> None:
+        self.state.pop(student_id, None)
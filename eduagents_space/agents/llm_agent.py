@@ -1,118 +1,354 @@
 # agents/llm_agent.py
+import time
 import uuid
-import random
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Dict, Any, AsyncIterator, Callable, Iterable, List, Tuple, Optional
+
+from agents.catalog import ContentCatalog, default_catalog
+from agents.given_problems import GivenProblems
+from agents.intent_router import IntentRouter, RouteMatch
+from agents.metrics import METRICS
+from agents.problem_bank import ProblemBank
+from agents.response_cache import ResponseCache, cache_key
+from agents.retrieval import TopicRetriever
+from agents.session import SessionContext, SessionPool
+
+# Chat intents, checked in this order by _mock_response
+PRACTICE_TRIGGERS = (
+    "practice problem", "another problem", "practice exercise",
+    "give me a basic problem"
+)
+EXPLAIN_TRIGGERS = ("explain", "define", "what is", "explain more", "show me the solution")
+RECOMMEND_TRIGGERS = ("generate a practice",)
+
+# Short canned answers, tried in order inside an explanation request
+DIRECT_ANSWERS = (
+    ("answer:newton", {"all_of": ("newton", "law")},
+     "Newton’s laws: (1) Inertia, (2) F = m·a, (3) Action–Reaction."),
+    ("answer:integration", {"phrases": ("what is integration",)},
+     "Integration finds areas, volumes, or antiderivatives."),
+    ("answer:derivative", {"phrases": ("what is derivative",)},
+     "The derivative measures rate of change: d/dx xⁿ = n·xⁿ⁻¹."),
+)
+
+
+def build_default_router() -> IntentRouter:
+    router = IntentRouter()
+    router.register("practice", PRACTICE_TRIGGERS, priority=10)
+    router.register("explain", EXPLAIN_TRIGGERS, priority=20)
+    router.register("recommend", RECOMMEND_TRIGGERS, priority=30)
+    for i, (intent, terms, _) in enumerate(DIRECT_ANSWERS):
+        router.register(intent, priority=100 + i, **terms)
+    return router
 
 
 class LLMAgent:
-    def __init__(self, mock: bool = True, model_name: str = "mock"):
+    """
+    Shared tutor agent. Holds only read-only banks; per-user state
+    (subject, topic, given problems) lives in a SessionContext.
+
+    Pass context["session_id"] to keep state on the agent between calls.
+    Without it each call uses a throwaway session seeded from the context,
+    and callers carry state forward through the returned "given_problems".
+
+    With mock=False, completions come from `backend` (see agents/backends.py).
+    Repeated prompts are answered from a response cache (cache_size=0 disables it).
+    Chat messages are classified in one pass by an IntentRouter; see register_intent.
+    given_window bounds how many problems per topic a session avoids repeating.
+    """
+
+    def __init__(
+        self,
+        mock: bool = True,
+        model_name: str = "mock",
+        problem_bank: Optional[ProblemBank] = None,
+        max_sessions: int = 10_000,
+        session_ttl: Optional[float] = 3600.0,
+        backend=None,
+        catalog: Optional[ContentCatalog] = None,
+        cache_size: int = 4096,
+        cache_ttl: Optional[float] = None,
+        given_window: Optional[int] = None
+    ):
         self.mock = mock
         self.model_name = model_name
-
-        self.current_subject: Optional[str] = None
-        self.current_topic: Optional[str] = None
-
-        # Stores problems already given: { "Subject|Topic": [(q,h)] }
-        self.given_problems: Dict[str, List[Tuple[str, str]]] = {}
+        self.backend = backend
+
+        # Read-only content (explanations, samples, problem pools), loaded once and shared
+        self.catalog = catalog or default_catalog()
+        self._problem_bank = problem_bank
+        self._retriever: Optional[TopicRetriever] = None
+
+        # Active sessions, evicted when idle (LRU/TTL)
+        self.sessions = SessionPool(max_sessions=max_sessions, ttl=session_ttl, window=given_window)
+
+        # Shared answers for repeated prompts
+        self.cache: Optional[ResponseCache] = ResponseCache(cache_size, cache_ttl) if cache_size > 0 else None
+
+        # Single-pass chat intent matching, plus handlers for custom intents
+        self.router = build_default_router()
+        self.intent_handlers: Dict[str, Callable[..., str]] = {}
+
+    @property
+    def problem_bank(self) -> ProblemBank:
+        # Follows catalog reloads unless a fixed bank was passed in
+        return self._problem_bank or self.catalog.problem_bank
+
+    @property
+    def retriever(self) -> TopicRetriever:
+        # Rebuilt (lazily) when the bank or the catalog content is swapped
+        bank, explanations = self.problem_bank, self.catalog.content.explanations
+        retriever = self._retriever
+        if retriever is None or retriever.bank is not bank or retriever.explanations is not explanations:
+            retriever = self._retriever = TopicRetriever(bank, explanations)
+        return retriever
+
+    def register_intent(
+        self,
+        intent: str,
+        phrases: Iterable[str] = (),
+        all_of: Iterable[str] = (),
+        priority: int = 50,
+        handler: Optional[Callable[..., str]] = None
+    ) -> None:
+        """
+        Adds trigger phrases to the router. If handler is given it is called as
+        handler(prompt, context, session) when this intent is the best match;
+        priorities below 10 take precedence over the built-in practice intent.
+        """
+        self.router.register(intent, phrases, all_of, priority)
+        if handler is not None:
+            self.intent_handlers[intent] = handler
 
     # MAIN GENERATE FUNCTION --------------------------------------------------
+    @METRICS.timed("llm_generate_seconds")
     def generate(self, prompt: str, context: Dict[str, Any] = None, max_tokens: int = 200) -> Dict[str, Any]:
         if context is None:
             context = {}
+        return self._generate(prompt, context, self._session_for(context), max_tokens)
+
+    @METRICS.timed("llm_generate_batch_seconds")
+    def generate_batch(
+        self,
+        prompts: List[str],
+        contexts: Optional[List[Dict[str, Any]]] = None,
+        max_tokens: int = 200,
+        max_concurrency: int = 8
+    ) -> List[Dict[str, Any]]:
+        """
+        Runs several prompts at once, at most max_concurrency in flight.
+        Results come back in prompt order. Prompts that share a session_id
+        (or the same given_problems object) share one session, so problems
+        are not repeated across the batch.
+        """
+        if contexts is None:
+            contexts = [{} for _ in prompts]
+
+        sessions: Dict[Any, SessionContext] = {}
+        jobs = []
+        for prompt, context in zip(prompts, contexts):
+            context = context or {}
+            share_key = context.get("session_id") or id(context.get("given_problems"))
+            if share_key not in sessions:
+                sessions[share_key] = self._session_for(context)
+            jobs.append((prompt, context, sessions[share_key]))
+
+        if max_concurrency <= 1 or len(jobs) <= 1:
+            return [self._generate(p, c, s, max_tokens) for p, c, s in jobs]
+
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(jobs))) as pool:
+            return list(pool.map(lambda job: self._generate(*job, max_tokens), jobs))
+
+    async def agenerate(self, prompt: str, context: Dict[str, Any] = None, max_tokens: int = 200) -> Dict[str, Any]:
+        """
+        Async generate(). With a backend the event loop is never blocked on the model.
+        """
+        if context is None:
+            context = {}
+        session = self._session_for(context)
+        if self.mock or self.backend is None:
+            return self._generate(prompt, context, session, max_tokens)
+
+        key = self._cache_key(prompt, context, session, self.router.match(prompt))
+        text = self.cache.get(key) if key is not None else None
+        if text is None:
+            text = await self.backend.acomplete(prompt, max_tokens, self._backend_context(context, session))
+            if key is not None:
+                self.cache.put(key, text)
+        return self._result(text, session)
+
+    async def astream(self, prompt: str, context: Dict[str, Any] = None, max_tokens: int = 200) -> AsyncIterator[str]:
+        """
+        Yields the response token by token (the mock yields it in one piece).
+        """
+        if context is None:
+            context = {}
+        session = self._session_for(context)
+        if self.mock or self.backend is None:
+            yield self._generate(prompt, context, session, max_tokens)["text"]
+            return
+        async for token in self.backend.astream(prompt, max_tokens, self._backend_context(context, session)):
+            yield token
+
+    def _generate(self, prompt: str, context: Dict[str, Any], session: SessionContext, max_tokens: int) -> Dict[str, Any]:
+        if not self.mock and self.backend is None:
+            return {"id": str(uuid.uuid4()), "text": "Real LLM not configured.", "raw": ""}
+
+        route = self.router.match(prompt)
+        key = self._cache_key(prompt, context, session, route)
+        if key is not None:
+            text = self.cache.get(key)
+            if text is not None:
+                METRICS.inc("llm_cache_total", result="hit")
+                return self._result(text, session)
+            METRICS.inc("llm_cache_total", result="miss")
 
         if self.mock:
-            text = self._mock_response(prompt, context)
-            return {
-                "id": str(uuid.uuid4()),
-                "text": text,
-                "raw": text,
-                "given_problems": self.given_problems
-            }
+            with session.lock:
+                text = self._mock_response(prompt, context, session, route)
+        else:
+            with METRICS.span("llm_backend_seconds"):
+                text = self.backend.complete_sync(prompt, max_tokens, self._backend_context(context, session))
+
+        if key is not None:
+            self.cache.put(key, text)
+        return self._result(text, session)
+
+    def _cache_key(
+        self, prompt: str, context: Dict[str, Any], session: SessionContext, route: RouteMatch
+    ) -> Optional[str]:
+        """
+        Returns None for prompts whose answer must vary or that change session state.
+        """
+        if self.cache is None:
+            return None
+        if (
+            "practice" in route
+            or route.best in self.intent_handlers
+            or prompt.lower().strip().startswith("start topic:")
+            or context.get("skill_estimates") is not None
+        ):
+            self.cache.bypass()
+            return None
+        fields = self._backend_context(context, session)
+        fields["content_version"] = self.catalog.version
+        return cache_key(prompt, fields)
+
+    def _result(self, text: str, session: SessionContext) -> Dict[str, Any]:
+        return {
+            "id": str(uuid.uuid4()),
+            "text": text,
+            "raw": text,
+            "given_problems": session.given_problems
+        }
+
+    def _backend_context(self, context: Dict[str, Any], session: SessionContext) -> Dict[str, Any]:
+        return {
+            "subject": context.get("subject") or session.subject,
+            "topic": context.get("topic") or session.topic,
+            "skill": context.get("skill"),
+            "difficulty": context.get("difficulty"),
+        }
+
+    def _session_for(self, context: Dict[str, Any]) -> SessionContext:
+        sid = context.get("session_id")
+        incoming_given = context.get("given_problems")
+
+        if sid is None:
+            session = SessionContext(window=self.sessions.window)
+            if incoming_given is not None:
+                session.given_problems = GivenProblems.coerce(incoming_given, self.problem_bank, self.sessions.window)
+            return session
 
-        return {"id": str(uuid.uuid4()), "text": "Real LLM not configured.", "raw": ""}
+        session = self.sessions.get(sid)
+        if incoming_given is not None:
+            session.given_problems.merge(GivenProblems.coerce(incoming_given, self.problem_bank))
+        return session
 
     # -------------------------------------------------------------------------
     # MOCK LOGIC
     # -------------------------------------------------------------------------
-    def _mock_response(self, prompt: str, context: Dict[str, Any]) -> str:
+    def _mock_response(
+        self, prompt: str, context: Dict[str, Any], session: SessionContext, route: Optional[RouteMatch] = None
+    ) -> str:
+        if route is None:
+            route = self.router.match(prompt)
+        if not METRICS.enabled:
+            return self._mock_branch(prompt, context, session, route)[1]
+
+        start = time.perf_counter()
+        branch, text = self._mock_branch(prompt, context, session, route)
+        METRICS.observe("llm_mock_branch_seconds", time.perf_counter() - start, branch=branch)
+        return text
+
+    def _mock_branch(
+        self, prompt: str, context: Dict[str, Any], session: SessionContext, route: RouteMatch
+    ) -> Tuple[str, str]:
+        """
+        Returns (branch name, response text) for the mock LLM.
+        """
         lower = (prompt.lower()).strip()
 
-        # sync incoming given_problems
-        incoming_given = context.get("given_problems")
-        if isinstance(incoming_given, dict):
-            for key, vals in incoming_given.items():
-                exist = self.given_problems.setdefault(key, [])
-                for item in vals:
-                    if item not in exist:
-                        exist.append(item)
-
         # TOPIC SETTING -------------------------------------------------------
         if lower.startswith("start topic:"):
             raw = prompt.split(":", 1)[1].strip()
             parts = [p.strip() for p in raw.split("|")]
 
             if len(parts) == 2:
-                self.current_subject, self.current_topic = parts
+                session.subject, session.topic = parts
             else:
-                self.current_subject, self.current_topic = None, parts[0]
+                session.subject, session.topic = None, parts[0]
+
+            return "start_topic", f"Topic set to '{session.topic}' (Subject: {session.subject}). You can now ask for explanations or practice problems."
 
-            return f"Topic set to '{self.current_topic}' (Subject: {self.current_subject}). You can now ask for explanations or practice problems."
+        # CUSTOM INTENTS ------------------------------------------------------
+        handler = self.intent_handlers.get(route.best)
+        if handler is not None:
+            return "handler", handler(prompt, context, session)
 
         # PRACTICE PROBLEM ASKING --------------------------------------------
-        practice_triggers = [
-            "practice problem", "another problem", "practice exercise",
-            "give me a basic problem"
-        ]
-        if any(t in lower for t in practice_triggers):
-            return self._serve_practice_problem(context)
+        if "practice" in route:
+            return "practice", self._serve_practice_problem(context, session)
 
         # EXPLANATION REQUEST -------------------------------------------------
-        explain_triggers = ["explain", "define", "what is", "explain more", "show me the solution"]
-        if any(t in lower for t in explain_triggers):
-            direct = self._direct_answer(prompt)
+        if "explain" in route:
+            direct = self._direct_answer(prompt, route)
             if direct:
-                return direct
-            return self._topic_explanation(context)
+                return "direct_answer", direct
+            return "explain", self._topic_explanation(context, session)
 
         # RECOMMENDATION HOOK -------------------------------------------------
-        if "generate a practice" in lower:
+        if "recommend" in route:
             skill = context.get("skill") or "General"
             difficulty = context.get("difficulty")
             q, h = self._sample_for_skill(skill, difficulty)
-            return f"Practice Question for {skill}:\n• {q}\nHint: {h}"
+            return "recommend", f"Practice Question for {skill}:\n• {q}\nHint: {h}"
 
         # Weak skill fallback
         if isinstance(context.get("skill_estimates"), dict):
             se = context["skill_estimates"]
             top3 = sorted(se.items(), key=lambda x: x[1])[:3]
             if top3:
-                return "Top weak skills: " + ", ".join([f"{k}({v:.2f})" for k, v in top3])
+                return "weak_skills", "Top weak skills: " + ", ".join([f"{k}({v:.2f})" for k, v in top3])
 
         # Default fallback
-        return "I'm here to help! Start with 'Start topic: Subject|Topic' or ask for a practice problem."
+        return "default", "I'm here to help! Start with 'Start topic: Subject|Topic' or ask for a practice problem."
 
     # -------------------------------------------------------------------------
     # PRACTICE PROBLEM ENGINE
     # -------------------------------------------------------------------------
-    def _serve_practice_problem(self, context: Dict[str, Any]) -> str:
-        subj = context.get("subject") or self.current_subject
-        topic = context.get("topic") or self.current_topic
+    def _serve_practice_problem(self, context: Dict[str, Any], session: SessionContext) -> str:
+        subj = context.get("subject") or session.subject
+        topic = context.get("topic") or session.topic
 
         key = f"{subj}|{topic}" if subj else (topic or "General")
+        if key not in self.problem_bank:
+            # Free-text topic or subject spelling ("Mathematics|Fraction"): closest pool
+            key = self.retriever.resolve_pool(subj, topic) or key
 
-        pool = self._get_problem_bank(subj, topic)
-
-        # Filter out previously given problems
-        used = self.given_problems.get(key, [])
-        remaining = [p for p in pool if p not in used]
-
-        # If exhausted, reset
-        if not remaining:
-            remaining = pool[:]
-            self.given_problems[key] = []
-
-        q, h = random.choice(remaining)
-        self.given_problems.setdefault(key, []).append((q, h))
+        # Draw a problem that hasn't been given yet (resets once the pool is exhausted)
+        problem = session.given_problems.draw(self.problem_bank, key)
+        q, h = problem.question, problem.hint
 
         subj_display = subj or "General"
         topic_display = topic or "General"
@@ -122,64 +358,38 @@ class LLMAgent:
     # -------------------------------------------------------------------------
     # DIRECT SHORT EXPLANATIONS
     # -------------------------------------------------------------------------
-    def _direct_answer(self, prompt: str) -> Optional[str]:
-        p = prompt.lower()
-        if "newton" in p and "law" in p:
-            return "Newton’s laws: (1) Inertia, (2) F = m·a, (3) Action–Reaction."
-        if "what is integration" in p:
-            return "Integration finds areas, volumes, or antiderivatives."
-        if "what is derivative" in p:
-            return "The derivative measures rate of change: d/dx xⁿ = n·xⁿ⁻¹."
+    def _direct_answer(self, prompt: str, route: Optional[RouteMatch] = None) -> Optional[str]:
+        if route is None:
+            route = self.router.match(prompt)
+        for intent, _, answer in DIRECT_ANSWERS:
+            if intent in route:
+                return answer
         return None
 
     # -------------------------------------------------------------------------
     # TOPIC EXPLANATION ENGINE
     # -------------------------------------------------------------------------
-    def _topic_explanation(self, context: Dict[str, Any]) -> str:
-        subj = context.get("subject") or self.current_subject
-        topic = context.get("topic") or self.current_topic
+    def _topic_explanation(self, context: Dict[str, Any], session: SessionContext) -> str:
+        subj = context.get("subject") or session.subject
+        topic = context.get("topic") or session.topic
         return self._get_explanation(subj, topic)
 
     def _get_explanation(self, subject: Optional[str], topic: Optional[str]) -> str:
-        explanations = {
-            "fractions": "Fractions represent parts of a whole. Always make denominators equal before operating.",
-            "algebra": "Algebra is about solving for unknowns using equations.",
-            "integration": "Integration accumulates quantities—area under curves, volumes, etc.",
-            "calculus": "Calculus deals with derivatives (rates) and integrals (accumulations).",
-            "mechanics": "Mechanics studies forces, motion, and Newton’s laws.",
-            "geometry": "Geometry covers shapes, angles, area, perimeter, and volume.",
-            "chemistry": "Chemistry studies atoms, molecules, reactions, and equations.",
-            "biology": "Biology studies life processes, cells, genetics, and evolution.",
-            "history": "History deals with past events, civilizations, and timelines.",
-        }
-
-        key = (topic or subject or "").lower()
-        return explanations.get(
-            key,
-            f"Explanation for {topic or 'General'} (Subject: {subject or 'General'}) not available. Try a practice problem!"
-        )
+        explanation = self.catalog.explanation(subject, topic)
+        if explanation is not None:
+            return explanation
+        match = self.retriever.resolve_explanation(subject, topic)
+        if match is not None:
+            return self.catalog.content.explanations[match]
+        return f"Explanation for {topic or 'General'} (Subject: {subject or 'General'}) not available. Try a practice problem!"
 
     # -------------------------------------------------------------------------
     # SAMPLE PROBLEMS FOR RECOMMENDATION MODE
     # -------------------------------------------------------------------------
     def _sample_for_skill(self, skill: str, difficulty: Optional[str]) -> Tuple[str, str]:
-        skill = skill.lower()
-
-        bank = {
-            "fractions": ("Add 1/2 + 3/4", "Find a common denominator."),
-            "algebra": ("Solve 2x + 5 = 11", "Isolate x."),
-            "integration": ("∫ x ln(x) dx", "Use integration by parts."),
-            "calculus": ("Differentiate x³", "Use power rule."),
-            "mechanics": ("F=20N, m=4kg → a?", "Use a=F/m."),
-            "geometry": ("Find area of triangle base=5, height=6", "Use ½bh."),
-            "chemistry": ("Balance: H₂ + O₂ → H₂O", "Balance atoms."),
-            "biology": ("What is a cell?", "Basic structural unit of life."),
-            "history": ("When did India gain independence?", "1947.")
-        }
-
-        for k, v in bank.items():
-            if k in skill:
-                return v
+        sample = self.catalog.sample_for_skill(skill)
+        if sample is not None:
+            return sample
 
         return ("Solve a basic problem.", "Think carefully!")
 
@@ -187,31 +397,7 @@ class LLMAgent:
     # PROBLEM BANK FOR NON-REPEATING QUESTIONS
     # -------------------------------------------------------------------------
     def _get_problem_bank(self, subject: Optional[str], topic: Optional[str]) -> List[Tuple[str, str]]:
-        pools = {
-            "Math|fractions": [
-                ("1/2 + 3/4 = ?", "Use common denominator."),
-                ("5/6 - 1/3 = ?", "Convert to like terms.")
-            ],
-            "Math|algebra": [
-                ("Solve 2x + 5 = 11", "Isolate x."),
-                ("Factor x² - 5x + 6", "Find two numbers that multiply to 6.")
-            ],
-            "Physics|mechanics": [
-                ("F=10N, m=2kg → a=?", "Use a=F/m."),
-                ("A car accelerates from 0–20 m/s in 4s → a=?", "Use Δv / t.")
-            ],
-            "Chemistry|atomic structure": [
-                ("How many electrons fit in n=3 shell?", "Use 2n²."),
-                ("Define valence shell.", "Outer electron shell.")
-            ],
-            "Biology|genetics": [
-                ("Probability of AB in AaBb x AaBb?", "Use Punnett square."),
-                ("Define genotype.", "Genetic makeup.")
-            ],
-        }
-
-        key = f"{subject}|{topic}"
-        return pools.get(key, [("Solve a basic problem.", "Think carefully!")])
+        return [(p.question, p.hint) for p in self.problem_bank.pool(f"{subject}|{topic}")]
 
     # -------------------------------------------------------------------------
     # PUBLIC HELPER
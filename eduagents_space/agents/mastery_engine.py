@@ -0,0 +1,139 @@
+# agents/mastery_engine.py
+"""
+Columnar mastery engine.
+
+Computes per-(student, skill) mastery for a whole interaction log in one
+grouped pandas/NumPy pass instead of walking rows one by one.
+
+Two log schemas are accepted:
+  - 'student_id', 'skill', 'score'            (score in 0–1 or 0–100)
+  - 'student_id', 'skill', 'correct', ...     (dataset_sample/student_sessions.csv)
+"""
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+from agents.skill_agent import ALL_SKILLS
+
+
+# -------------------------------------------------------------------------
+# COLUMN HELPERS
+# -------------------------------------------------------------------------
+def score_values(df: pd.DataFrame) -> np.ndarray:
+    """
+    Returns the per-row score as a float64 array in the 0–1 range.
+    Uses 'score' when present (values > 1 are treated as percentages),
+    otherwise falls back to the 0/1 'correct' column.
+    """
+    if "score" in df.columns:
+        vals = pd.to_numeric(df["score"], errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)
+        return np.where(vals > 1.0, vals / 100.0, vals)
+    if "correct" in df.columns:
+        return pd.to_numeric(df["correct"], errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)
+    return np.zeros(len(df), dtype=np.float64)
+
+
+def skill_values(df: pd.DataFrame) -> pd.Series:
+    return df["skill"].astype(str).str.strip()
+
+
+def timestamp_values(df: pd.DataFrame) -> np.ndarray:
+    """
+    Parses the 'timestamp' column to float epoch seconds (NaN when unparseable).
+    Numbers (and numeric strings) are epoch seconds; date strings may mix UTC
+    offsets, and naive ones are read as UTC.
+    """
+    col = df["timestamp"]
+    if pd.api.types.is_datetime64_any_dtype(col):
+        ts = pd.to_datetime(col, utc=True)
+        return ((ts - _EPOCH) / pd.Timedelta(seconds=1)).to_numpy(dtype=np.float64, na_value=np.nan)
+
+    secs = pd.to_numeric(col, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+    text = np.isnan(secs) & col.notna().to_numpy()
+    if text.any():
+        ts = pd.to_datetime(col[text], errors="coerce", utc=True, format="mixed")
+        secs[text] = ((ts - _EPOCH) / pd.Timedelta(seconds=1)).to_numpy(dtype=np.float64, na_value=np.nan)
+    return secs
+
+
+_EPOCH = pd.Timestamp(0, tz="UTC")
+
+
+# -------------------------------------------------------------------------
+# AGGREGATION
+# -------------------------------------------------------------------------
+def aggregate_mastery(df: pd.DataFrame, by_student: bool = True) -> pd.DataFrame:
+    """
+    Reduces an interaction log to running aggregates.
+    Returns a DataFrame with columns ['student_id', 'skill', 'total', 'count'],
+    plus 'last_seen' (epoch seconds) when df has a 'timestamp' column.
+    'student_id' is omitted when by_student is False.
+    """
+    keys = ["student_id", "skill"] if by_student else ["skill"]
+    frame = pd.DataFrame({"skill": skill_values(df), "score": score_values(df)})
+    if by_student:
+        frame["student_id"] = df["student_id"].astype(str).to_numpy()
+
+    aggs = {"total": ("score", "sum"), "count": ("score", "count")}
+    if "timestamp" in df.columns:
+        frame["ts"] = timestamp_values(df)
+        aggs["last_seen"] = ("ts", "max")
+
+    return frame.groupby(keys, sort=False).agg(**aggs).reset_index()
+
+
+def mastery_table(
+    aggregates: pd.DataFrame,
+    default_mastery: float = 0.65,
+    skills: Sequence[str] = ALL_SKILLS
+) -> pd.DataFrame:
+    """
+    Turns aggregates from aggregate_mastery() into a students × skills table.
+    Unknown skills are dropped and unseen skills get default_mastery.
+    """
+    agg = aggregates[aggregates["skill"].isin(skills)]
+    mean = (agg["total"] / agg["count"]).clip(0.0, 1.0)
+    table = (
+        pd.DataFrame({"student_id": agg["student_id"], "skill": agg["skill"], "mastery": mean})
+        .pivot(index="student_id", columns="skill", values="mastery")
+    )
+    students = aggregates["student_id"].unique()
+    return table.reindex(index=students, columns=list(skills)).fillna(default_mastery)
+
+
+# -------------------------------------------------------------------------
+# PUBLIC ENTRY POINTS
+# -------------------------------------------------------------------------
+def compute_mastery(
+    df: pd.DataFrame,
+    default_mastery: float = 0.65,
+    skills: Sequence[str] = ALL_SKILLS
+) -> Dict[str, Dict[str, float]]:
+    """
+    Returns {student_id: {skill: mastery (0–1)}} for every student in df.
+    """
+    if len(df) == 0:
+        return {}
+    table = mastery_table(aggregate_mastery(df), default_mastery, skills)
+    return table.to_dict(orient="index")
+
+
+def compute_single_mastery(
+    df: pd.DataFrame,
+    default_mastery: float = 0.65,
+    skills: Sequence[str] = ALL_SKILLS
+) -> Dict[str, float]:
+    """
+    Returns {skill: mastery} treating every row in df as the same student.
+    """
+    mastery: Dict[str, float] = {s: default_mastery for s in skills}
+    if len(df) == 0:
+        return mastery
+    agg = aggregate_mastery(df, by_student=False)
+    means = (agg["total"] / agg["count"]).clip(0.0, 1.0)
+    for skill, value in zip(agg["skill"], means):
+        if skill in mastery:
+            mastery[skill] = float(value)
+    return mastery
+
@@ -0,0 +1,183 @@
+# agents/mastery_store.py
+"""
+Incremental mastery store.
+
+Keeps running sums, counts and an optional exponentially-decayed mean per
+(student, skill), so recording an answer touches exactly one skill and
+reads never rescan the history.
+"""
+from typing import Dict, Iterable, Any, Optional, List
+
+from agents.skill_agent import ALL_SKILLS
+
+
+def normalize_score(val: Any) -> float:
+    val = float(val)
+    if val > 1.0:
+        val /= 100.0
+    return val
+
+
+class SkillStats:
+    __slots__ = ("total", "count", "ema", "last_seen")
+
+    def __init__(self):
+        self.total = 0.0
+        self.count = 0
+        self.ema = 0.0
+        self.last_seen: Optional[float] = None
+
+
+class MasteryStore:
+    """
+    Running per-student, per-skill mastery aggregates.
+
+    decay: weight of the newest answer in the exponentially-decayed mean
+           (e.g. 0.3). None reports the plain mean, like SkillAgent does.
+    """
+
+    def __init__(self, default_mastery: float = 0.65, decay: Optional[float] = None):
+        if decay is not None and not 0.0 < decay <= 1.0:
+            raise ValueError("decay must be in (0, 1]")
+        self.default_mastery = default_mastery
+        self.decay = decay
+
+        # { student_id: { skill: SkillStats } }
+        self._stats: Dict[str, Dict[str, SkillStats]] = {}
+        # { student_id: { skill: mastery } } kept in sync on every update
+        self._snapshots: Dict[str, Dict[str, float]] = {}
+
+    # -------------------------------------------------------------------------
+    # WRITES
+    # -------------------------------------------------------------------------
+    def update(self, student_id: str, skill: str, score: Any, timestamp: Optional[float] = None) -> float:
+        """
+        Records one answer and returns the new mastery for that skill. O(1).
+        """
+        return self.add_aggregate(student_id, skill, normalize_score(score), 1, timestamp)
+
+    def add_aggregate(
+        self,
+        student_id: str,
+        skill: str,
+        total: float,
+        count: int,
+        last_seen: Optional[float] = None
+    ) -> float:
+        """
+        Folds a pre-aggregated batch (sum of normalized scores, number of
+        answers) into one skill. The decayed mean treats the batch as `count`
+        answers that all scored the batch mean.
+        """
+        skill = str(skill).strip()
+        if count <= 0:
+            return self.get(student_id, skill)
+
+        st = self._stats.setdefault(student_id, {}).get(skill)
+        if st is None:
+            st = self._stats[student_id][skill] = SkillStats()
+
+        if self.decay is not None:
+            batch_mean = total / count
+            if st.count == 0:
+                st.ema = batch_mean
+            else:
+                weight = 1.0 - (1.0 - self.decay) ** count
+                st.ema += weight * (batch_mean - st.ema)
+
+        st.total += total
+        st.count += count
+        if last_seen is not None and (st.last_seen is None or last_seen > st.last_seen):
+            st.last_seen = last_seen
+
+        value = self._mastery(st)
+        snap = self._snapshots.get(student_id)
+        if snap is not None and skill in snap:
+            snap[skill] = value
+        return value
+
+    def update_many(self, student_id: str, history: Iterable[Dict[str, Any]]) -> None:
+        """
+        Records a list of dicts [{'skill':..., 'score':...}, ...] for one student.
+        """
+        for row in history:
+            self.update(student_id, row.get("skill"), row.get("score", 0), row.get("timestamp"))
+
+    def forget(self, student_id: str) -> None:
+        self._stats.pop(student_id, None)
+        self._snapshots.pop(student_id, None)
+
+    # -------------------------------------------------------------------------
+    # READS
+    # -------------------------------------------------------------------------
+    def get(self, student_id: str, skill: str) -> float:
+        st = self._stats.get(student_id, {}).get(skill)
+        if st is None or st.count == 0:
+            return self.default_mastery
+        return self._mastery(st)
+
+    def stats(self, student_id: str, skill: str) -> Optional[SkillStats]:
+        return self._stats.get(student_id, {}).get(skill)
+
+    def snapshot(self, student_id: str) -> Dict[str, float]:
+        """
+        Returns {skill: mastery} over ALL_SKILLS, in the same shape as
+        SkillAgent.estimate_from_history. Built once per student and then
+        patched in place by update(), so this is a plain dict copy.
+        """
+        snap = self._snapshots.get(student_id)
+        if snap is None:
+            stats = self._stats.get(student_id, {})
+            snap = {
+                s: self._mastery(stats[s]) if s in stats and stats[s].count else self.default_mastery
+                for s in ALL_SKILLS
+            }
+            self._snapshots[student_id] = snap
+        return dict(snap)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        JSON-serializable state: {student: {skill: [total, count, ema, last_seen]}}.
+        """
+        return {
+            "default_mastery": self.default_mastery,
+            "decay": self.decay,
+            "stats": {
+                sid: {skill: [st.total, st.count, st.ema, st.last_seen] for skill, st in skills.items()}
+                for sid, skills in self._stats.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MasteryStore":
+        store = cls(data.get("default_mastery", 0.65), data.get("decay"))
+        store.load_dict(data)
+        return store
+
+    def load_dict(self, data: Dict[str, Any]) -> None:
+        """
+        Replaces this store's aggregates with those in data (see to_dict).
+        """
+        self._stats = {}
+        self._snapshots = {}
+        for sid, skills in data.get("stats", {}).items():
+            per_skill = self._stats[sid] = {}
+            for skill, (total, count, ema, last_seen) in skills.items():
+                st = per_skill[skill] = SkillStats()
+                st.total, st.count, st.ema, st.last_seen = total, count, ema, last_seen
+
+    def students(self) -> List[str]:
+        return list(self._stats.keys())
+
+    def __contains__(self, student_id: str) -> bool:
+        return student_id in self._stats
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    # -------------------------------------------------------------------------
+    # INTERNALS
+    # -------------------------------------------------------------------------
+    def _mastery(self, st: SkillStats) -> float:
+        value = st.ema if self.decay is not None else st.total / st.count
+        return max(0.0, min(1.0, value))
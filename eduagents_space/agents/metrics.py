@@ -0,0 +1,292 @@
+# agents/metrics.py
+"""
+In-process metrics: counters, timers (histograms) and spans, exported as
+Prometheus text or as a plain snapshot dict, plus an optional sampling
+profiler.
+
+Metrics are off unless EDUAGENTS_METRICS=1 is set or enable() is called.
+While off, every hook returns after one attribute check and records nothing.
+
+    from agents.metrics import METRICS
+    METRICS.enable()
+    with METRICS.span("recommend_seconds", stage="prompts"):
+        ...
+    METRICS.inc("llm_cache_total", result="hit")
+    print(METRICS.prometheus())
+"""
+import bisect
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+PREFIX = "eduagents_"
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, Any]) -> LabelKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    # Whole counts in full ("1234567", not ":g"'s "1.23457e+06")
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _label_text(labels: Tuple[Tuple[str, str], ...], extra: str = "") -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Timer:
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("metrics", "key", "start")
+
+    def __init__(self, metrics: "Metrics", key: LabelKey):
+        self.metrics = metrics
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics._observe(self.key, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counters: Dict[LabelKey, float] = {}
+        self._timers: Dict[LabelKey, _Timer] = {}
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+    # -------------------------------------------------------------------------
+    # RECORDING
+    # -------------------------------------------------------------------------
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        if not self.enabled:
+            return
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        if not self.enabled:
+            return
+        self._observe(_key(name, labels), seconds)
+
+    def _observe(self, key: LabelKey, seconds: float) -> None:
+        with self._lock:
+            timer = self._timers.get(key)
+            if timer is None:
+                timer = self._timers[key] = _Timer()
+            timer.observe(seconds)
+
+    def span(self, name: str, **labels):
+        """
+        Context manager timing its block into the `name` histogram.
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self, _key(name, labels))
+
+    def timed(self, name: str, **labels) -> Callable:
+        """
+        Decorator timing every call into the `name` histogram.
+        """
+        key = _key(name, labels)
+
+        def wrap(fn):
+            @functools.wraps(fn)
+            def inner(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self._observe(key, time.perf_counter() - start)
+            return inner
+
+        return wrap
+
+    # -------------------------------------------------------------------------
+    # EXPORT
+    # -------------------------------------------------------------------------
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        {"counters": {"name{labels}": value},
+         "timers": {"name{labels}": {"count", "sum", "mean", "max"}}}
+        """
+        with self._lock:
+            counters = {name + _label_text(labels): v for (name, labels), v in self._counters.items()}
+            timers = {
+                name + _label_text(labels): {
+                    "count": t.count,
+                    "sum": t.total,
+                    "mean": t.total / t.count if t.count else 0.0,
+                    "max": t.max,
+                }
+                for (name, labels), t in self._timers.items()
+            }
+        return {"counters": counters, "timers": timers}
+
+    def prometheus(self) -> str:
+        """
+        Prometheus text exposition format (version 0.0.4).
+        """
+        lines: List[str] = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            timers = sorted((k, (t.count, t.total, list(t.buckets))) for k, t in self._timers.items())
+
+        typed = set()
+        for (name, labels), value in counters:
+            metric = PREFIX + name
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_label_text(labels)} {_number(value)}")
+
+        for (name, labels), (count, total, buckets) in timers:
+            metric = PREFIX + name
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} histogram")
+            running = 0
+            for bound, n in zip(BUCKETS + (float("inf"),), buckets):
+                running += n
+                le = '"+Inf"' if bound == float("inf") else f'"{bound:g}"'
+                lines.append(f"{metric}_bucket{_label_text(labels, 'le=' + le)} {running}")
+            lines.append(f"{metric}_sum{_label_text(labels)} {total:.9g}")
+            lines.append(f"{metric}_count{_label_text(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics(enabled=os.environ.get("EDUAGENTS_METRICS", "") not in ("", "0"))
+
+
+# -------------------------------------------------------------------------
+# SAMPLING PROFILER
+# -------------------------------------------------------------------------
+class SamplingProfiler:
+    """
+    Samples every thread's stack each `interval` seconds from a background
+    thread (sys._current_frames), with no tracing overhead on the sampled
+    code. Results are folded stacks ("outer;...;inner count"), the input
+    format of flamegraph.pl and speedscope.
+
+        with SamplingProfiler(interval=0.005) as prof:
+            run_load()
+        print(prof.top(10))
+    """
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SamplingProfiler":
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                names = []
+                while frame is not None and len(names) < self.max_depth:
+                    code = frame.f_code
+                    names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(names))] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {n}" for stack, n in self.stacks.most_common()) + "\n"
+
+    def top(self, n: int = 10) -> List[Tuple[str, int]]:
+        """
+        Functions most often on top of a sampled stack.
+        """
+        leaves: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(n)
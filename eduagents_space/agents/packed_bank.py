@@ -0,0 +1,438 @@
+# agents/packed_bank.py
+"""
+Read-only binary content pack, memory-mapped and shared between processes.
+
+A build step compiles the content catalog (problem pools, explanations,
+skill samples) into one file: a string heap with an offset table, plus
+fixed-width uint32 tables that refer to strings by ID. Workers mmap the
+file at startup, so every worker process on a host shares the same page
+cache pages instead of holding its own dicts of tuples; only the strings a
+request actually touches are decoded.
+
+    python -m agents.packed_bank build content.pack              # from agents/content/
+    python -m agents.packed_bank info content.pack
+    EDUAGENTS_CATALOG_PACK=content.pack python server.py --workers 8
+
+PackedProblemBank has the ProblemBank lookup API and PackedCatalog the
+ContentCatalog one, so LLMAgent (and RecommendationAgent through it) use
+them unchanged. Problem IDs and pool positions match ProblemBank.from_pools
+on the same pools, so GivenProblems masks stay valid across both.
+
+Layout: MAGIC, uint32 header length, JSON header {section: [offset, length]},
+then 8-byte aligned sections in native byte order (checked on open).
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from agents.problem_bank import FALLBACK_PROBLEM, Problem, ProblemBank, draw_position, skill_key
+
+MAGIC = b"EDUPACK1"
+NONE = 0xFFFFFFFF
+
+# Columns per row of each uint32 table
+PROBLEM_COLS = 5   # key, question, hint, skill, difficulty (NONE when unset)
+POOL_COLS = 3      # key, first problem ID, count; sorted by key
+# pool_slots: open-addressing table (crc32 of the key, linear probing) of pool rows
+GROUP_COLS = 4     # skill, difficulty, first index into skill_ids, count; sorted
+PAIR_COLS = 2      # explanations (key, text) and aliases (skill, sample), sorted by key
+SAMPLE_COLS = 3    # key, question, hint; in catalog order
+
+
+# -------------------------------------------------------------------------
+# BUILD
+# -------------------------------------------------------------------------
+class _Strings:
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.data = bytearray()
+        self.offsets = array("Q", [0])
+
+    def add(self, s: Optional[str]) -> int:
+        if s is None:
+            return NONE
+        sid = self.ids.get(s)
+        if sid is None:
+            sid = self.ids[s] = len(self.offsets) - 1
+            self.data += s.encode("utf-8")
+            self.offsets.append(len(self.data))
+        return sid
+
+
+def write_pack(
+    path: str,
+    bank: ProblemBank,
+    explanations: Optional[Dict[str, str]] = None,
+    samples: Sequence[Tuple[str, Tuple[str, str]]] = (),
+    aliases: Optional[Dict[str, Tuple[str, str]]] = None
+) -> None:
+    """
+    Writes bank (and optionally the catalog's explanations, substring
+    sample keys and skill aliases) to path, atomically.
+    """
+    strings = _Strings()
+    problems = array("I")
+    for p in bank.problems:
+        problems.extend((strings.add(p.key), strings.add(p.question), strings.add(p.hint),
+                         strings.add(p.skill), strings.add(p.difficulty)))
+
+    pools = array("I")
+    keys = sorted(bank.keys(), key=lambda k: k.encode("utf-8"))
+    slots = array("I", [NONE]) * (1 << max(3, (2 * len(keys)).bit_length()))
+    for row, key in enumerate(keys):
+        pool = bank.pool(key)
+        pools.extend((strings.add(key), pool[0].id, len(pool)))
+        slot = zlib.crc32(key.encode("utf-8")) & (len(slots) - 1)
+        while slots[slot] != NONE:
+            slot = (slot + 1) & (len(slots) - 1)
+        slots[slot] = row
+
+    # Problem IDs grouped by skill (difficulty NONE = all difficulties), in ID order
+    groups: Dict[Tuple[str, Optional[str]], List[int]] = {}
+    for p in bank.problems:
+        groups.setdefault((p.skill, None), []).append(p.id)
+        if p.difficulty is not None:
+            groups.setdefault((p.skill, p.difficulty), []).append(p.id)
+    skill_rows, skill_ids = array("I"), array("I")
+    for skill, difficulty in sorted(groups, key=lambda g: (g[0].encode("utf-8"), g[1] is not None, g[1] or "")):
+        ids = groups[(skill, difficulty)]
+        skill_rows.extend((strings.add(skill), strings.add(difficulty), len(skill_ids), len(ids)))
+        skill_ids.extend(ids)
+
+    expl = array("I")
+    for key, text in sorted((explanations or {}).items(), key=lambda kv: kv[0].encode("utf-8")):
+        expl.extend((strings.add(key), strings.add(text)))
+
+    sample_rows = array("I")
+    sample_index: Dict[Tuple[str, str], int] = {}
+    for key, (q, h) in samples:
+        sample_index.setdefault((q, h), len(sample_rows) // SAMPLE_COLS)
+        sample_rows.extend((strings.add(key), strings.add(q), strings.add(h)))
+    alias_rows = array("I")
+    for skill, sample in sorted((aliases or {}).items(), key=lambda kv: kv[0].encode("utf-8")):
+        if tuple(sample) not in sample_index:
+            sample_index[tuple(sample)] = len(sample_rows) // SAMPLE_COLS
+            sample_rows.extend((NONE, strings.add(sample[0]), strings.add(sample[1])))
+        alias_rows.extend((strings.add(skill), sample_index[tuple(sample)]))
+
+    sections = {
+        "str_offsets": strings.offsets.tobytes(),
+        "str_data": bytes(strings.data),
+        "problems": problems.tobytes(),
+        "pools": pools.tobytes(),
+        "pool_slots": slots.tobytes(),
+        "skill_groups": skill_rows.tobytes(),
+        "skill_ids": skill_ids.tobytes(),
+        "explanations": expl.tobytes(),
+        "samples": sample_rows.tobytes(),
+        "aliases": alias_rows.tobytes(),
+    }
+
+    # Header size depends on the offsets it lists, so lay out with a fixed reserve
+    reserve = 1024
+    offset, layout = len(MAGIC) + 4 + reserve, {}
+    for name, blob in sections.items():
+        offset += -offset % 8
+        layout[name] = [offset, len(blob)]
+        offset += len(blob)
+    header = json.dumps({"byteorder": sys.byteorder, "sections": layout}).encode("utf-8")
+    if len(header) > reserve:
+        raise ValueError("pack header does not fit")
+
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(header)) + header.ljust(reserve, b" "))
+        for name, blob in sections.items():
+            f.write(b"\0" * (layout[name][0] - f.tell()))
+            f.write(blob)
+    os.replace(tmp, path)
+
+
+def build_from_catalog(path: str, catalog=None) -> None:
+    """
+    Packs a ContentCatalog (the default agents/content/ one if not given).
+    """
+    from agents.catalog import ContentCatalog
+
+    content = (catalog or ContentCatalog()).content
+    write_pack(path, content.problem_bank, content.explanations, content.sample_keys, content.aliases)
+
+
+# -------------------------------------------------------------------------
+# READ
+# -------------------------------------------------------------------------
+class PackFile:
+    """
+    The mapped file: string lookup and zero-copy uint32 tables.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a content pack")
+        (size,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+        header = json.loads(bytes(self._mm[len(MAGIC) + 4:len(MAGIC) + 4 + size]))
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path} was built on a {header['byteorder']}-endian machine")
+
+        view = memoryview(self._mm)
+        self._sections = {}
+        for name, (offset, length) in header["sections"].items():
+            fmt = "Q" if name == "str_offsets" else "B" if name == "str_data" else "I"
+            self._sections[name] = view[offset:offset + length].cast(fmt)
+        self.str_offsets = self._sections["str_offsets"]
+        self.str_data = self._sections["str_data"]
+        self._str_base = header["sections"]["str_data"][0]
+
+    def table(self, name: str):
+        return self._sections[name]
+
+    def string(self, sid: int) -> Optional[str]:
+        if sid == NONE:
+            return None
+        return self.raw(sid).decode("utf-8")
+
+    def raw(self, sid: int) -> bytes:
+        # Slicing the mmap copies just these bytes, cheaper than a memoryview slice
+        base, offsets = self._str_base, self.str_offsets
+        return self._mm[base + offsets[sid]:base + offsets[sid + 1]]
+
+    def find(self, name: str, cols: int, key: bytes, lo_col: int = 0) -> int:
+        """
+        Row index of key in a table sorted by the string in column lo_col, or -1.
+        """
+        table = self._sections[name]
+        lo, hi = 0, len(table) // cols
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.raw(table[mid * cols + lo_col]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(table) // cols and self.raw(table[lo * cols + lo_col]) == key:
+            return lo
+        return -1
+
+    @property
+    def size(self) -> int:
+        return len(self._mm)
+
+    def close(self) -> None:
+        for section in self._sections.values():
+            section.release()
+        self._sections.clear()
+        self._mm.close()
+
+
+class PackedProblemBank:
+    """
+    ProblemBank API over a PackFile. Problems are built on access.
+    """
+
+    def __init__(self, pack):
+        self.pack = pack if isinstance(pack, PackFile) else PackFile(pack)
+        self._problems = self.pack.table("problems")
+        self._pools = self.pack.table("pools")
+        self._slots = self.pack.table("pool_slots")
+        self._groups = self.pack.table("skill_groups")
+        self._skill_ids = self.pack.table("skill_ids")
+        self._fallback = (Problem(-1, "", FALLBACK_PROBLEM[0], FALLBACK_PROBLEM[1], ""),)
+        self._pool_row = lru_cache(maxsize=4096)(self._find_pool)
+
+    def problem(self, pid: int) -> Problem:
+        t, i, s = self._problems, pid * PROBLEM_COLS, self.pack.string
+        return Problem(pid, s(t[i]), s(t[i + 1]), s(t[i + 2]), s(t[i + 3]), s(t[i + 4]))
+
+    @property
+    def problems(self) -> Tuple[Problem, ...]:
+        return tuple(self.problem(i) for i in range(len(self)))
+
+    def _find_pool(self, key: str) -> Tuple[int, int]:
+        raw, slots, pools = key.encode("utf-8"), self._slots, self._pools
+        mask = len(slots) - 1
+        slot = zlib.crc32(raw) & mask
+        while True:
+            row = slots[slot]
+            if row == NONE:
+                return -1, 0
+            if self.pack.raw(pools[row * POOL_COLS]) == raw:
+                return pools[row * POOL_COLS + 1], pools[row * POOL_COLS + 2]
+            slot = (slot + 1) & mask
+
+    # -------------------------------------------------------------------------
+    # LOOKUPS
+    # -------------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._problems) // PROBLEM_COLS
+
+    def __contains__(self, key: str) -> bool:
+        return self._pool_row(key)[0] >= 0
+
+    def keys(self) -> List[str]:
+        # In problem ID order, like ProblemBank
+        rows = range(len(self._pools) // POOL_COLS)
+        rows = sorted(rows, key=lambda r: self._pools[r * POOL_COLS + 1])
+        return [self.pack.string(self._pools[r * POOL_COLS]) for r in rows]
+
+    def pool(self, key: str) -> Tuple[Problem, ...]:
+        first, count = self._pool_row(key)
+        if first < 0:
+            return self._fallback
+        return tuple(self.problem(first + i) for i in range(count))
+
+    def for_skill(self, skill: str, difficulty: Optional[str] = None) -> Tuple[Problem, ...]:
+        table, want = self._groups, skill_key(skill).encode("utf-8")
+        row = self.pack.find("skill_groups", GROUP_COLS, want)
+        if row < 0:
+            return ()
+        n = len(table) // GROUP_COLS
+        while row < n and self.pack.raw(table[row * GROUP_COLS]) == want:
+            diff = self.pack.string(table[row * GROUP_COLS + 1])
+            if diff == difficulty:
+                start, count = table[row * GROUP_COLS + 2], table[row * GROUP_COLS + 3]
+                return tuple(self.problem(pid) for pid in self._skill_ids[start:start + count])
+            row += 1
+        return ()
+
+    def position(self, key: str, item: Tuple[str, str]) -> Optional[int]:
+        first, count = self._pool_row(key)
+        if first < 0:
+            return 0 if tuple(item) == FALLBACK_PROBLEM else None
+        for pos in range(count):
+            p = self.problem(first + pos)
+            if (p.question, p.hint) == tuple(item):
+                return pos
+        return None
+
+    # -------------------------------------------------------------------------
+    # NON-REPEATING DRAWS
+    # -------------------------------------------------------------------------
+    def draw(self, key: str, used_mask: int = 0, rng=None) -> Tuple[Problem, int]:
+        first, count = self._pool_row(key)
+        if first < 0:
+            pos, new_mask = draw_position(1, used_mask, rng)
+            return self._fallback[0], new_mask
+        pos, new_mask = draw_position(count, used_mask, rng)
+        return self.problem(first + pos), new_mask
+
+
+class PackedExplanations(Mapping):
+    """
+    { normalized topic: explanation } backed by the pack.
+    """
+
+    def __init__(self, pack: PackFile):
+        self.pack = pack
+        self._table = pack.table("explanations")
+
+    def __getitem__(self, key: str) -> str:
+        row = self.pack.find("explanations", PAIR_COLS, key.encode("utf-8"))
+        if row < 0:
+            raise KeyError(key)
+        return self.pack.string(self._table[row * PAIR_COLS + 1])
+
+    def __iter__(self) -> Iterator[str]:
+        for row in range(len(self)):
+            yield self.pack.string(self._table[row * PAIR_COLS])
+
+    def __len__(self) -> int:
+        return len(self._table) // PAIR_COLS
+
+
+class PackedCatalog:
+    """
+    ContentCatalog lookups over a pack. The pack is immutable; rebuild the
+    file (atomically) and restart workers to change content.
+    """
+
+    version = 0
+    reload_interval = None
+
+    def __init__(self, path: str):
+        from agents.catalog import normalize
+
+        self._normalize = normalize
+        self.path = path
+        self.pack = PackFile(path)
+        self.problem_bank = PackedProblemBank(self.pack)
+        self.explanations = PackedExplanations(self.pack)
+        self._samples = self.pack.table("samples")
+        self._aliases = self.pack.table("aliases")
+        self.sample_for_skill = lru_cache(maxsize=4096)(self._sample_for)
+
+    @property
+    def content(self) -> "PackedCatalog":
+        # LLMAgent reads catalog.content.explanations
+        return self
+
+    def explanation(self, subject: Optional[str], topic: Optional[str]) -> Optional[str]:
+        return self.explanations.get(self._normalize(topic or subject))
+
+    def _sample(self, row: int) -> Tuple[str, str]:
+        s, t = self.pack.string, self._samples
+        return s(t[row * SAMPLE_COLS + 1]), s(t[row * SAMPLE_COLS + 2])
+
+    def _sample_for(self, skill: str) -> Optional[Tuple[str, str]]:
+        skill = skill.lower()
+        t = self._samples
+        # Substring keys in catalog order, matching ContentCatalog
+        for row in range(len(t) // SAMPLE_COLS):
+            if t[row * SAMPLE_COLS] != NONE and self.pack.string(t[row * SAMPLE_COLS]) in skill:
+                return self._sample(row)
+        row = self.pack.find("aliases", PAIR_COLS, self._normalize(skill).encode("utf-8"))
+        if row < 0:
+            return None
+        return self._sample(self._aliases[row * PAIR_COLS + 1])
+
+    def reload_if_changed(self) -> bool:
+        return False
+
+
+def pack_info(path: str) -> Dict[str, int]:
+    pack = PackFile(path)
+    try:
+        return {
+            "bytes": pack.size,
+            "strings": len(pack.str_offsets) - 1,
+            "problems": len(pack.table("problems")) // PROBLEM_COLS,
+            "pools": len(pack.table("pools")) // POOL_COLS,
+            "explanations": len(pack.table("explanations")) // PAIR_COLS,
+            "samples": len(pack.table("samples")) // SAMPLE_COLS,
+        }
+    finally:
+        pack.close()
+
+
+def main(argv: Optional[Iterable[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or inspect a memory-mapped content pack.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="compile agents/content/ (or --content-dir) into a pack")
+    build.add_argument("out")
+    build.add_argument("--content-dir", default=None)
+    info = sub.add_parser("info", help="print section sizes of a pack")
+    info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        from agents.catalog import ContentCatalog
+
+        catalog = ContentCatalog(args.content_dir) if args.content_dir else None
+        build_from_catalog(args.out, catalog)
+        print(json.dumps(pack_info(args.out)))
+    else:
+        print(json.dumps(pack_info(args.path), indent=2))
+
+
+if __name__ == "__main__":
+    main()
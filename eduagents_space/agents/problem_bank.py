@@ -0,0 +1,137 @@
+# agents/problem_bank.py
+"""
+Precompiled problem-bank index.
+
+Problems are numbered once at load time and indexed by "Subject|topic" pool,
+skill and (skill, difficulty). Non-repeating draws use a per-pool bitmask of
+used positions, so a draw is a few random probes instead of a list scan.
+"""
+import random
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+FALLBACK_PROBLEM = ("Solve a basic problem.", "Think carefully!")
+
+# Random probes tried before falling back to picking among the free positions.
+_PROBES = 8
+
+
+class Problem(NamedTuple):
+    id: int
+    key: str
+    question: str
+    hint: str
+    skill: str
+    difficulty: Optional[str] = None
+
+
+def skill_key(topic: Optional[str]) -> str:
+    return (topic or "").strip().lower().replace(" ", "_")
+
+
+class ProblemBank:
+    """
+    Read-only problem index. Build it once (see agents/catalog.py) and share it.
+    """
+
+    def __init__(self, problems: List[Problem]):
+        self.problems: Tuple[Problem, ...] = tuple(problems)
+
+        by_key: Dict[str, List[Problem]] = {}
+        by_skill: Dict[str, List[Problem]] = {}
+        by_difficulty: Dict[Tuple[str, Optional[str]], List[Problem]] = {}
+        for p in self.problems:
+            by_key.setdefault(p.key, []).append(p)
+            by_skill.setdefault(p.skill, []).append(p)
+            by_difficulty.setdefault((p.skill, p.difficulty), []).append(p)
+
+        self._by_key = {k: tuple(v) for k, v in by_key.items()}
+        self._by_skill = {k: tuple(v) for k, v in by_skill.items()}
+        self._by_difficulty = {k: tuple(v) for k, v in by_difficulty.items()}
+        # (key, (question, hint)) -> position inside its pool, for state that still holds tuples
+        self._position = {
+            (k, (p.question, p.hint)): pos
+            for k, pool in self._by_key.items() for pos, p in enumerate(pool)
+        }
+        self._fallback = (Problem(-1, "", FALLBACK_PROBLEM[0], FALLBACK_PROBLEM[1], ""),)
+
+    @classmethod
+    def from_pools(cls, pools: Dict[str, List[Tuple[str, str]]]) -> "ProblemBank":
+        problems = []
+        for key, items in pools.items():
+            topic = key.split("|", 1)[-1]
+            for q, h in items:
+                problems.append(Problem(len(problems), key, q, h, skill_key(topic)))
+        return cls(problems)
+
+    # -------------------------------------------------------------------------
+    # LOOKUPS
+    # -------------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.problems)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._by_key
+
+    def keys(self) -> List[str]:
+        return list(self._by_key.keys())
+
+    def pool(self, key: str) -> Tuple[Problem, ...]:
+        """
+        Problems for a "Subject|topic" key, or the single fallback problem.
+        """
+        return self._by_key.get(key, self._fallback)
+
+    def for_skill(self, skill: str, difficulty: Optional[str] = None) -> Tuple[Problem, ...]:
+        if difficulty is None:
+            return self._by_skill.get(skill_key(skill), ())
+        return self._by_difficulty.get((skill_key(skill), difficulty), ())
+
+    def position(self, key: str, item: Tuple[str, str]) -> Optional[int]:
+        """
+        Position of a (question, hint) tuple inside the pool for key.
+        """
+        if key not in self._by_key:
+            return 0 if tuple(item) == FALLBACK_PROBLEM else None
+        return self._position.get((key, tuple(item)))
+
+    # -------------------------------------------------------------------------
+    # NON-REPEATING DRAWS
+    # -------------------------------------------------------------------------
+    def draw(self, key: str, used_mask: int = 0, rng: random.Random = None) -> Tuple[Problem, int]:
+        """
+        Draws a problem from the pool for key whose position bit is not set in
+        used_mask. Returns (problem, new_mask). When every problem has been
+        used the mask starts over, matching the old "reset when exhausted" rule.
+        """
+        pool = self._by_key.get(key, self._fallback)
+        pos, new_mask = draw_position(len(pool), used_mask, rng)
+        return pool[pos], new_mask
+
+
+def draw_position(n: int, used_mask: int = 0, rng: random.Random = None) -> Tuple[int, int]:
+    """
+    Picks a random position in range(n) whose bit is not set in used_mask.
+    Returns (position, new_mask); a fully used mask starts over.
+    """
+    rng = rng or random
+    full = (1 << n) - 1
+
+    used_mask &= full
+    if used_mask == full:
+        used_mask = 0
+
+    pos = -1
+    for _ in range(_PROBES):
+        probe = rng.randrange(n)
+        if not used_mask >> probe & 1:
+            pos = probe
+            break
+
+    if pos < 0:
+        # Heavily used pool: pick uniformly among the free positions.
+        free = ~used_mask & full
+        for _ in range(rng.randrange(bin(free).count("1"))):
+            free &= free - 1
+        pos = (free & -free).bit_length() - 1
+
+    return pos, used_mask | (1 << pos)
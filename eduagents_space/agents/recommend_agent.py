@@ -1,19 +1,123 @@
 # agents/recommend_agent.py
+import heapq
 import uuid
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 
+from agents.metrics import METRICS
 from agents.skill_agent import ALL_SKILLS, SKILL_CATALOG
 
 
+# Mastery below which a skill is suggested as Easy, resp. Medium (else Hard)
+EASY_BELOW = 0.3
+MEDIUM_BELOW = 0.6
+
+
 # Map mastery -> difficulty suggestion
 def mastery_to_difficulty(m: float) -> str:
-    if m < 0.3:
+    if m < EASY_BELOW:
         return "Easy"
-    if m < 0.6:
+    if m < MEDIUM_BELOW:
         return "Medium"
     return "Hard"
 
 
+# Mastery range [low, high) of each difficulty bucket, matching mastery_to_difficulty
+DIFFICULTY_BOUNDS = {
+    "Easy": (float("-inf"), EASY_BELOW),
+    "Medium": (EASY_BELOW, MEDIUM_BELOW),
+    "Hard": (MEDIUM_BELOW, float("inf")),
+}
+
+
+class CandidateIndex:
+    """
+    Precomputed subject -> skill sets and difficulty buckets for picking the
+    k weakest eligible skills with a heap instead of sorting every estimate.
+    """
+
+    def __init__(self, skills: Sequence[str] = ALL_SKILLS):
+        self.skills = tuple(skills)
+        self.position = {s: i for i, s in enumerate(self.skills)}
+        self.subject_skills = {subj: tuple(dict.fromkeys(sk)) for subj, sk in SKILL_CATALOG.items()}
+        self.subject_sets = {subj: frozenset(sk) for subj, sk in SKILL_CATALOG.items()}
+
+    def select(
+        self,
+        estimates: Dict[str, float],
+        top_k: int,
+        subject_filter: Optional[str] = None,
+        difficulty_filter: Optional[str] = None
+    ) -> List[Tuple[str, float, str]]:
+        """
+        Returns up to top_k (skill, mastery, difficulty), weakest first.
+        Equal masteries keep the order of estimates.
+        """
+        if subject_filter:
+            allowed = self.subject_sets.get(subject_filter, frozenset())
+            items = ((s, m) for s, m in estimates.items() if s in allowed)
+        else:
+            items = iter(estimates.items())
+
+        if difficulty_filter:
+            low, high = DIFFICULTY_BOUNDS.get(difficulty_filter, (0.0, -1.0))
+            items = ((s, m) for s, m in items if low <= m < high)
+
+        weakest = heapq.nsmallest(top_k, items, key=lambda x: x[1])
+        return [(s, m, mastery_to_difficulty(m)) for s, m in weakest]
+
+    def select_batch(
+        self,
+        mastery,
+        top_k: int,
+        subject_filter: Optional[str] = None,
+        difficulty_filter: Optional[str] = None
+    ):
+        """
+        Vectorized select() for many students at once.
+
+        mastery: array-like of shape (students, len(self.skills)), columns in
+                 self.skills order (e.g. mastery_engine.mastery_table(...).to_numpy()).
+        Returns (skill_idx, values), both (students, top_k), weakest first;
+        slots with no eligible skill have skill_idx -1 and value NaN.
+        """
+        import numpy as np
+
+        m = np.asarray(mastery, dtype=np.float64)
+        n, width = m.shape
+        eligible = np.ones(width, dtype=bool)
+        if subject_filter:
+            eligible[:] = False
+            for s in self.subject_skills.get(subject_filter, ()):
+                if s in self.position:
+                    eligible[self.position[s]] = True
+
+        masked = np.where(eligible, m, np.inf)
+        if difficulty_filter:
+            low, high = DIFFICULTY_BOUNDS.get(difficulty_filter, (0.0, -1.0))
+            masked = np.where((masked >= low) & (masked < high), masked, np.inf)
+
+        k = min(top_k, width)
+        if k <= 0:
+            return np.empty((n, 0), dtype=np.int64), np.empty((n, 0))
+        # k-th smallest value per row; ties at the boundary are taken in
+        # column order so the result matches select()
+        kth = np.partition(masked, k - 1, axis=1)[:, k - 1:k]
+        take = masked < kth
+        ties = masked == kth
+        need = k - take.sum(axis=1, keepdims=True)
+        take |= ties & (np.cumsum(ties, axis=1) <= need)
+        idx = np.nonzero(take)[1].reshape(n, k)
+        vals = np.take_along_axis(masked, idx, axis=1)
+        order = np.argsort(vals, axis=1, kind="stable")
+        idx = np.take_along_axis(idx, order, axis=1)
+        vals = np.take_along_axis(vals, order, axis=1)
+
+        missing = ~np.isfinite(vals)
+        idx[missing] = -1
+        vals[missing] = np.nan
+        return idx, vals
+
+
 class RecommendationAgent:
     """
     Generate practice-only recommendations.
@@ -21,9 +125,44 @@ class RecommendationAgent:
     Uses llm_agent.generate() and prevents repeating problems.
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, index: Optional[CandidateIndex] = None):
+        self.index = index or CandidateIndex()
+
+    def candidates_for_students(
+        self,
+        estimates_by_student: Dict[str, Dict[str, float]],
+        top_k: int = 5,
+        subject_filter: Optional[str] = None,
+        difficulty_filter: Optional[str] = None,
+        default_mastery: float = 0.65
+    ) -> Dict[str, List[Tuple[str, float, str]]]:
+        """
+        Weakest-skill candidates for many students in one vectorized pass,
+        e.g. over SkillAgent.estimate_all_from_df(df). Skills a student has no
+        estimate for count as default_mastery.
+        """
+        import numpy as np
+
+        students = list(estimates_by_student)
+        skills = self.index.skills
+        matrix = np.full((len(students), len(skills)), default_mastery, dtype=np.float64)
+        position = self.index.position
+        for row, sid in enumerate(students):
+            for skill, m in estimates_by_student[sid].items():
+                col = position.get(skill)
+                if col is not None:
+                    matrix[row, col] = m
 
+        idx, vals = self.index.select_batch(matrix, top_k, subject_filter, difficulty_filter)
+        out = {}
+        for row, sid in enumerate(students):
+            out[sid] = [
+                (skills[j], float(v), mastery_to_difficulty(v))
+                for j, v in zip(idx[row].tolist(), vals[row].tolist()) if j >= 0
+            ]
+        return out
+
+    @METRICS.timed("recommend_seconds")
     def generate_recommendations(
         self,
         history: List[Dict[str, Any]],
@@ -32,7 +171,10 @@ class RecommendationAgent:
         top_k: int = 5,
         subject_filter: Optional[str] = None,
         difficulty_filter: Optional[str] = None,
-        context: Optional[Dict[str, Any]] = None
+        context: Optional[Dict[str, Any]] = None,
+        max_concurrency: int = 1,
+        scheduler=None,
+        student_id: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         history: student's session history
@@ -40,6 +182,11 @@ class RecommendationAgent:
         subject_filter: "Mathematics", "Physics", etc.
         difficulty_filter: "Easy", "Medium", "Hard"
         context: stores given_problems so questions don't repeat
+        max_concurrency: > 1 sends all top_k prompts through llm_agent.generate_batch at once
+        scheduler, student_id: with a ReviewScheduler (agents/scheduler.py),
+            recommends the student's weakest *due* skills from its queues
+            (the weakest skills overall when none are due); a student it
+            doesn't know yet is seeded from skill_estimates
         """
 
         if context is None:
@@ -50,26 +197,24 @@ class RecommendationAgent:
         # Default mastery if none given
         estimates = skill_estimates or {s: 0.65 for s in ALL_SKILLS}
 
-        # Sort by lowest mastery first
-        sorted_skills = sorted(estimates.items(), key=lambda x: x[1])
-
-        recommendations = []
-
-        for skill, mastery in sorted_skills:
-
-            # --- Subject Filtering ---
-            if subject_filter:
-                allowed_skills = SKILL_CATALOG.get(subject_filter, [])
-                if skill not in allowed_skills:
-                    continue
-
-            # --- Difficulty Filtering ---
-            difficulty = mastery_to_difficulty(mastery)
-            if difficulty_filter and difficulty != difficulty_filter:
-                continue
+        # k weakest skills that pass the subject and difficulty filters
+        with METRICS.span("recommend_stage_seconds", stage="select"):
+            if scheduler is not None and student_id is not None:
+                if student_id not in scheduler:
+                    scheduler.seed(student_id, estimates)
+                candidates = [
+                    (d.skill, d.mastery, d.difficulty)
+                    for d in scheduler.due(student_id, top_k, subject_filter, difficulty_filter)
+                ]
+            else:
+                candidates = []
+            if not candidates:
+                # Nothing due yet (or no scheduler): plain weakest skills
+                candidates = self.index.select(estimates, top_k, subject_filter, difficulty_filter)
 
-            # --- Build LLM Prompt (Practice Only) ---
-            prompt = (
+        # --- Build LLM Prompts (Practice Only) ---
+        prompts = [
+            (
                 f"Generate a practice exercise for skill '{skill}'. "
                 f"The student's mastery is {mastery:.2f}. "
                 f"Provide ONLY:\n"
@@ -77,19 +222,19 @@ class RecommendationAgent:
                 f"- one short hint\n"
                 f"Do NOT give the solution. Do NOT add explanation."
             )
+            for skill, mastery, _ in candidates
+        ]
 
-            lm_context = {
-                "skill": skill,
-                "difficulty": difficulty,
-                "given_problems": given_problems
-            }
+        # --- Call LLM ---
+        with METRICS.span("recommend_stage_seconds", stage="llm"):
+            outputs, given_problems = self._run_prompts(
+                llm_agent, prompts, candidates, context, given_problems, max_concurrency
+            )
 
-            # --- Call LLM ---
-            out = llm_agent.generate(prompt, context=lm_context)
+        # --- Create Recommendation Cards ---
+        recommendations = []
+        for (skill, mastery, difficulty), out in zip(candidates, outputs):
             text = out.get("text", "")
-            given_problems = out.get("given_problems", given_problems)
-
-            # --- Create Recommendation Card ---
             recommendations.append({
                 "id": str(uuid.uuid4()),
                 "skill": skill,
@@ -99,10 +244,41 @@ class RecommendationAgent:
                 "excerpt": text
             })
 
-            if len(recommendations) >= top_k:
-                break
-
         # Save updated non-repeat memory
         context["given_problems"] = given_problems
 
-        return recommendations
\ No newline at end of file
+        return recommendations
+
+    @staticmethod
+    def _run_prompts(llm_agent, prompts, candidates, context, given_problems, max_concurrency):
+        """
+        Sends the practice prompts to llm_agent, threading given_problems
+        through. Returns (outputs, given_problems).
+        """
+        if max_concurrency > 1 and hasattr(llm_agent, "generate_batch"):
+            # All prompts share given_problems (and session), so the batch stays non-repeating
+            lm_contexts = [
+                {
+                    "session_id": context.get("session_id"),
+                    "skill": skill,
+                    "difficulty": difficulty,
+                    "given_problems": given_problems
+                }
+                for skill, _, difficulty in candidates
+            ]
+            outputs = llm_agent.generate_batch(prompts, lm_contexts, max_concurrency=max_concurrency)
+            if outputs:
+                given_problems = outputs[-1].get("given_problems", given_problems)
+        else:
+            outputs = []
+            for prompt, (skill, _, difficulty) in zip(prompts, candidates):
+                lm_context = {
+                    "session_id": context.get("session_id"),
+                    "skill": skill,
+                    "difficulty": difficulty,
+                    "given_problems": given_problems
+                }
+                out = llm_agent.generate(prompt, context=lm_context)
+                given_problems = out.get("given_problems", given_problems)
+                outputs.append(out)
+        return outputs, given_problems
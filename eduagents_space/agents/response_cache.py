@@ -0,0 +1,100 @@
+# agents/response_cache.py
+"""
+Content-addressed response cache for LLMAgent.generate.
+
+Entries are keyed by a hash of the normalized prompt plus the context
+fields that change the answer (subject, topic, skill, difficulty), and are
+evicted by LRU order, an entry bound and an optional TTL.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    return _SPACES.sub(" ", prompt.strip().lower())
+
+
+def cache_key(prompt: str, fields: Dict[str, Any]) -> str:
+    raw = json.dumps([normalize_prompt(prompt), sorted(fields.items())], ensure_ascii=False, default=str)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU/TTL cache of response texts.
+
+    max_entries: entries beyond this count evict the least recently used
+    ttl:         seconds an entry stays valid (None = until evicted)
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bypasses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            text, expires_at = item
+            if expires_at is not None and expires_at <= self.clock():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return text
+
+    def put(self, key: str, text: str) -> None:
+        expires_at = self.clock() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (text, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def bypass(self) -> None:
+        """
+        Counts a request that was not looked up (see LLMAgent._cache_key).
+        """
+        with self._lock:
+            self.bypasses += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size, hits, misses, bypasses, evictions = (
+                len(self._data), self.hits, self.misses, self.bypasses, self.evictions
+            )
+        lookups = hits + misses
+        return {
+            "size": size,
+            "hits": hits,
+            "misses": misses,
+            "bypasses": bypasses,
+            "evictions": evictions,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,308 @@
+# agents/retrieval.py
+"""
+Offline topic retrieval over the problem bank and the explanations.
+
+Free-text topics ("Integrals", "motion", "Mathematics") rarely match a
+"Subject|topic" pool key exactly. Each pool and each explanation becomes a
+document of hashed word and character-trigram features with TF-IDF
+weights, L2-normalized once at build time and stored as a feature ->
+documents inverted index in NumPy arrays. A query touches only the
+postings of its own features, so top-k cosine search stays well under a
+millisecond for banks of 100k+ problems. CPU only, no model files.
+
+    retriever = TopicRetriever(problem_bank, catalog.content.explanations)
+    retriever.resolve_pool("Mathematics", "fraction")   # -> "Math|fractions"
+    retriever.resolve_explanation(None, "integrals")    # -> "integration"
+
+Subjects are matched through SUBJECT_ALIASES and prefixes first, which
+needs no index at all; NumPy is only imported when a search is needed.
+"""
+import re
+import threading
+import zlib
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from agents.catalog import normalize
+from agents.problem_bank import ProblemBank
+
+N_FEATURES = 1 << 18
+
+# Title (pool topic / explanation key) features count this many times the body's
+TITLE_WEIGHT = 3
+
+# Problems per pool whose text goes into the pool's document
+MAX_POOL_SAMPLES = 64
+
+# Features found in more than this share of documents carry no signal and
+# are left out of the postings (their weight still counts in the norms)
+MAX_DF = 0.5
+
+# Cosine below which a search hit is not trusted. A hit that shares no whole
+# word with the query (a misspelling, or "trigonometry" ~ "geometry") must
+# also reach the fuzzy score. Explanation documents are short, so a few
+# shared trigrams with the title score higher there.
+MIN_SCORE = 0.15
+MIN_FUZZY_SCORE = 0.22
+MIN_EXPLANATION_SCORE = 0.3
+
+SUBJECT_ALIASES = {
+    "mathematics": "math",
+    "maths": "math",
+    "bio": "biology",
+    "chem": "chemistry",
+    "phys": "physics",
+}
+
+# Postings a single query may scan (bounds latency on very large banks)
+MAX_POSTINGS = 40_000
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+class Hit(NamedTuple):
+    key: str
+    score: float
+
+
+@lru_cache(maxsize=65536)
+def _word_features(word: str) -> Tuple[int, ...]:
+    padded = f"<{word}>"
+    grams = ["w:" + word] + [padded[i:i + 3] for i in range(len(padded) - 2)]
+    # crc32 rather than hash(), which is salted per process
+    return tuple(zlib.crc32(g.encode("utf-8")) & (N_FEATURES - 1) for g in grams)
+
+
+def features(text: Optional[str]) -> List[int]:
+    out: List[int] = []
+    for word in _TOKEN.findall(normalize(text)):
+        out.extend(_word_features(word))
+    return out
+
+
+class RetrievalIndex:
+    """
+    Cosine search over documents given as (key, title, body).
+    """
+
+    def __init__(self, docs: Sequence[Tuple[str, str, str]]):
+        import numpy as np
+
+        self.keys: Tuple[str, ...] = tuple(key for key, _, _ in docs)
+        self._positions = {key: i for i, key in enumerate(self.keys)}
+        n = len(self.keys)
+
+        doc_ids, feat_ids, tfs = [], [], []
+        for i, (_, title, body) in enumerate(docs):
+            feats = np.array(features(title) * TITLE_WEIGHT + features(body), dtype=np.int64)
+            if not len(feats):
+                continue
+            uniq, counts = np.unique(feats, return_counts=True)
+            doc_ids.append(np.full(len(uniq), i, dtype=np.int32))
+            feat_ids.append(uniq)
+            tfs.append(1.0 + np.log(counts))
+
+        doc = np.concatenate(doc_ids) if doc_ids else np.empty(0, dtype=np.int32)
+        feat = np.concatenate(feat_ids) if feat_ids else np.empty(0, dtype=np.int64)
+        tf = np.concatenate(tfs) if tfs else np.empty(0)
+
+        df = np.bincount(feat, minlength=N_FEATURES)
+        self.idf = (np.log((n + 1.0) / (df + 1.0)) + 1.0).astype(np.float32)
+        weight = tf * self.idf[feat]
+        norms = np.sqrt(np.bincount(doc, weights=weight * weight, minlength=n))
+        weight /= np.maximum(norms, 1e-12)[doc]
+
+        if n >= 20:
+            keep = df[feat] <= MAX_DF * n
+            doc, feat, weight = doc[keep], feat[keep], weight[keep]
+
+        # CSR by feature: postings of f are post_docs[indptr[f]:indptr[f + 1]]
+        order = np.argsort(feat, kind="stable")
+        self.post_docs = doc[order]
+        self.post_weights = weight[order].astype(np.float32)
+        self.indptr = np.zeros(N_FEATURES + 1, dtype=np.int64)
+        np.cumsum(np.bincount(feat, minlength=N_FEATURES), out=self.indptr[1:])
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def scores(self, query: str):
+        """
+        Cosine similarity of query against every document.
+        """
+        import numpy as np
+
+        n = len(self.keys)
+        feats = features(query)
+        if not feats or not n:
+            return np.zeros(n, dtype=np.float32)
+        uniq, counts = np.unique(np.array(feats, dtype=np.int64), return_counts=True)
+        qw = (1.0 + np.log(counts)) * self.idf[uniq]
+        qw /= np.sqrt(np.dot(qw, qw))
+
+        starts, ends = self.indptr[uniq], self.indptr[uniq + 1]
+        lengths = ends - starts
+        if lengths.sum() > MAX_POSTINGS:
+            # Rarest features first until the budget is spent; the common
+            # trigrams left out carry the least weight anyway
+            order = np.argsort(lengths, kind="stable")
+            keep = order[np.cumsum(lengths[order]) <= MAX_POSTINGS]
+            if not len(keep):
+                keep = order[:1]
+            starts, lengths, qw = starts[keep], lengths[keep], qw[keep]
+        if not lengths.sum():
+            return np.zeros(n, dtype=np.float32)
+        # Gather all postings of the query's features in one go
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        weights = self.post_weights[offsets] * np.repeat(qw, lengths)
+        return np.bincount(self.post_docs[offsets], weights=weights, minlength=n)
+
+    def shares_word(self, query: str, key: str) -> bool:
+        """
+        Whether document key contains one of the query's words, not only
+        some of its trigrams.
+        """
+        doc = self._positions.get(key)
+        if doc is None:
+            return False
+        for word in _TOKEN.findall(normalize(query)):
+            feat = _word_features(word)[0]
+            if (self.post_docs[self.indptr[feat]:self.indptr[feat + 1]] == doc).any():
+                return True
+        return False
+
+    def search(self, query: str, k: int = 5, within=None) -> List[Hit]:
+        """
+        Top-k documents by cosine, best first. within: optional array of
+        document positions to restrict the search to.
+        """
+        import numpy as np
+
+        scores = self.scores(query)
+        ids = np.arange(len(scores)) if within is None else np.asarray(within)
+        scores = scores[ids]
+        k = min(k, len(ids))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(ids) else np.arange(len(ids))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [Hit(self.keys[ids[j]], float(scores[j])) for j in top if scores[j] > 0]
+
+
+class TopicRetriever:
+    """
+    Resolves free-text subject/topic strings to problem pools and
+    explanation keys. Indexes are built on first search; results are cached.
+    """
+
+    def __init__(self, bank: ProblemBank, explanations: Dict[str, str], min_score: float = MIN_SCORE):
+        self.bank = bank
+        self.explanations = explanations
+        self.min_score = min_score
+        self._lock = threading.Lock()
+        self._pools: Optional[RetrievalIndex] = None
+        self._explanation_index: Optional[RetrievalIndex] = None
+        self._subject_docs = None
+
+        # Pool keys by normalized subject and topic, for the exact/alias path
+        self._by_subject_topic: Dict[Tuple[str, str], str] = {}
+        self._subjects: Dict[str, str] = {}
+        for key in bank.keys():
+            subject, _, topic = key.rpartition("|")
+            self._by_subject_topic[(normalize(subject), normalize(topic))] = key
+            self._subjects.setdefault(normalize(subject), subject)
+
+        self.resolve_pool = lru_cache(maxsize=4096)(self._resolve_pool)
+        self.resolve_explanation = lru_cache(maxsize=4096)(self._resolve_explanation)
+
+    # -------------------------------------------------------------------------
+    # INDEXES
+    # -------------------------------------------------------------------------
+    @property
+    def pools(self) -> RetrievalIndex:
+        if self._pools is None:
+            with self._lock:
+                if self._pools is None:
+                    self._pools = self._build_pools()
+        return self._pools
+
+    @property
+    def explanation_index(self) -> RetrievalIndex:
+        if self._explanation_index is None:
+            with self._lock:
+                if self._explanation_index is None:
+                    self._explanation_index = RetrievalIndex(
+                        [(key, key, text) for key, text in self.explanations.items()]
+                    )
+        return self._explanation_index
+
+    def _build_pools(self) -> RetrievalIndex:
+        import numpy as np
+
+        docs = []
+        by_subject: Dict[str, List[int]] = {}
+        for i, key in enumerate(self.bank.keys()):
+            subject, _, topic = key.rpartition("|")
+            pool = self.bank.pool(key)[:MAX_POOL_SAMPLES]
+            # Explanations of the topic and subject describe the pool in words
+            notes = [self.explanations.get(normalize(topic), ""), self.explanations.get(normalize(subject), "")]
+            body = " ".join([subject, *notes, *{p.skill for p in pool}, *(f"{p.question} {p.hint}" for p in pool)])
+            docs.append((key, topic, body))
+            by_subject.setdefault(normalize(subject), []).append(i)
+        self._subject_docs = {s: np.array(ids) for s, ids in by_subject.items()}
+        return RetrievalIndex(docs)
+
+    # -------------------------------------------------------------------------
+    # RESOLUTION
+    # -------------------------------------------------------------------------
+    def canonical_subject(self, subject: Optional[str]) -> Optional[str]:
+        """
+        The bank's spelling of subject ("Mathematics" -> "Math"), or None.
+        """
+        name = normalize(subject)
+        if not name:
+            return None
+        name = SUBJECT_ALIASES.get(name, name)
+        if name in self._subjects:
+            return self._subjects[name]
+        for known, spelled in self._subjects.items():
+            if len(known) >= 3 and len(name) >= 3 and (name.startswith(known) or known.startswith(name)):
+                return spelled
+        return None
+
+    def _trusted(self, index: RetrievalIndex, query: str, hit: Hit, fuzzy_score: float) -> bool:
+        return hit.score >= self.min_score and (hit.score >= fuzzy_score or index.shares_word(query, hit.key))
+
+    def _resolve_pool(self, subject: Optional[str], topic: Optional[str]) -> Optional[str]:
+        """
+        Pool key for a free-text subject/topic, or None when nothing fits.
+        A known subject restricts the search to its own pools.
+        """
+        canon = self.canonical_subject(subject)
+        topic_name = normalize(topic)
+        if canon is not None:
+            key = self._by_subject_topic.get((normalize(canon), topic_name))
+            if key is not None:
+                return key
+        query = topic_name or normalize(subject)
+        if not query:
+            return None
+
+        index = self.pools
+        within = self._subject_docs.get(normalize(canon)) if canon is not None else None
+        hits = index.search(query, 1, within=within)
+        if hits and self._trusted(index, query, hits[0], MIN_FUZZY_SCORE):
+            return hits[0].key
+        return None
+
+    def _resolve_explanation(self, subject: Optional[str], topic: Optional[str]) -> Optional[str]:
+        query = normalize(topic or subject)
+        if not query:
+            return None
+        if query in self.explanations:
+            return query
+        index = self.explanation_index
+        hits = index.search(query, 1)
+        if hits and self._trusted(index, query, hits[0], MIN_EXPLANATION_SCORE):
+            return hits[0].key
+        return None
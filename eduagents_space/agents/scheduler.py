@@ -0,0 +1,319 @@
+# agents/scheduler.py
+"""
+Spaced-repetition review scheduler.
+
+Every student has a schedule of skills, each with a next-due time set by
+SM-2 (interval grows by an ease factor) or Leitner boxes (fixed interval
+per box). Skills wait in a heap ordered by due time and move to a "ready"
+heap ordered by mastery once due, one per (subject, difficulty) bucket, so
+"what's due now" costs O(log n) per skill returned instead of a sort over
+every skill, with or without subject and difficulty filters.
+
+Updated items are pushed again and their old heap entries are dropped
+lazily when they surface. Students can be grouped into cohorts whose
+clocks are shifted together in O(1) (advance_cohort), e.g. to skip a
+holiday week for a whole class.
+
+    sched = ReviewScheduler()
+    sched.seed("s1", skill_estimates)                # everything due now
+    sched.due("s1", limit=5)                          # weakest due skills
+    sched.record("s1", "algebra", score=0.4)          # reschedules algebra
+"""
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from agents.recommend_agent import mastery_to_difficulty
+from agents.skill_agent import SKILL_SUBJECT
+
+DAY = 86400.0
+
+# Leitner box -> days until the next review
+LEITNER_INTERVALS = (1, 2, 4, 8, 16, 32)
+
+SM2_INITIAL_EASE = 2.5
+SM2_MIN_EASE = 1.3
+
+# Weight of a new score in the running mastery when record() is not given one
+MASTERY_ALPHA = 0.3
+
+
+class DueSkill(NamedTuple):
+    skill: str
+    mastery: float
+    difficulty: str
+    due: float
+
+
+class ReviewItem:
+    __slots__ = ("skill", "mastery", "due", "interval", "ease", "reps", "box", "version")
+
+    def __init__(self, skill: str, mastery: float, due: float):
+        self.skill = skill
+        self.mastery = mastery
+        self.due = due
+        self.interval = 0.0
+        self.ease = SM2_INITIAL_EASE
+        self.reps = 0
+        self.box = 0
+        # Bumped on every change; heap entries with an older version are stale
+        self.version = 0
+
+    def __repr__(self) -> str:
+        return f"ReviewItem({self.skill!r}, mastery={self.mastery:.2f}, due={self.due:.0f}, interval={self.interval:.1f}d)"
+
+
+class StudentSchedule:
+    __slots__ = ("items", "waiting", "ready", "cohort")
+
+    def __init__(self, cohort: Optional[str] = None):
+        self.items: Dict[str, ReviewItem] = {}
+        # (due, seq, skill, version), not yet due
+        self.waiting: List[Tuple[float, int, str, int]] = []
+        # (subject, difficulty) -> [(mastery, seq, skill, version)], due now, weakest first
+        self.ready: Dict[Tuple[Optional[str], str], List[Tuple[float, int, str, int]]] = {}
+        self.cohort = cohort
+
+    def heaps(self) -> Iterator[List[Tuple]]:
+        yield self.waiting
+        yield from self.ready.values()
+
+
+class ReviewScheduler:
+    """
+    mode:  "sm2" or "leitner"
+    clock: seconds (time.time by default); cohort offsets are added to it
+    """
+
+    def __init__(self, mode: str = "sm2", clock: Callable[[], float] = time.time):
+        if mode not in ("sm2", "leitner"):
+            raise ValueError(f"unknown scheduling mode {mode!r}")
+        self.mode = mode
+        self.clock = clock
+        self._students: Dict[str, StudentSchedule] = {}
+        self._cohorts: Dict[str, float] = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    # STUDENTS AND COHORTS
+    # -------------------------------------------------------------------------
+    def _schedule(self, student_id: str) -> StudentSchedule:
+        sched = self._students.get(student_id)
+        if sched is None:
+            sched = self._students[student_id] = StudentSchedule()
+        return sched
+
+    def assign(self, student_id: str, cohort: str) -> None:
+        with self._lock:
+            self._schedule(student_id).cohort = cohort
+            self._cohorts.setdefault(cohort, 0.0)
+
+    def forget(self, student_id: str) -> None:
+        """
+        Drops the student's schedule (e.g. when the session ends).
+        """
+        with self._lock:
+            self._students.pop(student_id, None)
+
+    def advance_cohort(self, cohort: str, seconds: float) -> None:
+        """
+        Moves every schedule in the cohort `seconds` forward in time, in O(1).
+        """
+        with self._lock:
+            self._cohorts[cohort] = self._cohorts.get(cohort, 0.0) + seconds
+
+    def now(self, student_id: str) -> float:
+        sched = self._students.get(student_id)
+        offset = self._cohorts.get(sched.cohort, 0.0) if sched is not None and sched.cohort else 0.0
+        return self.clock() + offset
+
+    def __contains__(self, student_id: str) -> bool:
+        return student_id in self._students
+
+    def __len__(self) -> int:
+        return len(self._students)
+
+    # -------------------------------------------------------------------------
+    # SCHEDULING
+    # -------------------------------------------------------------------------
+    def _push(self, sched: StudentSchedule, item: ReviewItem, now: float) -> None:
+        item.version += 1
+        if item.due <= now:
+            self._push_ready(sched, item)
+        else:
+            heapq.heappush(sched.waiting, (item.due, next(self._seq), item.skill, item.version))
+        if sum(map(len, sched.heaps())) > 2 * len(sched.items) + 64:
+            self._compact(sched)
+
+    def _push_ready(self, sched: StudentSchedule, item: ReviewItem) -> None:
+        # mastery only changes through _push, so an entry's bucket stays right
+        key = (SKILL_SUBJECT.get(item.skill), mastery_to_difficulty(item.mastery))
+        heap = sched.ready.get(key)
+        if heap is None:
+            heap = sched.ready[key] = []
+        heapq.heappush(heap, (item.mastery, next(self._seq), item.skill, item.version))
+
+    @staticmethod
+    def _compact(sched: StudentSchedule) -> None:
+        """
+        Drops stale heap entries once they outnumber the live ones.
+        """
+        items = sched.items
+        for heap in sched.heaps():
+            heap[:] = [e for e in heap if items[e[2]].version == e[3]]
+            heapq.heapify(heap)
+
+    def seed(self, student_id: str, estimates: Dict[str, float], due: Optional[float] = None) -> None:
+        """
+        Adds skills the student has no schedule for yet, due at `due` (now by
+        default). Known skills only get their mastery refreshed.
+        """
+        with self._lock:
+            sched = self._schedule(student_id)
+            now = self.now(student_id)
+            due = now if due is None else due
+            for skill, mastery in estimates.items():
+                item = sched.items.get(skill)
+                if item is None:
+                    item = sched.items[skill] = ReviewItem(skill, mastery, due)
+                elif item.mastery == mastery:
+                    continue
+                else:
+                    item.mastery = mastery
+                self._push(sched, item, now)
+
+    def record(
+        self,
+        student_id: str,
+        skill: str,
+        score: float,
+        mastery: Optional[float] = None,
+        now: Optional[float] = None
+    ) -> ReviewItem:
+        """
+        Reschedules skill after an answer. score is 0–1 (or 0–100);
+        mastery, if given (e.g. from SkillAgent.record_answer), replaces the
+        scheduler's running estimate.
+        """
+        score = score / 100.0 if score > 1.0 else score
+        with self._lock:
+            sched = self._schedule(student_id)
+            now = self.now(student_id) if now is None else now
+            item = sched.items.get(skill)
+            if item is None:
+                item = sched.items[skill] = ReviewItem(skill, score if mastery is None else mastery, now)
+            elif mastery is None:
+                item.mastery += MASTERY_ALPHA * (score - item.mastery)
+            if mastery is not None:
+                item.mastery = mastery
+
+            if self.mode == "sm2":
+                self._sm2(item, score)
+            else:
+                self._leitner(item, score)
+            item.due = now + item.interval * DAY
+            self._push(sched, item, now)
+            return item
+
+    @staticmethod
+    def _sm2(item: ReviewItem, score: float) -> None:
+        quality = round(score * 5)
+        if quality < 3:
+            item.reps = 0
+            item.interval = 1.0
+        else:
+            item.reps += 1
+            if item.reps == 1:
+                item.interval = 1.0
+            elif item.reps == 2:
+                item.interval = 6.0
+            else:
+                item.interval = round(item.interval * item.ease, 2)
+        item.ease = max(SM2_MIN_EASE, item.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+
+    @staticmethod
+    def _leitner(item: ReviewItem, score: float) -> None:
+        item.box = min(item.box + 1, len(LEITNER_INTERVALS) - 1) if score >= 0.6 else 0
+        item.interval = float(LEITNER_INTERVALS[item.box])
+
+    # -------------------------------------------------------------------------
+    # QUERIES
+    # -------------------------------------------------------------------------
+    def _promote(self, sched: StudentSchedule, now: float) -> None:
+        waiting, items = sched.waiting, sched.items
+        while waiting and waiting[0][0] <= now:
+            _, _, skill, version = heapq.heappop(waiting)
+            item = items[skill]
+            if item.version == version:
+                self._push_ready(sched, item)
+
+    def due(
+        self,
+        student_id: str,
+        limit: int = 5,
+        subject_filter: Optional[str] = None,
+        difficulty_filter: Optional[str] = None
+    ) -> List[DueSkill]:
+        """
+        Up to `limit` skills due now, weakest first, optionally restricted to
+        one subject and one difficulty bucket (mastery_to_difficulty).
+        Items stay scheduled until record() is called for them.
+        """
+        with self._lock:
+            sched = self._students.get(student_id)
+            if sched is None:
+                return []
+            self._promote(sched, self.now(student_id))
+
+            # Only the buckets that pass the filters are looked at; at most
+            # subjects x 3 of them, merged by their weakest entry
+            heaps = [
+                heap for (subject, difficulty), heap in sched.ready.items()
+                if (not subject_filter or subject == subject_filter)
+                and (not difficulty_filter or difficulty == difficulty_filter)
+            ]
+            items = sched.items
+            out: List[DueSkill] = []
+            taken = []
+            while len(out) < limit:
+                best = None
+                for heap in heaps:
+                    while heap and items[heap[0][2]].version != heap[0][3]:
+                        heapq.heappop(heap)  # stale: superseded by a later push
+                    if heap and (best is None or heap[0] < best[0]):
+                        best = heap
+                if best is None:
+                    break
+                entry = heapq.heappop(best)
+                taken.append((best, entry))
+                item = items[entry[2]]
+                out.append(DueSkill(item.skill, item.mastery, mastery_to_difficulty(item.mastery), item.due))
+            for heap, entry in taken:
+                heapq.heappush(heap, entry)
+            return out
+
+    def next_due(self, student_id: str) -> Optional[float]:
+        """
+        Earliest due time among the student's skills (now if any is due).
+        """
+        with self._lock:
+            sched = self._students.get(student_id)
+            if sched is None:
+                return None
+            now = self.now(student_id)
+            self._promote(sched, now)
+            if any(sched.items[s].version == v for heap in sched.ready.values() for _, _, s, v in heap):
+                return now
+            while sched.waiting:
+                due, _, skill, version = sched.waiting[0]
+                if sched.items[skill].version == version:
+                    return due
+                heapq.heappop(sched.waiting)
+            return None
+
+    def items(self, student_id: str) -> Sequence[ReviewItem]:
+        sched = self._students.get(student_id)
+        return tuple(sched.items.values()) if sched is not None else ()
@@ -0,0 +1,122 @@
+# agents/session.py
+"""
+Per-session tutor state.
+
+The shared LLMAgent only holds read-only banks; everything that changes
+during a conversation (current subject/topic, problems already given)
+lives in a small SessionContext. SessionPool keeps the active ones keyed by
+session ID and evicts idle sessions by TTL and LRU, so memory follows the
+number of active sessions rather than every session ever served.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+from agents.given_problems import GivenProblems
+
+
+class SessionContext:
+    __slots__ = ("session_id", "subject", "topic", "given_problems", "last_access", "lock")
+
+    def __init__(self, session_id: Optional[str] = None, window: Optional[int] = None):
+        self.session_id = session_id
+        self.subject: Optional[str] = None
+        self.topic: Optional[str] = None
+        # window: problems per topic remembered for non-repetition (None = all)
+        self.given_problems = GivenProblems(window)
+        self.last_access = 0.0
+        # Serializes requests within one session; different sessions never contend
+        self.lock = threading.Lock()
+
+
+class SessionPool:
+    """
+    LRU/TTL map of session_id -> SessionContext.
+
+    max_sessions: least recently used sessions are evicted beyond this count
+    ttl:          sessions idle for longer than this many seconds are evicted
+    on_evict:     called with the ID of every session removed from the pool
+                  (evicted, dropped or cleared), so per-session state kept
+                  elsewhere can be released with it
+    window:       GivenProblems window of new sessions (None = remember all)
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 10_000,
+        ttl: Optional[float] = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+        on_evict: Optional[Callable[[str], None]] = None,
+        window: Optional[int] = None
+    ):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.clock = clock
+        self.on_evict = on_evict
+        self.window = window
+        self._sessions: "OrderedDict[str, SessionContext]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str, create: bool = True) -> Optional[SessionContext]:
+        """
+        Returns the session, creating it if needed, and marks it as recently used.
+        """
+        now = self.clock()
+        with self._lock:
+            removed = self._evict_expired(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                if not create:
+                    self._notify(removed)
+                    return None
+                session = self._sessions[session_id] = SessionContext(session_id, self.window)
+                while len(self._sessions) > self.max_sessions:
+                    removed.append(self._sessions.popitem(last=False)[0])
+            else:
+                self._sessions.move_to_end(session_id)
+            session.last_access = now
+        self._notify(removed)
+        return session
+
+    def drop(self, session_id: str) -> None:
+        with self._lock:
+            removed = [session_id] if self._sessions.pop(session_id, None) is not None else []
+        self._notify(removed)
+
+    def evict_expired(self) -> int:
+        with self._lock:
+            removed = self._evict_expired(self.clock())
+        self._notify(removed)
+        return len(removed)
+
+    def clear(self) -> None:
+        with self._lock:
+            removed = list(self._sessions)
+            self._sessions.clear()
+        self._notify(removed)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _evict_expired(self, now: float) -> List[str]:
+        # Sessions are kept in access order, so expired ones are at the front
+        removed: List[str] = []
+        if self.ttl is None:
+            return removed
+        while self._sessions:
+            sid, session = next(iter(self._sessions.items()))
+            if now - session.last_access <= self.ttl:
+                break
+            del self._sessions[sid]
+            removed.append(sid)
+        return removed
+
+    def _notify(self, removed: List[str]) -> None:
+        # Outside the pool lock: callbacks take their own locks
+        if self.on_evict is not None:
+            for sid in removed:
+                self.on_evict(sid)
@@ -1,9 +1,11 @@
 # agents/skill_agent.py
-from typing import Dict, List, Any
-import statistics
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional
+
+from agents.metrics import METRICS
 
 # Full skill list for Class 8–12
-SKILL_CATALOG = {
+_SKILL_CATALOG = {
     "Mathematics": [
         "algebra", "geometry", "trigonometry", "mensuration", "coordinate_geometry",
         "calculus", "probability", "statistics", "fractions", "addition",
@@ -27,8 +29,15 @@ SKILL_CATALOG = {
     "CS": ["variables", "basic_programming", "data_structures", "algorithms"]
 }
 
+# Frozen at import: read-only views, so every importer can share them
+SKILL_CATALOG = MappingProxyType({subject: tuple(skills) for subject, skills in _SKILL_CATALOG.items()})
+SUBJECTS = tuple(SKILL_CATALOG)
+
 # Flattened skill list
-ALL_SKILLS = [skill for skills in SKILL_CATALOG.values() for skill in skills]
+ALL_SKILLS = tuple(skill for skills in SKILL_CATALOG.values() for skill in skills)
+SORTED_SKILLS = tuple(sorted(ALL_SKILLS))
+SKILL_INDEX = MappingProxyType({skill: i for i, skill in enumerate(ALL_SKILLS)})
+SKILL_SUBJECT = MappingProxyType({skill: subject for subject, skills in SKILL_CATALOG.items() for skill in skills})
 
 class SkillAgent:
     """
@@ -36,36 +45,60 @@ class SkillAgent:
     No pre-stored student statistics; all students start with default mastery.
     """
 
-    def __init__(self, default_mastery: float = 0.65):
+    def __init__(self, default_mastery: float = 0.65, decay: Optional[float] = None, tracer=None):
+        """
+        tracer: optional agents.knowledge_tracing.KnowledgeTracer; when given,
+                mastery comes from Bayesian Knowledge Tracing over the
+                answer order instead of the mean score.
+        """
+        from agents.mastery_store import MasteryStore
+
         self.default_mastery = default_mastery
+        # Running aggregates for live sessions (see record_answer)
+        self.store = MasteryStore(default_mastery, decay)
+        self.tracer = tracer
 
+    @METRICS.timed("skill_estimate_seconds", method="estimate_from_df")
     def estimate_from_df(self, df) -> Dict[str, float]:
         """
-        Accepts a pandas DataFrame with columns 'student_id', 'skill', 'score'.
-        Returns dict {skill_name: mastery (0–1)}. Missing skills get default mastery.
+        Accepts a pandas DataFrame with columns 'student_id', 'skill' and either
+        'score' or 'correct'. Returns dict {skill_name: mastery (0–1)}.
+        Missing skills get default mastery.
         """
         try:
-            skills = {}
-            for _, row in df.iterrows():
-                skill = str(row.get("skill")).strip()
-                val = float(row.get("score", 0))
-                if val > 1.0:
-                    val /= 100.0
-                skills.setdefault(skill, []).append(val)
-            mastery = {}
-            for s in ALL_SKILLS:
-                if s in skills:
-                    mastery[s] = max(0.0, min(1.0, statistics.mean(skills[s])))
-                else:
-                    mastery[s] = self.default_mastery
-            return mastery
+            if self.tracer is not None:
+                traced = self.tracer.trace(df, by_student=False).get(None, {})
+                return {s: traced.get(s, self.default_mastery) for s in ALL_SKILLS}
+            from agents.mastery_engine import compute_single_mastery
+            return compute_single_mastery(df, self.default_mastery)
         except Exception:
             return {s: self.default_mastery for s in ALL_SKILLS}
 
+    @METRICS.timed("skill_estimate_seconds", method="estimate_all_from_df")
+    def estimate_all_from_df(self, df) -> Dict[str, Dict[str, float]]:
+        """
+        Same as estimate_from_df but for every student at once.
+        Returns dict {student_id: {skill_name: mastery (0–1)}}.
+        """
+        if self.tracer is not None:
+            traced = self.tracer.trace(df)
+            return {
+                sid: {s: skills.get(s, self.default_mastery) for s in ALL_SKILLS}
+                for sid, skills in traced.items()
+            }
+        from agents.mastery_engine import compute_mastery
+        return compute_mastery(df, self.default_mastery)
+
+    @METRICS.timed("skill_estimate_seconds", method="estimate_from_history")
     def estimate_from_history(self, history: List[Dict[str, Any]]) -> Dict[str, float]:
         """
         Accepts a list of dicts [{'skill':..., 'score':...}, ...] and returns mastery dict.
         """
+        if not history:
+            return dict.fromkeys(ALL_SKILLS, self.default_mastery)
+
+        import statistics
+
         skills = {}
         for row in history:
             skill = str(row.get("skill")).strip()
@@ -79,4 +112,25 @@ class SkillAgent:
                 mastery[s] = max(0.0, min(1.0, statistics.mean(skills[s])))
             else:
                 mastery[s] = self.default_mastery
-        return mastery
\ No newline at end of file
+        return mastery
+
+    # -------------------------------------------------------------------------
+    # INCREMENTAL UPDATES
+    # -------------------------------------------------------------------------
+    def record_answer(self, student_id: str, skill: str, score: Any, timestamp: Optional[float] = None) -> float:
+        """
+        Records one answer in O(1) and returns the new mastery for that skill only.
+        """
+        mastery = self.store.update(student_id, skill, score, timestamp)
+        if self.tracer is not None and skill in self.tracer.index:
+            return self.tracer.update(student_id, skill, score)
+        return mastery
+
+    def estimate_for_student(self, student_id: str) -> Dict[str, float]:
+        """
+        Returns the current mastery dict for a student from running aggregates,
+        without rescanning their history.
+        """
+        if self.tracer is not None:
+            return self.tracer.snapshot(student_id, self.default_mastery)
+        return self.store.snapshot(student_id)
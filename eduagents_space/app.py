@@ -1,102 +1,14 @@
 import gradio as gr
-from agents.llm_agent import LLMAgent
-from agents.recommend_agent import RecommendationAgent
-from agents.skill_agent import SkillAgent
-
-# Load agents
-llm_agent = LLMAgent()
-rec_agent = RecommendationAgent()
-skill_agent = SkillAgent()
-
-# Default state
-def init_state():
-    return {
-        "given_problems": {},
-        "topic": None,
-        "subject": None
-    }
-
-# --------------------------
-# START TOPIC
-# --------------------------
-def start_topic(subject, topic, state):
-    if not topic or topic.strip() == "":
-        return "⚠️ Please enter a topic first!", state
-
-    state["subject"] = subject
-    state["topic"] = topic.strip()
-
-    return f"### Topic set to **{topic}**\nSubject: **{subject}**\nYou can now ask for explanations or practice problems.", state
-
-# --------------------------
-# TUTOR CHAT
-# --------------------------
-def tutor_chat(user_msg, state):
-
-    if not user_msg.strip():
-        return "⚠️ Please type a message.", state
-
-    response = llm_agent.generate(
-        user_msg,
-        context={
-            "topic": state["topic"],
-            "subject": state["subject"],
-            "given_problems": state["given_problems"]
-        }
-    )
-
-    # sync memory
-    state["given_problems"] = response.get("given_problems", state["given_problems"])
-
-    return response["text"], state
-
-# --------------------------
-# RECOMMENDATIONS
-# --------------------------
-def get_recommendations(filter_subject, difficulty, state):
-
-    skills = skill_agent.estimate_from_history([])
-
-    subject_filter_val = None if filter_subject == "All Subjects" else filter_subject
-    difficulty_filter_val = None if difficulty == "Any" else difficulty
-
-    recommendations = rec_agent.generate_recommendations(
-        history=[],
-        skill_estimates=skills,
-        llm_agent=llm_agent,
-        top_k=8,
-        subject_filter=subject_filter_val,
-        difficulty_filter=difficulty_filter_val,
-        context={"given_problems": state["given_problems"]}
-    )
-
-    if not recommendations:
-        return "⚠️ No recommendations found."
-
-    txt = ""
-    for r in recommendations:
-        badge = {"Easy": "🟢", "Medium": "🟡", "Hard": "🔴"}.get(r["difficulty"], "")
-        txt += f"### {r['title']} {badge}\n**Skill:** {r['skill']}\n\n{r['excerpt']}\n\n---\n"
-
-    return txt
-
-# --------------------------
-# PRACTICE QUESTION
-# --------------------------
-def get_practice_question(skill_selected, state):
-
-    response = llm_agent.generate(
-        f"Give practice problem for {skill_selected}",
-        context={
-            "skill": skill_selected,
-            "difficulty": None,
-            "given_problems": state["given_problems"]
-        }
-    )
-
-    state["given_problems"] = response.get("given_problems", state["given_problems"])
-
-    return response["text"], state
+from agents.skill_agent import SORTED_SKILLS, SUBJECTS
+# Handlers live in handlers.py so they can be served without the UI (see server.py)
+from handlers import (
+    get_practice_question,
+    get_recommendations,
+    init_state,
+    start_topic,
+    submit_answer,
+    tutor_chat,
+)
 
 
 # -------------------------------------------------------
@@ -114,7 +26,7 @@ with gr.Blocks(title="EduAgents – AI Tutor") as demo:
     gr.Markdown("## 📘 Set Topic")
     with gr.Row():
         subject = gr.Dropdown(
-            ["Mathematics", "Physics", "Chemistry", "Biology", "History", "Geography", "English", "CS"],
+            list(SUBJECTS),
             label="Select Subject"
         )
         topic = gr.Textbox(label="Enter Topic (e.g., Integration, Motion, Genetics)")
@@ -152,7 +64,7 @@ with gr.Blocks(title="EduAgents – AI Tutor") as demo:
 
     with gr.Row():
         filter_subject = gr.Dropdown(
-            ["All Subjects", "Mathematics", "Physics", "Chemistry", "Biology", "History", "Geography", "English", "CS"],
+            ["All Subjects", *SUBJECTS],
             label="Filter by subject"
         )
         difficulty = gr.Dropdown(["Any", "Easy", "Medium", "Hard"], label="Difficulty")
@@ -172,8 +84,7 @@ with gr.Blocks(title="EduAgents – AI Tutor") as demo:
     gr.Markdown("---")
     gr.Markdown("## 📝 Practice Questions")
 
-    skill_list = list(skill_agent.estimate_from_history([]).keys())
-    skill_select = gr.Dropdown(sorted(skill_list), label="Choose Skill")
+    skill_select = gr.Dropdown(list(SORTED_SKILLS), label="Choose Skill")
 
     pq_btn = gr.Button("Get Practice Question")
     pq_output = gr.Markdown("")
@@ -184,4 +95,23 @@ with gr.Blocks(title="EduAgents – AI Tutor") as demo:
         outputs=[pq_output, state]
     )
 
-demo.launch()
+    # Self-reported outcome, recorded for mastery and review scheduling
+    with gr.Row():
+        right_btn = gr.Button("✅ I got it right")
+        wrong_btn = gr.Button("❌ I got it wrong")
+    answer_output = gr.Markdown("")
+
+    right_btn.click(
+        lambda skill, st: submit_answer(skill, 1.0, st),
+        inputs=[skill_select, state],
+        outputs=[answer_output, state]
+    )
+    wrong_btn.click(
+        lambda skill, st: submit_answer(skill, 0.0, st),
+        inputs=[skill_select, state],
+        outputs=[answer_output, state]
+    )
+
+# Importing app (e.g. from benchmarks) must not start the server
+if __name__ == "__main__":
+    demo.launch()
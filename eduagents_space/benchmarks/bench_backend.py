@@ -0,0 +1,89 @@
+# benchmarks/bench_backend.py
+"""
+Throughput and tail latency of LLMAgent over HTTPBackend, against the local
+stand-in model server (started in-process unless --url is given).
+
+    python benchmarks/bench_backend.py --requests 2000 --concurrency 64 --latency-ms 100 --jitter-ms 30
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.backends import HTTPBackend  # noqa: E402
+from agents.llm_agent import LLMAgent  # noqa: E402
+from stub_llm_server import start_in_thread  # noqa: E402
+
+PROMPTS = ["Explain fractions", "What is integration?", "Explain Newton's second law", "Define genotype"]
+
+
+def percentile(sorted_vals, p):
+    if not sorted_vals:
+        return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, int(p / 100.0 * len(sorted_vals)))]
+
+
+async def run(agent: LLMAgent, requests: int, concurrency: int, stream: bool):
+    gate = asyncio.Semaphore(concurrency)
+    latencies, first_tokens = [], []
+
+    async def one(i):
+        prompt = PROMPTS[i % len(PROMPTS)]
+        async with gate:
+            start = time.perf_counter()
+            if stream:
+                first = None
+                async for _ in agent.astream(prompt):
+                    if first is None:
+                        first = time.perf_counter() - start
+                first_tokens.append(first)
+            else:
+                await agent.agenerate(prompt)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return time.perf_counter() - start, sorted(latencies), sorted(first_tokens)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="existing model server; default starts the stub")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--max-connections", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--token-delay-ms", type=float, default=2.0)
+    parser.add_argument("--stream", action="store_true")
+    args = parser.parse_args()
+
+    stop = None
+    url = args.url
+    if url is None:
+        url, _, stop = start_in_thread(
+            latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, token_delay_ms=args.token_delay_ms
+        )
+
+    backend = HTTPBackend(url, max_connections=args.max_connections)
+    # No response cache: the prompts repeat, and every request should reach the backend
+    agent = LLMAgent(mock=False, backend=backend, cache_size=0)
+    try:
+        elapsed, lat, ttft = asyncio.run(run(agent, args.requests, args.concurrency, args.stream))
+    finally:
+        backend.close()
+        if stop:
+            stop()
+
+    print(f"requests={args.requests} concurrency={args.concurrency} stream={args.stream}")
+    print(f"throughput: {args.requests / elapsed:,.1f} req/s")
+    print("latency ms: " + "  ".join(f"p{p}={percentile(lat, p) * 1000:.1f}" for p in (50, 95, 99)))
+    if ttft:
+        print("first token ms: " + "  ".join(f"p{p}={percentile(ttft, p) * 1000:.1f}" for p in (50, 95, 99)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# benchmarks/bench_cohort.py
+"""
+Cohort analytics (agents/cohort.py) at district scale.
+
+Ingests a synthetic log of --answers answers from --students students over
+every skill in ALL_SKILLS, then times the class-wide queries uncached
+(first call after new data), cached, and for a named group of one class.
+Also times live single-answer updates and a full statistics rebuild.
+
+    python benchmarks/bench_cohort.py --students 500000 --answers 10000000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from agents.cohort import CohortMatrix  # noqa: E402
+from agents.skill_agent import ALL_SKILLS  # noqa: E402
+
+DAY = 86400
+
+
+def synthetic_log(students: int, answers: int, days: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    student = rng.integers(0, students, answers)
+    skill = rng.integers(0, len(ALL_SKILLS), answers)
+    # Per-student ability plus per-skill difficulty, so the skills differ
+    p = np.clip(rng.beta(5, 3, students)[student] - rng.uniform(0, 0.3, len(ALL_SKILLS))[skill], 0.02, 0.98)
+    return pd.DataFrame({
+        "student_id": pd.Categorical.from_codes(student, [f"s{i}" for i in range(students)]),
+        "skill": pd.Categorical.from_codes(skill, ALL_SKILLS),
+        "correct": rng.random(answers) < p,
+        "timestamp": pd.to_datetime(1_700_000_000 + rng.integers(0, days * DAY, answers), unit="s"),
+    })
+
+
+def timed(fn, repeat: int = 1) -> float:
+    """
+    Median milliseconds per call.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=500_000)
+    parser.add_argument("--answers", type=int, default=10_000_000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--class-size", type=int, default=30)
+    parser.add_argument("--batches", type=int, default=5, help="ingest the log in this many parts")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    df = synthetic_log(args.students, args.answers, args.days, args.seed)
+    cohort = CohortMatrix()
+    parts = np.array_split(np.arange(len(df)), args.batches)
+    start = time.perf_counter()
+    for part in parts:
+        cohort.ingest(df.iloc[part])
+    ingest_s = time.perf_counter() - start
+    matrix_mb = (cohort.mastery.nbytes + cohort.counts.nbytes) / 2**20
+    print(f"{len(cohort):,} students x {len(cohort.skills)} skills, {args.answers:,} answers: "
+          f"ingest {ingest_s:.2f}s ({args.answers / ingest_s / 1e6:.1f}M answers/s), matrix {matrix_mb:.0f} MB")
+
+    rng = np.random.default_rng(args.seed + 1)
+    cohort.set_group("class", [f"s{i}" for i in rng.choice(args.students, args.class_size, replace=False)])
+    cohort.set_group("school", [f"s{i}" for i in rng.choice(args.students, min(args.students, 2000), replace=False)])
+
+    def fresh(query):
+        def run():
+            cohort.record("s0", ALL_SKILLS[0], 1.0, time.time())  # new data: invalidates the cache
+            query()
+        return run
+
+    queries = {
+        "skill_distribution": lambda: cohort.skill_distribution(),
+        "heatmap (Mathematics)": lambda: cohort.heatmap("Mathematics"),
+        "weakest_skills (all)": lambda: cohort.weakest_skills(k=5),
+        "trend (all skills)": lambda: cohort.trend(),
+        "weakest_skills group=class": lambda: cohort.weakest_skills(k=5, group="class"),
+        "weakest_skills group=school": lambda: cohort.weakest_skills(k=5, group="school"),
+    }
+    print(f"{'query':<30} {'after update ms':>16} {'cached ms':>10}")
+    for name, query in queries.items():
+        uncached = timed(fresh(query), repeat=20)
+        query()
+        cached = timed(query, repeat=200)
+        print(f"{name:<30} {uncached:>16.2f} {cached:>10.4f}")
+
+    sids = [f"s{i}" for i in rng.integers(0, args.students, 20_000)]
+    start = time.perf_counter()
+    for i, sid in enumerate(sids):
+        cohort.record(sid, ALL_SKILLS[i % len(ALL_SKILLS)], i % 2, 1_700_000_000 + i)
+    record_us = (time.perf_counter() - start) / len(sids) * 1e6
+    print(f"record(): {record_us:.1f} us per answer")
+    print(f"rebuild(): full matrix scan {timed(cohort.rebuild):.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
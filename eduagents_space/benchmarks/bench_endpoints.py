@@ -0,0 +1,257 @@
+# benchmarks/bench_endpoints.py
+"""
+Load test for the app handlers (tutor_chat, get_recommendations,
+get_practice_question, submit_answer in handlers.py) and the agent methods behind them,
+driven by synthetic sessions without importing the Gradio UI.
+
+Each virtual user keeps its own app state and is served by one worker
+thread, like a browser tab. Reports throughput, p50/p95/p99 latency per
+operation and peak RSS. Results can be saved as a baseline and later runs
+compared against it; the exit code is 1 when an operation regresses.
+
+    python benchmarks/bench_endpoints.py --users 200 --requests 5000 --concurrency 16
+    python benchmarks/bench_endpoints.py --save-baseline benchmarks/baseline_endpoints.json
+    python benchmarks/bench_endpoints.py --baseline benchmarks/baseline_endpoints.json --tolerance 0.2
+    python benchmarks/bench_endpoints.py --target app --event-log /tmp/eduagents-events
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import handlers  # noqa: E402  (the app handlers, without the Gradio UI)
+from agents.metrics import METRICS, SamplingProfiler  # noqa: E402
+from agents.skill_agent import ALL_SKILLS, SKILL_CATALOG  # noqa: E402
+
+CHAT_MESSAGES = [
+    "Explain Newton's second law.",
+    "What is integration?",
+    "Explain fractions.",
+    "Give me a practice problem.",
+    "another problem please",
+    "What should I study next?",
+    "thanks!",
+]
+SUBJECTS = ["All Subjects"] + list(SKILL_CATALOG)
+DIFFICULTIES = ["Any", "Easy", "Medium", "Hard"]
+TOPICS = [("Mathematics", "fractions"), ("Mathematics", "algebra"), ("Physics", "mechanics"), ("Biology", "genetics")]
+
+
+def percentile(sorted_vals, p):
+    if not sorted_vals:
+        return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, int(p / 100.0 * len(sorted_vals)))]
+
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+# -------------------------------------------------------------------------
+# OPERATIONS
+# -------------------------------------------------------------------------
+def app_operations() -> Dict[str, Callable[[dict, random.Random], None]]:
+    def chat(state, rng):
+        handlers.tutor_chat(rng.choice(CHAT_MESSAGES), state)
+
+    def recommendations(state, rng):
+        handlers.get_recommendations(rng.choice(SUBJECTS), rng.choice(DIFFICULTIES), state)
+
+    def practice(state, rng):
+        handlers.get_practice_question(rng.choice(ALL_SKILLS), state)
+
+    def answer(state, rng):
+        handlers.submit_answer(rng.choice(ALL_SKILLS), rng.random(), state, seconds=rng.randint(5, 120))
+
+    return {
+        "app.tutor_chat": chat,
+        "app.get_recommendations": recommendations,
+        "app.get_practice_question": practice,
+        "app.submit_answer": answer,
+    }
+
+
+def agent_operations() -> Dict[str, Callable[[dict, random.Random], None]]:
+    def generate(state, rng):
+        handlers.agents().llm.generate(rng.choice(CHAT_MESSAGES), context={
+            "session_id": handlers.session_id(state),
+            "subject": state["subject"],
+            "topic": state["topic"],
+            "given_problems": state["given_problems"],
+        })
+
+    def recommend(state, rng):
+        subject = rng.choice(SUBJECTS)
+        handlers.agents().recommender.generate_recommendations(
+            history=[],
+            skill_estimates={s: rng.random() for s in ALL_SKILLS},
+            llm_agent=handlers.agents().llm,
+            top_k=8,
+            subject_filter=None if subject == "All Subjects" else subject,
+            context={"session_id": handlers.session_id(state), "given_problems": state["given_problems"]},
+        )
+
+    def estimate(state, rng):
+        history = [{"skill": rng.choice(ALL_SKILLS), "score": rng.randint(0, 100)} for _ in range(20)]
+        handlers.agents().skill.estimate_from_history(history)
+
+    return {
+        "agent.llm_generate": generate,
+        "agent.generate_recommendations": recommend,
+        "agent.estimate_from_history": estimate,
+    }
+
+
+# -------------------------------------------------------------------------
+# DRIVER
+# -------------------------------------------------------------------------
+def run(ops, users: int, requests: int, concurrency: int, seed: int) -> Tuple[float, Dict[str, List[float]]]:
+    states = []
+    for i in range(users):
+        state = handlers.init_state()
+        subject, topic = TOPICS[i % len(TOPICS)]
+        handlers.start_topic(subject, topic, state)
+        states.append(state)
+
+    names = sorted(ops)
+    concurrency = max(1, min(concurrency, users))
+
+    def worker(w: int) -> Dict[str, List[float]]:
+        rng = random.Random(seed + w)
+        mine = states[w::concurrency]
+        lat: Dict[str, List[float]] = {name: [] for name in names}
+        for i in range(w, requests, concurrency):
+            name = names[i % len(names)]
+            state = mine[rng.randrange(len(mine))]
+            start = time.perf_counter()
+            ops[name](state, rng)
+            lat[name].append(time.perf_counter() - start)
+        return lat
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        parts = list(pool.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    merged = {name: sorted(x for part in parts for x in part[name]) for name in names}
+    return elapsed, merged
+
+
+def summarize(elapsed: float, latencies: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    out = {}
+    for name, lat in latencies.items():
+        out[name] = {
+            "count": len(lat),
+            "throughput": len(lat) / elapsed if elapsed else 0.0,
+            **{f"p{p}_ms": percentile(lat, p) * 1000 for p in (50, 95, 99)},
+        }
+    total = sum(len(lat) for lat in latencies.values())
+    out["total"] = {"count": total, "throughput": total / elapsed if elapsed else 0.0}
+    return out
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Regressions: p95 more than tolerance above the baseline, or throughput
+    more than tolerance below it.
+    """
+    problems = []
+    for name, base in baseline.get("operations", {}).items():
+        cur = results["operations"].get(name)
+        if cur is None:
+            continue
+        if "p95_ms" in base and cur["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            problems.append(f"{name}: p95 {cur['p95_ms']:.2f} ms vs baseline {base['p95_ms']:.2f} ms")
+        if cur["throughput"] < base["throughput"] / (1 + tolerance):
+            problems.append(f"{name}: {cur['throughput']:,.0f} req/s vs baseline {base['throughput']:,.0f} req/s")
+    base_rss = baseline.get("peak_rss_mb")
+    if base_rss and results["peak_rss_mb"] > base_rss * (1 + tolerance):
+        problems.append(f"peak RSS {results['peak_rss_mb']:.0f} MB vs baseline {base_rss:.0f} MB")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=("app", "agents", "all"), default="all")
+    parser.add_argument("--users", type=int, default=100, help="synthetic sessions")
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--metrics", action="store_true", help="print the per-stage timers (adds overhead)")
+    parser.add_argument("--profile", metavar="PATH", help="write sampled folded stacks to PATH")
+    parser.add_argument("--event-log", metavar="DIR", help="record interactions to an event log in DIR")
+    args = parser.parse_args()
+    if args.event_log:
+        os.environ["EDUAGENTS_EVENT_LOG"] = args.event_log
+
+    ops = {}
+    if args.target in ("app", "all"):
+        ops.update(app_operations())
+    if args.target in ("agents", "all"):
+        ops.update(agent_operations())
+
+    if args.metrics:
+        METRICS.enable()
+    profiler = SamplingProfiler().start() if args.profile else None
+    elapsed, latencies = run(ops, args.users, args.requests, args.concurrency, args.seed)
+    if handlers.agents_loaded() and handlers.agents().events is not None:
+        handlers.agents().events.close()
+    if profiler is not None:
+        profiler.stop()
+        with open(args.profile, "w", encoding="utf-8") as f:
+            f.write(profiler.folded())
+    results = {
+        "config": {k: getattr(args, k) for k in ("target", "users", "requests", "concurrency", "seed")},
+        "seconds": elapsed,
+        "peak_rss_mb": peak_rss_mb(),
+        "operations": summarize(elapsed, latencies),
+    }
+
+    print(f"users={args.users} requests={args.requests} concurrency={args.concurrency} ({elapsed:.2f}s)")
+    print(f"{'operation':<34} {'req/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, row in results["operations"].items():
+        if name == "total":
+            continue
+        print(f"{name:<34} {row['throughput']:>10,.0f} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f}")
+    print(f"{'total':<34} {results['operations']['total']['throughput']:>10,.0f}")
+    print(f"peak RSS: {results['peak_rss_mb']:.0f} MB")
+
+    if args.metrics:
+        timers = METRICS.snapshot()["timers"]
+        print(f"\n{'stage':<58} {'calls':>8} {'total s':>9} {'mean ms':>9}")
+        for name, t in sorted(timers.items(), key=lambda kv: -kv[1]["sum"]):
+            print(f"{name:<58} {t['count']:>8} {t['sum']:>9.3f} {t['mean'] * 1000:>9.3f}")
+    if profiler is not None:
+        print(f"\n{profiler.samples} samples written to {args.profile}; hottest functions:")
+        for fn, n in profiler.top(8):
+            print(f"  {n:>6}  {fn}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        problems = compare(results, baseline, args.tolerance)
+        for p in problems:
+            print(f"REGRESSION {p}")
+        if problems:
+            sys.exit(1)
+        print(f"no regressions vs {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/bench_event_log.py
+"""
+Event log (agents/event_log.py): append cost per chat turn, and restart
+recovery time from the latest snapshot plus its tail vs replaying the
+whole log.
+
+    python benchmarks/bench_event_log.py --events 1000000 2000000 --students 20000
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.event_log import EventLog  # noqa: E402
+from agents.skill_agent import ALL_SKILLS  # noqa: E402
+
+
+def fill(log: EventLog, events: int, students: int, seed: int) -> float:
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    for i in range(events):
+        sid = f"s{rng.randrange(students)}"
+        skill = ALL_SKILLS[rng.randrange(len(ALL_SKILLS))]
+        if i % 2:
+            score = rng.random()
+            log.append("answer", sid, skill=skill, score=round(score, 3), correct=score >= 0.5, seconds=rng.randint(5, 120))
+        else:
+            log.append("served", sid, skill=skill, key=f"Math|{skill}", problem=rng.randrange(10))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--students", type=int, default=20_000)
+    parser.add_argument("--snapshot-every", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'events':>10} {'append us':>10} {'log MB':>8} {'recover s':>10} {'replayed':>10} {'full replay s':>14}")
+    for n in args.events:
+        root = tempfile.mkdtemp()
+        try:
+            snap_dir, full_dir = os.path.join(root, "snap"), os.path.join(root, "full")
+
+            log = EventLog(snap_dir, snapshot_every=args.snapshot_every)
+            append_s = fill(log, n, args.students, args.seed)
+            expected = log.store.to_dict()
+            log.close()
+            size = sum(os.path.getsize(os.path.join(snap_dir, f)) for f in os.listdir(snap_dir)) / 2**20
+
+            log = EventLog(snap_dir)
+            recovered = log.recovered
+            assert log.store.to_dict() == expected
+            log.close()
+
+            log = EventLog(full_dir, snapshot_every=None)
+            fill(log, n, args.students, args.seed)
+            log.close()
+            log = EventLog(full_dir, snapshot_every=None)
+            full = log.recovered
+            log.close()
+
+            print(f"{n:>10,} {append_s / n * 1e6:>10.2f} {size:>8.1f} {recovered['seconds']:>10.2f} "
+                  f"{recovered['replayed']:>10,} {full['seconds']:>14.2f}")
+        finally:
+            shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# benchmarks/bench_import.py
+"""
+Cold-start cost of the service entry points, each measured in fresh
+interpreters: time to import the module, and time to import it and serve a
+first chat request. Also checks that heavy dependencies (gradio, pandas,
+numpy) stay out of the headless import path.
+
+    python benchmarks/bench_import.py --runs 7
+    python benchmarks/bench_import.py --budget-ms handlers=60 server=120 --save results.json
+
+Exit code 1 when a budget is exceeded or a forbidden module was imported,
+so the script can gate CI. Compile bytecode first (python -m compileall .)
+to measure what a deployed worker sees.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# module -> modules that must not be imported with it
+TARGETS = {
+    "handlers": ("gradio", "pandas", "numpy", "asyncio"),
+    "server": ("gradio", "pandas", "numpy"),
+    "agents.llm_agent": ("gradio", "pandas", "numpy", "asyncio"),
+    "agents.recommend_agent": ("gradio", "pandas", "numpy"),
+}
+
+PROBE = """
+import sys, time
+t0 = time.perf_counter()
+import {module}
+t1 = time.perf_counter()
+first = None
+if {first_request}:
+    import handlers
+    handlers.tutor_chat("Explain fractions", handlers.init_state())
+    first = time.perf_counter() - t0
+print({{"import_s": t1 - t0, "first_request_s": first,
+        "loaded": sorted(m for m in {forbidden!r} if m in sys.modules)}})
+"""
+
+
+def probe(module: str, forbidden, first_request: bool) -> dict:
+    code = PROBE.format(module=module, forbidden=tuple(forbidden), first_request=first_request)
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return eval(out.stdout.strip().splitlines()[-1])
+
+
+def parse_budgets(items):
+    budgets = {}
+    for item in items or ():
+        name, _, ms = item.partition("=")
+        budgets[name] = float(ms)
+    return budgets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--targets", nargs="+", default=list(TARGETS))
+    parser.add_argument("--budget-ms", nargs="*", metavar="MODULE=MS",
+                        help="fail when the median import time of MODULE exceeds MS")
+    parser.add_argument("--save", metavar="PATH")
+    args = parser.parse_args()
+    budgets = parse_budgets(args.budget_ms)
+
+    results, failures = {}, []
+    print(f"{'module':<26} {'import ms (median)':>19} {'+first request ms':>18}  forbidden imports")
+    for module in args.targets:
+        forbidden = TARGETS.get(module, ())
+        imports = [probe(module, forbidden, False) for _ in range(args.runs)]
+        firsts = [probe(module, forbidden, True) for _ in range(args.runs)]
+        import_ms = statistics.median(r["import_s"] for r in imports) * 1000
+        first_ms = statistics.median(r["first_request_s"] for r in firsts) * 1000
+        loaded = sorted({m for r in imports for m in r["loaded"]})
+        results[module] = {"import_ms": import_ms, "first_request_ms": first_ms, "forbidden_loaded": loaded}
+        print(f"{module:<26} {import_ms:>19.1f} {first_ms:>18.1f}  {', '.join(loaded) or '-'}")
+
+        if loaded:
+            failures.append(f"{module} imports {', '.join(loaded)}")
+        if module in budgets and import_ms > budgets[module]:
+            failures.append(f"{module} import {import_ms:.1f} ms > budget {budgets[module]:.1f} ms")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
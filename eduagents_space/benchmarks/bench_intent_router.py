@@ -0,0 +1,106 @@
+# benchmarks/bench_intent_router.py
+"""
+Routing throughput: compiled IntentRouter vs the old sequential
+`any(t in lower for t in triggers)` scans, as the trigger list grows.
+"legacy request" is what LLMAgent used to spend per request: the practice
+scan in _cache_key plus the if chain in _mock_response; the router's one
+match() now serves both.
+
+    python benchmarks/bench_intent_router.py --extra 0 100 1000 --messages 20000
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.intent_router import IntentRouter  # noqa: E402
+from agents.llm_agent import EXPLAIN_TRIGGERS, PRACTICE_TRIGGERS, RECOMMEND_TRIGGERS  # noqa: E402
+
+MESSAGES = [
+    "Explain Newton's second law.",
+    "What is integration?",
+    "Give me a practice problem.",
+    "Can you please explain to me how the second law of motion by newton works in simple terms?",
+    "I don't get it, can you show me the solution step by step for the last one",
+    "thanks, that makes sense now",
+    "Generate a practice exercise for skill 'algebra'. The student's mastery is 0.42.",
+]
+
+
+def synthetic_phrases(n: int, rng: random.Random):
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(max(n, 1) * 2)]
+    return [f"{rng.choice(words)} {rng.choice(words)}" for _ in range(n)]
+
+
+def legacy_route(prompt, practice, explain, recommend):
+    lower = prompt.lower().strip()
+    if any(t in lower for t in practice):
+        return "practice"
+    if any(t in lower for t in explain):
+        p = prompt.lower()
+        if "newton" in p and "law" in p:
+            return "answer:newton"
+        if "what is integration" in p:
+            return "answer:integration"
+        if "what is derivative" in p:
+            return "answer:derivative"
+        return "explain"
+    if any(t in lower for t in recommend):
+        return "recommend"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--extra", type=int, nargs="+", default=[0, 100, 1000],
+                        help="synthetic trigger phrases added per intent")
+    parser.add_argument("--messages", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    msgs = [MESSAGES[i % len(MESSAGES)] for i in range(args.messages)]
+
+    print(f"{'extra/intent':>12} {'legacy msg/s':>14} {'legacy request/s':>17} {'router msg/s':>14} {'speedup':>9}")
+    for extra in args.extra:
+        practice = list(PRACTICE_TRIGGERS) + synthetic_phrases(extra, rng)
+        explain = list(EXPLAIN_TRIGGERS) + synthetic_phrases(extra, rng)
+        recommend = list(RECOMMEND_TRIGGERS) + synthetic_phrases(extra, rng)
+
+        router = IntentRouter()
+        router.register("practice", practice, priority=10)
+        router.register("explain", explain, priority=20)
+        router.register("recommend", recommend, priority=30)
+        router.register("answer:newton", all_of=("newton", "law"), priority=100)
+        router.register("answer:integration", ("what is integration",), priority=101)
+        router.register("answer:derivative", ("what is derivative",), priority=102)
+        router.compile()
+
+        start = time.perf_counter()
+        for m in msgs:
+            legacy_route(m, practice, explain, recommend)
+        legacy_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for m in msgs:
+            lower = m.lower().strip()
+            any(t in lower for t in practice)
+            legacy_route(m, practice, explain, recommend)
+        request_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for m in msgs:
+            router.match(m)
+        router_s = time.perf_counter() - start
+
+        print(
+            f"{extra:>12} {len(msgs) / legacy_s:>14,.0f} {len(msgs) / request_s:>17,.0f}"
+            f" {len(msgs) / router_s:>14,.0f} {legacy_s / router_s:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
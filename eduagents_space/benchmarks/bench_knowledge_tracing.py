@@ -0,0 +1,141 @@
+# benchmarks/bench_knowledge_tracing.py
+"""
+BKT mastery (agents/knowledge_tracing.py) vs the mean-score estimate.
+
+Synthetic logs are simulated from a known BKT process (random parameters
+per skill), so both estimates can be scored against the hidden "known"
+state as well as on next-answer prediction for held-out students.
+
+    python benchmarks/bench_knowledge_tracing.py --sizes 100000 1000000 5000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.knowledge_tracing import KnowledgeTracer  # noqa: E402
+from agents.mastery_engine import compute_mastery  # noqa: E402
+from agents.skill_agent import ALL_SKILLS  # noqa: E402
+
+
+def simulate(rows: int, max_len: int = 30, seed: int = 0):
+    """
+    Returns (log DataFrame, {(student_id, skill): known at the end}).
+    """
+    rng = np.random.default_rng(seed)
+    n_skills = len(ALL_SKILLS)
+    init = rng.uniform(0.1, 0.6, n_skills)
+    learn = rng.uniform(0.05, 0.3, n_skills)
+    slip = rng.uniform(0.05, 0.2, n_skills)
+    guess = rng.uniform(0.1, 0.3, n_skills)
+
+    n_seq = max(1, rows * 2 // (max_len + 1))
+    lengths = rng.integers(1, max_len + 1, n_seq)
+    skill = rng.integers(0, n_skills, n_seq)
+    student = rng.integers(0, max(1, n_seq // 8), n_seq)
+
+    known = rng.random(n_seq) < init[skill]
+    correct = np.zeros((n_seq, max_len), dtype=np.int8)
+    for t in range(max_len):
+        p = np.where(known, 1.0 - slip[skill], guess[skill])
+        correct[:, t] = rng.random(n_seq) < p
+        known |= rng.random(n_seq) < learn[skill]
+
+    steps = np.arange(max_len)
+    live = steps[None, :] < lengths[:, None]
+    seq_id, t = np.nonzero(live)
+    df = pd.DataFrame({
+        "student_id": pd.Series(student[seq_id]).map("s{}".format),
+        "timestamp": pd.to_datetime(1_700_000_000 + t * 60 + seq_id % 60, unit="s"),
+        "skill": np.asarray(ALL_SKILLS, dtype=object)[skill[seq_id]],
+        "correct": correct[seq_id, t],
+    })
+    # Same student may have drawn a skill twice; the later sequence wins
+    truth = {("s%d" % s, ALL_SKILLS[k]): bool(kn) for s, k, kn in zip(student, skill, known)}
+    return df, truth
+
+
+def running_mean_pred(df: pd.DataFrame, default: float = 0.65) -> np.ndarray:
+    """
+    Mean-score baseline as a next-answer prediction: mean of the earlier
+    answers in the same (student, skill) sequence, default when none.
+    """
+    frame = df[["student_id", "skill", "timestamp", "correct"]].reset_index(drop=True)
+    frame = frame.sort_values(["student_id", "skill", "timestamp"], kind="stable")
+    g = frame.groupby(["student_id", "skill"], sort=False)["correct"]
+    prev_sum = g.cumsum() - frame["correct"]
+    prev_n = g.cumcount()
+    pred = np.where(prev_n > 0, prev_sum / prev_n.clip(lower=1), default)
+    out = np.empty(len(df))
+    out[frame.index.to_numpy()] = pred
+    return out
+
+
+def auc(y: np.ndarray, p: np.ndarray) -> float:
+    ranks = pd.Series(p).rank().to_numpy()
+    pos = y.sum()
+    neg = len(y) - pos
+    return float((ranks[y == 1].sum() - pos * (pos + 1) / 2) / (pos * neg)) if pos and neg else float("nan")
+
+
+def log_loss(y: np.ndarray, p: np.ndarray) -> float:
+    p = np.clip(p, 1e-6, 1 - 1e-6)
+    return float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)))
+
+
+def report(name: str, y: np.ndarray, p: np.ndarray) -> None:
+    acc = float(np.mean((p >= 0.5) == (y == 1)))
+    print(f"  {name:<26} auc={auc(y, p):.3f}  log_loss={log_loss(y, p):.3f}  acc={acc:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10 ** 5, 10 ** 6, 5 * 10 ** 6])
+    parser.add_argument("--fit-rows", type=int, default=500_000, help="rows used to fit the parameters")
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'mean (s)':>10} {'bkt trace (s)':>14} {'bkt rows/s':>12}")
+    for rows in args.sizes:
+        df, _ = simulate(rows)
+        start = time.perf_counter()
+        compute_mastery(df)
+        mean_s = time.perf_counter() - start
+        tracer = KnowledgeTracer()
+        start = time.perf_counter()
+        tracer.trace(df)
+        bkt_s = time.perf_counter() - start
+        print(f"{len(df):>12,} {mean_s:>10.3f} {bkt_s:>14.3f} {len(df) / bkt_s:>12,.0f}")
+
+    # --- Accuracy: fit on 80% of students, evaluate on the rest ---
+    df, truth = simulate(args.fit_rows, seed=1)
+    ids = df["student_id"].unique()
+    test_ids = set(ids[: len(ids) // 5])
+    is_test = df["student_id"].isin(test_ids).to_numpy()
+    train, test = df[~is_test], df[is_test].reset_index(drop=True)
+
+    start = time.perf_counter()
+    tracer = KnowledgeTracer().fit(train)
+    print(f"\nfit on {len(train):,} rows: {time.perf_counter() - start:.2f}s")
+
+    y = test["correct"].to_numpy()
+    print(f"next-answer prediction, {len(test):,} held-out rows:")
+    report("mean score (running)", y, running_mean_pred(test))
+    report("bkt (default params)", y, KnowledgeTracer().predict(test))
+    report("bkt (fitted)", y, tracer.predict(test))
+
+    mean_m = compute_mastery(test)
+    bkt_m = tracer.trace(test)
+    keys = [(sid, sk) for sid, sk in truth if sid in test_ids and sk in bkt_m.get(sid, {})]
+    known = np.array([truth[k] for k in keys], dtype=np.int8)
+    print(f"final mastery vs hidden known state, {len(keys):,} (student, skill) pairs:")
+    report("mean score", known, np.array([mean_m[s][k] for s, k in keys]))
+    report("bkt (fitted)", known, np.array([bkt_m[s][k] for s, k in keys]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# benchmarks/bench_mastery.py
+"""
+Compares the columnar mastery engine with the old row-by-row loop.
+
+    python benchmarks/bench_mastery.py                 # 10^5, 10^6, 10^7 rows
+    python benchmarks/bench_mastery.py --sizes 100000 --legacy-cap 100000
+
+The legacy loop is very slow at large sizes, so it is timed on at most
+--legacy-cap rows and extrapolated linearly (marked with '~').
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.mastery_engine import compute_mastery  # noqa: E402
+from agents.skill_agent import ALL_SKILLS  # noqa: E402
+
+
+def synthetic_log(rows: int, students: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "student_id": pd.Series(rng.integers(0, students, rows)).map("s{}".format),
+        "skill": np.asarray(ALL_SKILLS, dtype=object)[rng.integers(0, len(ALL_SKILLS), rows)],
+        "score": rng.integers(0, 101, rows),
+    })
+
+
+def legacy_loop(df: pd.DataFrame, default_mastery: float = 0.65):
+    """The pre-engine SkillAgent.estimate_from_df loop, applied per student."""
+    per_student = {}
+    for _, row in df.iterrows():
+        skill = str(row.get("skill")).strip()
+        val = float(row.get("score", 0))
+        if val > 1.0:
+            val /= 100.0
+        per_student.setdefault(row.get("student_id"), {}).setdefault(skill, []).append(val)
+    out = {}
+    for sid, skills in per_student.items():
+        out[sid] = {
+            s: max(0.0, min(1.0, statistics.mean(skills[s]))) if s in skills else default_mastery
+            for s in ALL_SKILLS
+        }
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10 ** 5, 10 ** 6, 10 ** 7])
+    parser.add_argument("--students", type=int, default=10_000)
+    parser.add_argument("--legacy-cap", type=int, default=10 ** 5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'engine (s)':>12} {'legacy (s)':>12} {'speedup':>10}")
+    for rows in args.sizes:
+        df = synthetic_log(rows, args.students)
+
+        start = time.perf_counter()
+        compute_mastery(df)
+        engine_s = time.perf_counter() - start
+
+        legacy_rows = min(rows, args.legacy_cap)
+        start = time.perf_counter()
+        legacy_loop(df.iloc[:legacy_rows])
+        legacy_s = (time.perf_counter() - start) * rows / legacy_rows
+        mark = "~" if legacy_rows < rows else " "
+
+        print(f"{rows:>12,} {engine_s:>12.3f} {mark}{legacy_s:>11.3f} {legacy_s / engine_s:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
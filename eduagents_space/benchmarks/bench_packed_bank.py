@@ -0,0 +1,136 @@
+# benchmarks/bench_packed_bank.py
+"""
+Memory per worker process: the JSON content catalog (dicts of tuples,
+agents/catalog.py) vs the memory-mapped pack (agents/packed_bank.py).
+
+Writes a synthetic catalog of --problems problems to a temp directory,
+builds the pack from it, then starts --workers processes per mode. Each
+loads the catalog, serves --draws random non-repeating draws and reports
+its memory while all workers are still alive:
+
+    RSS   resident pages, shared ones counted in every worker
+    PSS   shared pages split between the processes mapping them
+    USS   pages private to the worker (what each extra worker really costs)
+
+    python benchmarks/bench_packed_bank.py --problems 200000 --workers 4
+
+Linux only (reads /proc/self/smaps_rollup).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agents.catalog import ContentCatalog  # noqa: E402
+from agents.packed_bank import build_from_catalog, pack_info  # noqa: E402
+
+POOL_SIZE = 10
+SUBJECTS = ("Math", "Physics", "Chemistry", "Biology", "History", "Geography")
+
+WORKER = """
+import json, random, sys, time
+sys.path.insert(0, {root!r})
+
+def memory():
+    out = {{}}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if name in ("Rss", "Pss", "Private_Clean", "Private_Dirty"):
+                out[name] = int(value.split()[0]) / 1024
+    return {{"rss_mb": out["Rss"], "pss_mb": out["Pss"], "uss_mb": out["Private_Clean"] + out["Private_Dirty"]}}
+
+base = memory()
+t0 = time.perf_counter()
+if {mode!r} == "packed":
+    from agents.packed_bank import PackedCatalog
+    catalog = PackedCatalog({pack!r})
+else:
+    from agents.catalog import ContentCatalog
+    catalog = ContentCatalog({content_dir!r})
+bank = catalog.problem_bank
+load_s = time.perf_counter() - t0
+
+rng = random.Random({seed})
+subjects = {subjects!r}
+masks = {{}}
+t0 = time.perf_counter()
+for _ in range({draws}):
+    i = rng.randrange({pools})
+    key = f"{{subjects[i % len(subjects)]}}|topic {{i}}"
+    _, masks[key] = bank.draw(key, masks.get(key, 0), rng)
+draw_s = time.perf_counter() - t0
+catalog.explanation(None, "topic 1")
+
+print(json.dumps({{"load_s": load_s, "draw_us": draw_s / {draws} * 1e6, "base": base, **memory()}}), flush=True)
+sys.stdin.read()  # stay alive until every worker has reported
+"""
+
+
+def write_content(content_dir: str, problems: int) -> int:
+    pools = {}
+    for i in range(max(1, problems // POOL_SIZE)):
+        key = f"{SUBJECTS[i % len(SUBJECTS)]}|topic {i}"
+        pools[key] = [
+            [f"Problem {j} on topic {i}: compute the value of expression #{i * 31 + j} step by step.",
+             f"Hint {j}: recall the rule for topic {i}."]
+            for j in range(POOL_SIZE)
+        ]
+    explanations = {f"topic {i}": f"Topic {i} covers the ideas behind problems {i * POOL_SIZE}+." for i in range(len(pools))}
+    for name, data in (("problem_pools", pools), ("explanations", explanations),
+                       ("skill_samples", {"samples": {}, "aliases": {}})):
+        with open(os.path.join(content_dir, name + ".json"), "w", encoding="utf-8") as f:
+            json.dump(data, f)
+    return len(pools)
+
+
+def run_workers(mode: str, workers: int, **params) -> list:
+    code = WORKER.format(root=ROOT, mode=mode, subjects=SUBJECTS, **params)
+    procs = [
+        subprocess.Popen([sys.executable, "-c", code], cwd=ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        for _ in range(workers)
+    ]
+    results = [json.loads(p.stdout.readline()) for p in procs]
+    for p in procs:
+        p.stdin.close()
+        p.wait()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--problems", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--draws", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pools = write_content(tmp, args.problems)
+        pack = os.path.join(tmp, "content.pack")
+        start = time.perf_counter()
+        build_from_catalog(pack, ContentCatalog(tmp))
+        build_s = time.perf_counter() - start
+        info = pack_info(pack)
+        json_mb = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp) if f.endswith(".json")) / 2**20
+        print(f"{info['problems']:,} problems in {pools:,} pools; JSON {json_mb:.1f} MB, "
+              f"pack {info['bytes'] / 2**20:.1f} MB built in {build_s:.1f}s; {args.workers} workers per mode")
+
+        params = dict(pack=pack, content_dir=tmp, seed=args.seed, draws=args.draws, pools=pools)
+        print(f"{'mode':<8} {'load s':>7} {'draw us':>8} {'RSS MB':>8} {'PSS MB':>8} {'USS MB':>8} {'catalog USS MB':>15}")
+        for mode in ("json", "packed"):
+            rows = run_workers(mode, args.workers, **params)
+            mean = {k: sum(r[k] for r in rows) / len(rows) for k in ("load_s", "draw_us", "rss_mb", "pss_mb", "uss_mb")}
+            added = sum(r["uss_mb"] - r["base"]["uss_mb"] for r in rows) / len(rows)
+            print(f"{mode:<8} {mean['load_s']:>7.2f} {mean['draw_us']:>8.1f} {mean['rss_mb']:>8.1f} "
+                  f"{mean['pss_mb']:>8.1f} {mean['uss_mb']:>8.1f} {added:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# benchmarks/bench_retrieval.py
+"""
+Topic retrieval (agents/retrieval.py) on synthetic problem banks.
+
+Each pool gets a made-up multi-word topic and problems that mention it.
+Queries are the topics with one word dropped or misspelled, so the exact
+"Subject|topic" lookup misses and the index has to find the pool. Reports
+build time, uncached query latency and how often the intended pool is
+ranked first.
+
+    python benchmarks/bench_retrieval.py --problems 100000 200000 --pool-size 10
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.problem_bank import ProblemBank  # noqa: E402
+from agents.retrieval import TopicRetriever  # noqa: E402
+
+SUBJECTS = ["Math", "Physics", "Chemistry", "Biology", "History", "Geography"]
+SYLLABLES = ["ka", "lo", "mi", "ne", "ro", "tu", "va", "zi", "pe", "qu", "sa", "do", "fi", "gu", "ha", "ju"]
+
+
+def word(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def synthetic_bank(problems: int, pool_size: int, seed: int = 0):
+    rng = random.Random(seed)
+    pools, topics, total = {}, {}, 0
+    while total < problems:
+        subject = rng.choice(SUBJECTS)
+        topic = " ".join(word(rng) for _ in range(rng.randint(2, 3)))
+        key = f"{subject}|{topic}"
+        if key in pools:
+            continue
+        pools[key] = [
+            (f"Using {topic}, find the {word(rng)} of {rng.randint(1, 99)} {word(rng)}.", f"Recall {word(rng)}.")
+            for _ in range(pool_size)
+        ]
+        topics[key] = topic
+        total += pool_size
+    return ProblemBank.from_pools(pools), topics
+
+
+def perturb(topic: str, rng: random.Random) -> str:
+    words = topic.split()
+    if len(words) > 2 and rng.random() < 0.5:
+        words.pop(rng.randrange(len(words)))
+    else:
+        i = rng.randrange(len(words))
+        w = words[i]
+        j = rng.randrange(len(w))
+        words[i] = w[:j] + w[j + 1:]  # drop a letter
+    return " ".join(words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--problems", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'problems':>10} {'pools':>8} {'build s':>8} {'p50 ms':>8} {'p99 ms':>8} {'top-1':>7}")
+    for n in args.problems:
+        bank, topics = synthetic_bank(n, args.pool_size, args.seed)
+        retriever = TopicRetriever(bank, {})
+
+        start = time.perf_counter()
+        index = retriever.pools
+        build = time.perf_counter() - start
+
+        rng = random.Random(args.seed + 1)
+        keys = list(topics)
+        lat, correct = [], 0
+        for _ in range(args.queries):
+            key = rng.choice(keys)
+            query = perturb(topics[key], rng)
+            t0 = time.perf_counter()
+            hits = index.search(query, 1)
+            lat.append(time.perf_counter() - t0)
+            correct += bool(hits) and hits[0].key == key
+        lat.sort()
+        p50 = statistics.median(lat) * 1000
+        p99 = lat[int(0.99 * (len(lat) - 1))] * 1000
+        print(f"{len(bank):>10,} {len(index):>8,} {build:>8.2f} {p50:>8.3f} {p99:>8.3f} {correct / args.queries:>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
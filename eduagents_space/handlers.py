@@ -0,0 +1,284 @@
+# handlers.py
+"""
+UI-independent handlers for the tutor: used by the Gradio app (app.py) and
+the headless JSON API (server.py).
+
+Importing this module does not import gradio or pandas, and the agents are
+only built on first use, so a worker that never serves a request never
+pays for them.
+"""
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from agents.given_problems import GivenProblems
+
+DIFFICULTY_BADGES = {"Easy": "🟢", "Medium": "🟡", "Hard": "🔴"}
+
+
+class Agents:
+    __slots__ = ("llm", "recommender", "skill", "scheduler", "events", "cohort")
+
+    def __init__(self):
+        from agents.llm_agent import LLMAgent
+        from agents.recommend_agent import RecommendationAgent
+        from agents.scheduler import ReviewScheduler
+        from agents.skill_agent import SkillAgent
+
+        self.llm = LLMAgent()
+        self.recommender = RecommendationAgent()
+        self.skill = SkillAgent()
+        self.scheduler = ReviewScheduler()
+
+        # Review queues live as long as the session. Mastery is kept: it is
+        # the record the event log snapshots and the cohort is built from
+        self.llm.sessions.on_evict = self.forget_session
+
+        # Durable interaction log; replays recorded answers into the skill store
+        self.events = None
+        if os.environ.get("EDUAGENTS_EVENT_LOG"):
+            from agents.event_log import EventLog
+            self.events = EventLog(os.environ["EDUAGENTS_EVENT_LOG"], store=self.skill.store)
+
+        # Class-wide analytics (NumPy); built from the store on first use
+        self.cohort = None
+
+    def forget_session(self, session_id: str) -> None:
+        self.scheduler.forget(session_id)
+
+
+_agents: Optional[Agents] = None
+_agents_lock = threading.Lock()
+
+
+def agents() -> Agents:
+    """
+    The process-wide agents, built on first call.
+    """
+    global _agents
+    if _agents is None:
+        with _agents_lock:
+            if _agents is None:
+                _agents = Agents()
+    return _agents
+
+
+def agents_loaded() -> bool:
+    return _agents is not None
+
+
+# Default state
+def init_state():
+    return {
+        "given_problems": GivenProblems(),
+        "topic": None,
+        "subject": None,
+        "session_id": None
+    }
+
+
+def session_id(state):
+    # gr.State copies the initial value per user, so the ID is assigned on first use
+    if not state.get("session_id"):
+        state["session_id"] = str(uuid.uuid4())
+    return state["session_id"]
+
+
+def log_event(event_type: str, state, **fields) -> None:
+    events = agents().events
+    if events is not None:
+        events.append(event_type, session_id(state), **{k: v for k, v in fields.items() if v is not None})
+
+# --------------------------
+# START TOPIC
+# --------------------------
+def start_topic(subject, topic, state):
+    if not topic or topic.strip() == "":
+        return "⚠️ Please enter a topic first!", state
+
+    state["subject"] = subject
+    state["topic"] = topic.strip()
+
+    return f"### Topic set to **{topic}**\nSubject: **{subject}**\nYou can now ask for explanations or practice problems.", state
+
+# --------------------------
+# TUTOR CHAT
+# --------------------------
+def _chat_context(state) -> Dict[str, Any]:
+    return {
+        "session_id": session_id(state),
+        "topic": state["topic"],
+        "subject": state["subject"],
+        "given_problems": state["given_problems"]
+    }
+
+
+def tutor_chat_response(user_msg, state) -> Dict[str, Any]:
+    return agents().llm.generate(user_msg, context=_chat_context(state))
+
+
+def tutor_chat(user_msg, state):
+
+    if not user_msg.strip():
+        return "⚠️ Please type a message.", state
+
+    response = tutor_chat_response(user_msg, state)
+
+    # sync memory
+    state["given_problems"] = response.get("given_problems", state["given_problems"])
+    log_event("chat", state, subject=state["subject"], topic=state["topic"])
+
+    return response["text"], state
+
+
+async def tutor_chat_async(user_msg, state):
+    if not user_msg.strip():
+        return "⚠️ Please type a message.", state
+
+    # The first call builds the agents; do that off the event loop too
+    llm = (agents() if agents_loaded() else await run_blocking(agents)).llm
+    if llm.mock or llm.backend is None:
+        # The mock answers with CPU work in-process; keep it off the event loop
+        response = await run_blocking(tutor_chat_response, user_msg, state)
+    else:
+        # With a model backend this awaits the model instead of blocking the loop
+        response = await llm.agenerate(user_msg, context=_chat_context(state))
+    state["given_problems"] = response.get("given_problems", state["given_problems"])
+    log_event("chat", state, subject=state["subject"], topic=state["topic"])
+    return response["text"], state
+
+# --------------------------
+# RECOMMENDATIONS
+# --------------------------
+def recommendation_cards(filter_subject, difficulty, state, top_k: int = 8) -> List[Dict[str, Any]]:
+    a = agents()
+    # Mastery from the answers recorded for this session (defaults until then)
+    skills = a.skill.estimate_for_student(session_id(state))
+
+    subject_filter_val = None if filter_subject in (None, "All Subjects") else filter_subject
+    difficulty_filter_val = None if difficulty in (None, "Any") else difficulty
+
+    sid = session_id(state)
+    context = {"session_id": sid, "given_problems": state["given_problems"]}
+    # Each session gets a review schedule; cards come from its due queue
+    cards = a.recommender.generate_recommendations(
+        history=[],
+        skill_estimates=skills,
+        llm_agent=a.llm,
+        top_k=top_k,
+        subject_filter=subject_filter_val,
+        difficulty_filter=difficulty_filter_val,
+        context=context,
+        scheduler=a.scheduler,
+        student_id=sid
+    )
+    state["given_problems"] = context["given_problems"]
+    return cards
+
+
+def get_recommendations(filter_subject, difficulty, state):
+
+    recommendations = recommendation_cards(filter_subject, difficulty, state)
+
+    if not recommendations:
+        return "⚠️ No recommendations found."
+
+    txt = ""
+    for r in recommendations:
+        badge = DIFFICULTY_BADGES.get(r["difficulty"], "")
+        txt += f"### {r['title']} {badge}\n**Skill:** {r['skill']}\n\n{r['excerpt']}\n\n---\n"
+
+    return txt
+
+# --------------------------
+# PRACTICE QUESTION
+# --------------------------
+def get_practice_question(skill_selected, state):
+
+    response = agents().llm.generate(
+        f"Give practice problem for {skill_selected}",
+        context={
+            "session_id": session_id(state),
+            "skill": skill_selected,
+            "difficulty": None,
+            "given_problems": state["given_problems"]
+        }
+    )
+
+    state["given_problems"] = response.get("given_problems", state["given_problems"])
+    log_event("served", state, skill=skill_selected)
+
+    return response["text"], state
+
+# --------------------------
+# ANSWERS
+# --------------------------
+def submit_answer(skill, score, state, seconds=None):
+    """
+    Records the outcome of a practice problem: score in 0–1 (or 0–100, or
+    True/False). Updates mastery and the skill's review schedule.
+    """
+    if not skill:
+        return "⚠️ Please choose a skill.", state
+    from agents.mastery_store import normalize_score
+
+    score = normalize_score(score)
+    a = agents()
+    sid = session_id(state)
+    a.llm.sessions.get(sid)  # keeps the session (and its review queue) alive
+    if sid not in a.scheduler:
+        a.scheduler.seed(sid, a.skill.estimate_for_student(sid))
+
+    if a.events is not None:
+        # The log applies the answer to the skill store
+        log_event("answer", state, skill=skill, score=score, correct=score >= 0.5, seconds=seconds)
+        mastery = a.skill.store.get(sid, skill)
+    else:
+        mastery = a.skill.record_answer(sid, skill, score)
+    item = a.scheduler.record(sid, skill, score, mastery=mastery)
+    if a.cohort is not None:
+        a.cohort.record(sid, skill, score, time.time())
+
+    return f"Recorded. Mastery of **{skill}**: {mastery:.0%} (next review in {item.interval:g} days)", state
+
+# --------------------------
+# COHORT ANALYTICS
+# --------------------------
+def cohort():
+    """
+    The process-wide CohortMatrix, built from the skill store on first call
+    and kept current by submit_answer (trends start from that first call).
+    """
+    a = agents()
+    if a.cohort is None:
+        with _agents_lock:
+            if a.cohort is None:
+                from agents.cohort import CohortMatrix
+                a.cohort = CohortMatrix.from_store(a.skill.store)
+    return a.cohort
+
+
+def cohort_report(subject=None, top_k: int = 5) -> Dict[str, Any]:
+    """
+    Class-wide view: weakest skills per subject, the mastery heatmap and the
+    daily answer trend (for one subject, or all when None).
+    """
+    c = cohort()
+    subject = None if subject in (None, "All Subjects") else subject
+    return {
+        "students": len(c),
+        "weakest": c.weakest_skills(subject, k=top_k),
+        "heatmap": c.heatmap(subject),
+        "trend": c.trend(subject=subject, last=30),
+    }
+
+
+async def run_blocking(fn, *args):
+    """
+    Runs a synchronous handler on the default executor.
+    """
+    import asyncio  # ~40 ms to import; only async callers (server.py) pay for it
+
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
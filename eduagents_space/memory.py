@@ -1,22 +1,286 @@
-import time, uuid
-class MemoryBank:
+import json, sqlite3, threading, time, uuid
+from collections import OrderedDict
+
+from agents.metrics import METRICS
+
+# reads record their touch in the backend in batches of this many sessions,
+# or after this many seconds, whichever comes first (and on close)
+TOUCH_BATCH = 256
+TOUCH_INTERVAL = 5.0
+
+
+def _size_of(obj):
+    # approximate footprint used for the memory budget
+    return len(json.dumps(obj, default=str))
+
+
+class InMemoryBackend:
+    """Keeps sessions in a process-local dict. Nothing survives a restart."""
+
     def __init__(self):
-        # simple in-memory store: dict of session_id -> list of entries
+        # session_id -> {'created_at', 'touched_at', 'data', 'entries', 'ttl'}
         self.store = {}
 
-    def create(self, obj):
+    def put(self, sid, record):
+        self.store[sid] = record
+
+    def get(self, sid):
+        return self.store.get(sid)
+
+    def append(self, sid, objs, touched_at):
+        rec = self.store.get(sid)
+        if rec is None:
+            return False
+        rec['entries'].extend(objs)
+        rec['touched_at'] = touched_at
+        return True
+
+    def touch(self, touches):
+        # touches: [(session_id, touched_at)]
+        for sid, touched_at in touches:
+            rec = self.store.get(sid)
+            if rec is not None:
+                rec['touched_at'] = max(rec['touched_at'], touched_at)
+
+    def delete(self, sid):
+        self.store.pop(sid, None)
+
+    def scan(self):
+        # (session_id, touched_at, size, ttl) for rebuilding the eviction index
+        for sid, rec in self.store.items():
+            size = _size_of(rec['data']) + sum(_size_of(e) for e in rec['entries'])
+            yield sid, rec['touched_at'], size, rec.get('ttl')
+
+    def clear(self):
+        self.store = {}
+
+    def close(self):
+        pass
+
+
+class SQLiteBackend:
+    """Stores sessions in a SQLite file so they survive restarts. Objects must be JSON-serializable."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS sessions (
+                sid TEXT PRIMARY KEY, created_at REAL, touched_at REAL, data TEXT, size INTEGER, ttl REAL);
+            CREATE TABLE IF NOT EXISTS entries (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT, sid TEXT, obj TEXT);
+            CREATE INDEX IF NOT EXISTS entries_sid ON entries (sid, seq);
+        ''')
+        # files written before per-session ttl was stored
+        columns = [row[1] for row in self._db.execute('PRAGMA table_info(sessions)')]
+        if 'ttl' not in columns:
+            self._db.execute('ALTER TABLE sessions ADD COLUMN ttl REAL')
+
+    def put(self, sid, record):
+        data = json.dumps(record['data'])
+        with self._lock, self._db:
+            self._db.execute('DELETE FROM entries WHERE sid = ?', (sid,))
+            self._db.execute(
+                'INSERT OR REPLACE INTO sessions (sid, created_at, touched_at, data, size, ttl) VALUES (?, ?, ?, ?, ?, ?)',
+                (sid, record['created_at'], record['touched_at'], data, len(data), record.get('ttl')))
+            self._db.executemany(
+                'INSERT INTO entries (sid, obj) VALUES (?, ?)',
+                [(sid, json.dumps(e)) for e in record['entries']])
+
+    def get(self, sid):
+        with self._lock:
+            row = self._db.execute(
+                'SELECT created_at, touched_at, data, ttl FROM sessions WHERE sid = ?', (sid,)).fetchone()
+            if row is None:
+                return None
+            entries = [json.loads(o) for (o,) in self._db.execute(
+                'SELECT obj FROM entries WHERE sid = ? ORDER BY seq', (sid,))]
+        return {'created_at': row[0], 'touched_at': row[1], 'data': json.loads(row[2]), 'entries': entries, 'ttl': row[3]}
+
+    def append(self, sid, objs, touched_at):
+        rows = [(sid, json.dumps(o)) for o in objs]
+        added = sum(len(o) for _, o in rows)
+        with self._lock, self._db:
+            cur = self._db.execute(
+                'UPDATE sessions SET touched_at = ?, size = size + ? WHERE sid = ?', (touched_at, added, sid))
+            if cur.rowcount == 0:
+                return False
+            self._db.executemany('INSERT INTO entries (sid, obj) VALUES (?, ?)', rows)
+        return True
+
+    def touch(self, touches):
+        with self._lock, self._db:
+            self._db.executemany(
+                'UPDATE sessions SET touched_at = ? WHERE sid = ? AND touched_at < ?',
+                [(t, sid, t) for sid, t in touches])
+
+    def delete(self, sid):
+        with self._lock, self._db:
+            self._db.execute('DELETE FROM sessions WHERE sid = ?', (sid,))
+            self._db.execute('DELETE FROM entries WHERE sid = ?', (sid,))
+
+    def scan(self):
+        with self._lock:
+            rows = self._db.execute('SELECT sid, touched_at, size, ttl FROM sessions ORDER BY touched_at').fetchall()
+        return iter(rows)
+
+    def clear(self):
+        with self._lock, self._db:
+            self._db.execute('DELETE FROM sessions')
+            self._db.execute('DELETE FROM entries')
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class MemoryBank:
+    """
+    Session store: create a session, append entries to it, read it back.
+
+    backend:   InMemoryBackend (default) or SQLiteBackend(path) for persistence
+    ttl:       seconds a session may go untouched before it expires (None = never)
+    max_bytes: approximate size budget; least recently used sessions are evicted past it
+    """
+
+    def __init__(self, backend=None, ttl=None, max_bytes=None, clock=time.time):
+        self.backend = backend if backend is not None else InMemoryBackend()
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self._lock = threading.Lock()
+        # session_id -> [expires_at, size, ttl], in least-recently-used order
+        self._index = OrderedDict()
+        self._bytes = 0
+        self._next_purge = 0.0
+        # session_id -> touched_at of reads not yet written to the backend
+        self._touched = {}
+        self._next_touch_flush = self.clock() + TOUCH_INTERVAL
+        for sid, touched_at, size, ttl in sorted(self.backend.scan(), key=lambda row: row[1]):
+            self._track(sid, touched_at, size, ttl)
+        self.purge_expired()
+
+    @METRICS.timed("memory_bank_seconds", op="create")
+    def create(self, obj, ttl=None):
         sid = str(uuid.uuid4())
-        self.store[sid] = {'created_at': time.time(), 'data': obj, 'entries': []}
+        now = self.clock()
+        with self._lock:
+            if self.ttl is not None and now >= self._next_purge:
+                # sweep sessions nobody reads again, at most twice per ttl
+                self._purge(now)
+                self._next_purge = now + self.ttl / 2
+            self.backend.put(sid, {'created_at': now, 'touched_at': now, 'data': obj, 'entries': [], 'ttl': ttl})
+            self._track(sid, now, _size_of(obj), ttl)
+            self._enforce_budget()
         return sid
 
     def append(self, sid, obj):
-        if sid in self.store:
-            self.store[sid]['entries'].append(obj)
-            return True
-        return False
+        return self.append_many(sid, [obj])
+
+    @METRICS.timed("memory_bank_seconds", op="append_many")
+    def append_many(self, sid, objs):
+        # one backend write (one transaction for SQLite) for the whole batch
+        objs = list(objs)
+        now = self.clock()
+        with self._lock:
+            if not self._alive(sid, now):
+                return False
+            if not self.backend.append(sid, objs, now):
+                return False
+            self._touched.pop(sid, None)
+            self._touch(sid, now, sum(_size_of(o) for o in objs))
+            self._enforce_budget()
+        return True
 
+    @METRICS.timed("memory_bank_seconds", op="get")
     def get(self, sid):
-        return self.store.get(sid)
+        now = self.clock()
+        with self._lock:
+            if not self._alive(sid, now):
+                return None
+            self._touch(sid, now, 0)
+            # a read extends the ttl too, so it has to survive a restart
+            self._touched[sid] = now
+            if len(self._touched) >= TOUCH_BATCH or now >= self._next_touch_flush:
+                self._flush_touches(now)
+        return self.backend.get(sid)
+
+    @METRICS.timed("memory_bank_seconds", op="delete")
+    def delete(self, sid):
+        with self._lock:
+            self._forget(sid)
+
+    @METRICS.timed("memory_bank_seconds", op="purge_expired")
+    def purge_expired(self):
+        with self._lock:
+            return self._purge(self.clock())
 
     def clear(self):
-        self.store = {}
+        with self._lock:
+            self.backend.clear()
+            self._index.clear()
+            self._touched.clear()
+            self._bytes = 0
+
+    def close(self):
+        with self._lock:
+            self._flush_touches(self.clock())
+        self.backend.close()
+
+    def __len__(self):
+        return len(self._index)
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+    # ---- internals (caller holds self._lock) ----
+    def _track(self, sid, touched_at, size, ttl=None):
+        ttl = ttl if ttl is not None else self.ttl
+        self._index[sid] = [touched_at + ttl if ttl is not None else None, size, ttl]
+        self._bytes += size
+
+    def _touch(self, sid, now, added):
+        item = self._index[sid]
+        if item[2] is not None:
+            item[0] = now + item[2]
+        item[1] += added
+        self._bytes += added
+        self._index.move_to_end(sid)
+
+    def _purge(self, now):
+        expired = [sid for sid, (exp, _, _) in self._index.items() if exp is not None and exp <= now]
+        for sid in expired:
+            self._forget(sid)
+        return len(expired)
+
+    def _alive(self, sid, now):
+        item = self._index.get(sid)
+        if item is None:
+            return False
+        if item[0] is not None and item[0] <= now:
+            self._forget(sid)
+            return False
+        return True
+
+    def _flush_touches(self, now):
+        if self._touched:
+            self.backend.touch(list(self._touched.items()))
+            self._touched.clear()
+        self._next_touch_flush = now + TOUCH_INTERVAL
+
+    def _forget(self, sid):
+        self._touched.pop(sid, None)
+        item = self._index.pop(sid, None)
+        if item is not None:
+            self._bytes -= item[1]
+            self.backend.delete(sid)
+
+    def _enforce_budget(self):
+        if self.max_bytes is None:
+            return
+        while self._bytes > self.max_bytes and len(self._index) > 1:
+            self._forget(next(iter(self._index)))
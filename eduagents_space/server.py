@@ -0,0 +1,406 @@
+# server.py
+"""
+Headless JSON API for the tutor, as a plain ASGI application (no web
+framework needed). Serve it with any ASGI server, e.g.
+
+    python server.py --workers 4 --port 8000          # uvicorn, one process per worker
+    uvicorn server:app --workers 4
+
+Endpoints (JSON in, JSON out; session_id is created when omitted):
+
+    GET  /healthz
+    GET  /metrics                  Prometheus text (see agents/metrics.py)
+    POST /v1/session               -> {"session_id"}
+    POST /v1/topic                 {"session_id", "subject", "topic"}
+    POST /v1/chat                  {"session_id", "message"}
+    POST /v1/practice              {"session_id", "skill"}
+    POST /v1/recommendations       {"session_id", "subject", "difficulty", "top_k"}
+    POST /v1/answer                {"session_id", "skill", "score" (0-1), "seconds"}
+    POST /v1/cohort                {"subject", "top_k"} -> class-wide weakest skills,
+                                   mastery heatmap, daily trend (agents/cohort.py)
+
+Agents are built on the first request (or at startup with
+EDUAGENTS_PRELOAD=1), per worker process. Per-session state lives in the
+LLMAgent session pool; with several workers it is also kept in a SQLite
+file shared by all of them (EDUAGENTS_SESSION_DB, set automatically by
+`--workers N`), since a session's requests may reach any worker.
+
+Answers (mastery, review schedules) and cohort analytics are kept in the
+worker process, so /v1/answer and /v1/cohort answer 409 while session
+state is shared between workers; serve them with --workers 1.
+
+On shutdown the server stops taking requests, waits up to
+EDUAGENTS_DRAIN_SECONDS for in-flight ones and closes the model backend.
+
+With EDUAGENTS_EVENT_LOG=<dir>, served problems, answers and chat turns are
+appended to a durable event log (agents/event_log.py) that restores mastery
+on restart. A log directory has one writer, so use it with --workers 1.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import handlers
+from agents.given_problems import GivenProblems
+from agents.metrics import METRICS
+
+MAX_BODY_BYTES = 64 * 1024
+DRAIN_SECONDS = float(os.environ.get("EDUAGENTS_DRAIN_SECONDS", "10"))
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# -------------------------------------------------------------------------
+# SESSION STATE
+# -------------------------------------------------------------------------
+class SharedSessions:
+    """
+    Session state (subject, topic, given problems) in a SQLite file that
+    every worker process reads and writes. One connection per process,
+    used from executor threads one at a time.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS api_sessions ("
+                "sid TEXT PRIMARY KEY, subject TEXT, topic TEXT, given TEXT, updated_at REAL)"
+            )
+        return self._db
+
+    def load(self, ctx) -> None:
+        with self._lock:
+            row = self.db.execute(
+                "SELECT subject, topic, given FROM api_sessions WHERE sid = ?", (ctx.session_id,)
+            ).fetchone()
+        if row is not None:
+            ctx.subject, ctx.topic = row[0], row[1]
+            ctx.given_problems = GivenProblems.from_dict(json.loads(row[2]), ctx.given_problems.window)
+
+    def save(self, ctx) -> None:
+        given = json.dumps(ctx.given_problems.to_dict())
+        with self._lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO api_sessions VALUES (?, ?, ?, ?, ?)",
+                (ctx.session_id, ctx.subject, ctx.topic, given, time.time()),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_shared: Optional[SharedSessions] = (
+    SharedSessions(os.environ["EDUAGENTS_SESSION_DB"]) if os.environ.get("EDUAGENTS_SESSION_DB") else None
+)
+
+
+def _load_state_sync(body: Dict[str, Any]) -> Tuple[Dict[str, Any], Any]:
+    sid = body.get("session_id") or handlers.session_id({})
+    ctx = handlers.agents().llm.sessions.get(str(sid))
+    if _shared is not None:
+        _shared.load(ctx)
+    state = {
+        "session_id": ctx.session_id,
+        "subject": ctx.subject,
+        "topic": ctx.topic,
+        "given_problems": ctx.given_problems,
+    }
+    return state, ctx
+
+
+def _save_state_sync(state: Dict[str, Any], ctx) -> None:
+    ctx.subject = state["subject"]
+    ctx.topic = state["topic"]
+    ctx.given_problems = state["given_problems"]
+    if _shared is not None:
+        _shared.save(ctx)
+
+
+async def _load_state(body: Dict[str, Any]) -> Tuple[Dict[str, Any], Any]:
+    """
+    Handler state for the request's session, backed by the pooled
+    SessionContext (created when the session is new or omitted). Runs on
+    the executor: the first call builds the agents and SQLite blocks.
+    """
+    return await handlers.run_blocking(_load_state_sync, body)
+
+
+async def _save_state(state: Dict[str, Any], ctx) -> None:
+    await handlers.run_blocking(_save_state_sync, state, ctx)
+
+
+def _per_process(feature: str) -> None:
+    # Mastery, review schedules and cohort analytics live in each worker;
+    # with session state shared between workers they would disagree
+    if _shared is not None:
+        raise HTTPError(409, f"{feature} is kept per process; run the server with --workers 1")
+
+
+def _text(body: Dict[str, Any], field: str, required: bool = True) -> Optional[str]:
+    value = body.get(field)
+    if value is None and not required:
+        return None
+    if not isinstance(value, str):
+        raise HTTPError(400, f"'{field}' must be a string")
+    return value
+
+
+# -------------------------------------------------------------------------
+# ROUTES
+# -------------------------------------------------------------------------
+async def new_session(body):
+    _, ctx = await _load_state({})
+    return {"session_id": ctx.session_id}
+
+
+async def set_topic(body):
+    state, ctx = await _load_state(body)
+    text, state = handlers.start_topic(_text(body, "subject", False), _text(body, "topic"), state)
+    await _save_state(state, ctx)
+    return {"session_id": ctx.session_id, "text": text}
+
+
+async def chat(body):
+    state, ctx = await _load_state(body)
+    text, state = await handlers.tutor_chat_async(_text(body, "message"), state)
+    await _save_state(state, ctx)
+    return {"session_id": ctx.session_id, "text": text}
+
+
+async def practice(body):
+    state, ctx = await _load_state(body)
+    text, state = await handlers.run_blocking(handlers.get_practice_question, _text(body, "skill"), state)
+    await _save_state(state, ctx)
+    return {"session_id": ctx.session_id, "text": text}
+
+
+async def recommendations(body):
+    state, ctx = await _load_state(body)
+    top_k = body.get("top_k", 8)
+    if not isinstance(top_k, int) or not 0 < top_k <= 50:
+        raise HTTPError(400, "'top_k' must be an integer in 1..50")
+    cards = await handlers.run_blocking(
+        handlers.recommendation_cards,
+        _text(body, "subject", False),
+        _text(body, "difficulty", False),
+        state,
+        top_k,
+    )
+    await _save_state(state, ctx)
+    return {"session_id": ctx.session_id, "recommendations": cards}
+
+
+async def answer(body):
+    _per_process("answer tracking")
+    state, ctx = await _load_state(body)
+    score = body.get("score")
+    if isinstance(score, bool) or not isinstance(score, (int, float)) or not 0 <= score <= 1:
+        raise HTTPError(400, "'score' must be a number in 0..1")
+    seconds = body.get("seconds")
+    if seconds is not None and not isinstance(seconds, (int, float)):
+        raise HTTPError(400, "'seconds' must be a number")
+    text, state = await handlers.run_blocking(handlers.submit_answer, _text(body, "skill"), score, state, seconds)
+    await _save_state(state, ctx)
+    return {"session_id": ctx.session_id, "text": text}
+
+
+async def cohort(body):
+    _per_process("cohort analytics")
+    top_k = body.get("top_k", 5)
+    if not isinstance(top_k, int) or not 0 < top_k <= 50:
+        raise HTTPError(400, "'top_k' must be an integer in 1..50")
+    return await handlers.run_blocking(handlers.cohort_report, _text(body, "subject", False), top_k)
+
+
+ROUTES: Dict[str, Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]] = {
+    "/v1/session": new_session,
+    "/v1/topic": set_topic,
+    "/v1/chat": chat,
+    "/v1/practice": practice,
+    "/v1/recommendations": recommendations,
+    "/v1/answer": answer,
+    "/v1/cohort": cohort,
+}
+
+
+# -------------------------------------------------------------------------
+# ASGI APPLICATION
+# -------------------------------------------------------------------------
+class TutorAPI:
+    def __init__(self, preload: bool = False, drain_seconds: float = DRAIN_SECONDS):
+        self.preload = preload
+        self.drain_seconds = drain_seconds
+        self.in_flight = 0
+        self.draining = False
+        self._idle: Optional[asyncio.Event] = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self._idle = asyncio.Event()
+                self._idle.set()
+                if self.preload:
+                    await asyncio.get_running_loop().run_in_executor(None, handlers.agents)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def shutdown(self) -> None:
+        """
+        Refuses new requests, waits for in-flight ones, then closes the backend.
+        """
+        self.draining = True
+        if self._idle is not None and self.in_flight:
+            try:
+                await asyncio.wait_for(self._idle.wait(), self.drain_seconds)
+            except asyncio.TimeoutError:
+                pass
+        if handlers.agents_loaded():
+            backend = handlers.agents().llm.backend
+            if backend is not None:
+                # The pool belongs to the backend's own loop: close() shuts it
+                # down there and stops that thread
+                await handlers.run_blocking(backend.close)
+            if handlers.agents().events is not None:
+                await handlers.run_blocking(handlers.agents().events.close)
+        if _shared is not None:
+            _shared.close()
+
+    async def _http(self, scope, receive, send):
+        path, method = scope["path"], scope["method"]
+        if path == "/healthz":
+            status = 503 if self.draining else 200
+            await _send_json(send, status, {"status": "draining" if self.draining else "ok"})
+            return
+        if path == "/metrics":
+            await _send(send, 200, METRICS.prometheus().encode("utf-8"), b"text/plain; version=0.0.4")
+            return
+
+        route = ROUTES.get(path)
+        if route is None:
+            await _send_json(send, 404, {"error": "not found"})
+            return
+        if method != "POST":
+            await _send_json(send, 405, {"error": "use POST"})
+            return
+        if self.draining:
+            await _send_json(send, 503, {"error": "shutting down"})
+            return
+
+        self.in_flight += 1
+        if self._idle is not None:
+            self._idle.clear()
+        try:
+            with METRICS.span("api_request_seconds", path=path):
+                body = await _read_json(receive)
+                result = await route(body)
+            await _send_json(send, 200, result)
+        except HTTPError as e:
+            await _send_json(send, e.status, {"error": e.message})
+        finally:
+            self.in_flight -= 1
+            if self.in_flight == 0 and self._idle is not None:
+                self._idle.set()
+
+
+async def _read_json(receive) -> Dict[str, Any]:
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise HTTPError(400, "client disconnected")
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise HTTPError(413, "request body too large")
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            break
+    raw = b"".join(chunks)
+    if not raw.strip():
+        return {}
+    try:
+        body = json.loads(raw)
+    except ValueError:
+        raise HTTPError(400, "invalid JSON")
+    if not isinstance(body, dict):
+        raise HTTPError(400, "body must be a JSON object")
+    return body
+
+
+async def _send(send, status: int, payload: bytes, content_type: bytes) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", content_type), (b"content-length", str(len(payload)).encode())],
+    })
+    await send({"type": "http.response.body", "body": payload})
+
+
+async def _send_json(send, status: int, obj: Any) -> None:
+    payload = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+    await _send(send, status, payload, b"application/json")
+
+
+app = TutorAPI(preload=os.environ.get("EDUAGENTS_PRELOAD", "") not in ("", "0"))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the tutor JSON API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    import uvicorn  # optional dependency, only needed to run the server directly
+
+    if args.workers > 1 and os.environ.get("EDUAGENTS_EVENT_LOG"):
+        parser.error("EDUAGENTS_EVENT_LOG has a single writer; use --workers 1")
+    if args.workers > 1 and not os.environ.get("EDUAGENTS_SESSION_DB"):
+        import tempfile
+        os.environ["EDUAGENTS_SESSION_DB"] = os.path.join(tempfile.gettempdir(), f"eduagents-sessions-{os.getpid()}.db")
+
+    uvicorn.run(
+        "server:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_graceful_shutdown=int(DRAIN_SECONDS),
+        log_level="info",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Local stand-in model server for measuring the real-backend path offline.
+
+Answers POST /v1/completions with canned completions from the mock
+LLMAgent, after a configurable delay, over keep-alive HTTP/1.1:
+
+    python stub_llm_server.py --port 8808 --latency-ms 120 --jitter-ms 40 --token-delay-ms 5
+
+Request:  {"prompt": str, "max_tokens": int, "context": {...}, "stream": bool}
+Response: {"text": str}, or with "stream": true a chunked body of
+          newline-delimited {"token": str} objects.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import threading
+from typing import Callable, Optional, Tuple
+
+from agents.llm_agent import LLMAgent
+
+
+class StubModelServer:
+    def __init__(
+        self,
+        latency_ms: float = 100.0,
+        jitter_ms: float = 0.0,
+        token_delay_ms: float = 0.0,
+        error_rate: float = 0.0
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.token_delay_ms = token_delay_ms
+        self.error_rate = error_rate
+        self.requests = 0
+        self.connections = 0
+        self._agent = LLMAgent(mock=True)
+
+    def _delay(self) -> float:
+        return max(0.0, self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000.0
+
+    def completion(self, req: dict) -> str:
+        context = dict(req.get("context") or {})
+        context.pop("session_id", None)
+        return self._agent.generate(req.get("prompt", ""), context=context)["text"]
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    request_line = await reader.readuntil(b"\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readuntil(b"\r\n")
+                    if line == b"\r\n":
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                self.requests += 1
+
+                if method == "GET" and path == "/healthz":
+                    await self._respond(writer, 200, b'{"ok": true}')
+                elif method == "POST" and path == "/v1/completions":
+                    await self._complete(writer, json.loads(body or b"{}"))
+                else:
+                    await self._respond(writer, 404, b'{"error": "not found"}')
+
+                if headers.get("connection", "").lower() == "close":
+                    return
+        finally:
+            writer.close()
+
+    async def _complete(self, writer: asyncio.StreamWriter, req: dict) -> None:
+        await asyncio.sleep(self._delay())
+        if self.error_rate and random.random() < self.error_rate:
+            await self._respond(writer, 503, b'{"error": "overloaded"}')
+            return
+
+        text = self.completion(req)
+        if not req.get("stream"):
+            await self._respond(writer, 200, json.dumps({"text": text}).encode())
+            return
+
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+            b"Transfer-Encoding: chunked\r\nConnection: keep-alive\r\n\r\n"
+        )
+        for token in re.findall(r"\S+\s*|\s+", text)[: max(1, int(req.get("max_tokens", 200)))]:
+            line = json.dumps({"token": token}).encode() + b"\n"
+            writer.write(b"%x\r\n%s\r\n" % (len(line), line))
+            await writer.drain()
+            if self.token_delay_ms:
+                await asyncio.sleep(self.token_delay_ms / 1000.0)
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, body: bytes) -> None:
+        reason = {200: "OK", 404: "Not Found", 503: "Service Unavailable"}.get(status, "")
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8808) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle, host, port)
+
+
+def start_in_thread(port: int = 0, **kwargs) -> Tuple[str, StubModelServer, Callable[[], None]]:
+    """
+    Runs a StubModelServer on a background loop. Returns (base_url, server, stop).
+    port=0 picks a free port.
+    """
+    stub = StubModelServer(**kwargs)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    holder = {}
+
+    async def boot():
+        holder["server"] = await stub.serve("127.0.0.1", port)
+        started.set()
+
+    threading.Thread(target=loop.run_forever, name="stub-llm-server", daemon=True).start()
+    asyncio.run_coroutine_threadsafe(boot(), loop)
+    started.wait()
+    bound_port = holder["server"].sockets[0].getsockname()[1]
+
+    def stop():
+        async def shutdown():
+            holder["server"].close()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+    return f"http://127.0.0.1:{bound_port}", stub, stop
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Stand-in model server with canned completions.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8808)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--token-delay-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    stub = StubModelServer(args.latency_ms, args.jitter_ms, args.token_delay_ms, args.error_rate)
+
+    async def run():
+        server = await stub.serve(args.host, args.port)
+        print(f"stub model server on http://{args.host}:{args.port}")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
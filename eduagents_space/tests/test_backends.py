@@ -0,0 +1,78 @@
+# tests/test_backends.py
+import asyncio
+
+import pytest
+
+from agents.backends import BackendError, HTTPBackend
+from stub_llm_server import start_in_thread
+
+
+@pytest.fixture(scope="module")
+def url():
+    url, _, stop = start_in_thread(latency_ms=0, jitter_ms=0, token_delay_ms=0)
+    yield url
+    stop()
+
+
+def complete_concurrently(backend, n=4):
+    # One connection for n requests: the pool's semaphore has to wait, which
+    # binds it to the backend loop
+    futures = [backend.submit(backend.complete(f"Explain fractions {i}")) for i in range(n)]
+    return [f.result(timeout=10) for f in futures]
+
+
+def test_backend_is_reusable_after_close(url):
+    backend = HTTPBackend(url, max_connections=1)
+    try:
+        first = complete_concurrently(backend)
+        backend.close()
+        assert complete_concurrently(backend) == first
+    finally:
+        backend.close()
+
+
+def test_backend_is_reusable_after_aclose_from_another_loop(url):
+    backend = HTTPBackend(url)
+    try:
+        assert asyncio.run(backend.acomplete("Explain fractions"))
+        asyncio.run(backend.aclose())
+        assert asyncio.run(backend.acomplete("Explain fractions"))
+    finally:
+        backend.close()
+
+
+def test_close_stops_the_loop_thread(url):
+    backend = HTTPBackend(url)
+    assert backend.complete_sync("Explain fractions")
+    loop, thread = backend.loop, backend._thread
+    backend.close()
+    assert not thread.is_alive()
+    assert loop.is_closed()
+    backend.close()
+
+
+@pytest.mark.parametrize("body", [b'{"txt": "hello"}', b"<html>oops</html>", b"[1, 2]", b'{"text": null}'])
+def test_malformed_body_is_a_backend_error(body):
+    url, stub, stop = start_in_thread(latency_ms=0, jitter_ms=0, token_delay_ms=0)
+    respond = stub._respond
+
+    async def malformed(writer, status, payload):
+        await respond(writer, status, body if status == 200 else payload)
+
+    stub._respond = malformed
+    backend = HTTPBackend(url, retries=0)
+    try:
+        with pytest.raises(BackendError, match="malformed"):
+            backend.complete_sync("Explain fractions")
+    finally:
+        backend.close()
+        stop()
+
+
+def test_url_schemes():
+    assert HTTPBackend("http://example.com").port == 80
+    secure = HTTPBackend("https://example.com")
+    assert secure.tls and secure.port == 443
+    assert HTTPBackend("https://example.com:8443").port == 8443
+    with pytest.raises(ValueError):
+        HTTPBackend("ftp://example.com")
@@ -0,0 +1,67 @@
+# tests/test_batch_pipeline.py
+import os
+import shutil
+
+import pytest
+
+from agents import batch_pipeline
+from agents.batch_pipeline import run_pipeline
+
+LOG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dataset_sample", "student_sessions.csv")
+
+
+@pytest.fixture
+def log(tmp_path):
+    path = tmp_path / "sessions.csv"
+    shutil.copy(LOG, path)
+    return path
+
+
+def test_rerun_skips_finished_parts(log, tmp_path):
+    out = str(tmp_path / "out")
+    first = run_pipeline(str(log), out, shard_size=2, workers=1)
+    reports = []
+    again = run_pipeline(str(log), out, shard_size=2, workers=1, progress=lambda s: reports.append(s.done_shards))
+    assert first.skipped_shards == 0
+    assert again.skipped_shards == again.shards == first.shards
+    # Skipped shards are reported too
+    assert reports == list(range(1, first.shards + 1))
+    assert again.done_students == first.done_students
+
+
+def test_log_changed_during_ingest_can_be_rerun(log, tmp_path, monkeypatch):
+    out = str(tmp_path / "out")
+    ingest = batch_pipeline.ingest_sessions
+
+    def ingest_then_append(path, **kwargs):
+        result = ingest(path, **kwargs)
+        with open(log, "a", encoding="utf-8") as f:
+            f.write("s0,2025-01-09 10:00:00,ex99,algebra,1,30\n")
+        return result
+
+    monkeypatch.setattr(batch_pipeline, "ingest_sessions", ingest_then_append)
+    with pytest.raises(ValueError, match="changed while it was being read"):
+        run_pipeline(str(log), out, shard_size=2, workers=1)
+    monkeypatch.undo()
+    stats = run_pipeline(str(log), out, shard_size=2, workers=1)
+    assert stats.skipped_shards == 0 and stats.done_shards == stats.shards
+
+
+def test_grown_log_is_not_mixed_with_old_parts(log, tmp_path):
+    out = str(tmp_path / "out")
+    run_pipeline(str(log), out, shard_size=2, workers=1)
+    with open(log, "a", encoding="utf-8") as f:
+        f.write("s0,2025-01-09 10:00:00,ex99,algebra,1,30\n")
+    with pytest.raises(ValueError, match="different settings"):
+        run_pipeline(str(log), out, shard_size=2, workers=1)
+
+
+def test_log_rewritten_in_place_is_detected(log, tmp_path):
+    out = str(tmp_path / "out")
+    run_pipeline(str(log), out, shard_size=2, workers=1)
+    data = log.read_text(encoding="utf-8")
+    log.write_text(data.replace("s1,", "s9,"), encoding="utf-8")  # same size, new contents
+    st = os.stat(log)
+    os.utime(log, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    with pytest.raises(ValueError, match="different settings"):
+        run_pipeline(str(log), out, shard_size=2, workers=1)
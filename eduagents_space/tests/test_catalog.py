@@ -0,0 +1,70 @@
+# tests/test_catalog.py
+import json
+import logging
+import os
+import shutil
+
+import pytest
+
+from agents.catalog import CONTENT_DIR, ContentCatalog
+
+
+@pytest.fixture
+def content_dir(tmp_path):
+    for name in os.listdir(CONTENT_DIR):
+        shutil.copy(os.path.join(CONTENT_DIR, name), tmp_path)
+    return tmp_path
+
+
+def touch_later(path):
+    st = os.stat(path)
+    os.utime(path, (st.st_atime, st.st_mtime + 10))
+
+
+def test_reload_picks_up_changes(content_dir):
+    catalog = ContentCatalog(str(content_dir))
+    path = content_dir / "explanations.json"
+    data = json.loads(path.read_text())
+    data["optics"] = "Light travels in straight lines."
+    path.write_text(json.dumps(data))
+    touch_later(path)
+    assert catalog.reload_if_changed()
+    assert catalog.explanation(None, "optics") == "Light travels in straight lines."
+    assert catalog.version == 1
+
+
+def test_invalid_file_keeps_last_good_content(content_dir, caplog):
+    catalog = ContentCatalog(str(content_dir), reload_interval=0)
+    path = content_dir / "explanations.json"
+    good = path.read_text()
+    expected = catalog.explanation(None, "fractions")
+
+    path.write_text(good[:len(good) // 2])  # half-written
+    touch_later(path)
+    with caplog.at_level(logging.ERROR, logger="agents.catalog"):
+        assert catalog.explanation(None, "fractions") == expected
+        assert catalog.explanation(None, "fractions") == expected
+    assert catalog.version == 0
+    assert len(caplog.records) == 1  # logged once per broken version
+
+    path.write_text(good)
+    touch_later(path)
+    assert catalog.explanation(None, "fractions") == expected
+    assert catalog.version == 1
+
+
+def test_invalid_shape_keeps_last_good_content(content_dir):
+    catalog = ContentCatalog(str(content_dir))
+    path = content_dir / "problem_pools.json"
+    path.write_text(json.dumps({"Math|fractions": [["question without hint"]]}))
+    touch_later(path)
+    assert not catalog.reload_if_changed()
+    assert len(catalog.problem_bank.pool("Math|fractions")) > 0
+
+
+def test_explicit_reload_raises_and_keeps_content(content_dir):
+    catalog = ContentCatalog(str(content_dir))
+    (content_dir / "explanations.json").write_text("{")
+    with pytest.raises(ValueError):
+        catalog.reload()
+    assert catalog.explanation(None, "fractions")
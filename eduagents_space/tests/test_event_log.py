@@ -0,0 +1,96 @@
+# tests/test_event_log.py
+import glob
+import os
+
+import pytest
+
+import handlers
+from agents import llm_agent
+from agents.event_log import EventLog, read_segment
+from agents.mastery_store import MasteryStore
+
+
+def answer(log, sid, skill, score):
+    return log.append("answer", sid, skill=skill, score=score, correct=score >= 0.5)
+
+
+def test_replay_without_snapshot(tmp_path):
+    with EventLog(str(tmp_path), snapshot_every=None) as log:
+        answer(log, "s1", "algebra", 1.0)
+        answer(log, "s1", "algebra", 0.0)
+        log.append("chat", "s1", topic="fractions")
+        answer(log, "s2", "motion", 0.5)
+
+    store = MasteryStore()
+    with EventLog(str(tmp_path), store=store, snapshot_every=None) as log:
+        assert log.recovered["replayed"] == 4
+        assert log.seq == 4
+        assert store.get("s1", "algebra") == 0.5
+        assert store.get("s2", "motion") == 0.5
+        assert answer(log, "s2", "motion", 1.0) == 5
+
+
+def test_snapshot_compacts_and_replays_the_tail(tmp_path):
+    with EventLog(str(tmp_path), snapshot_every=None) as log:
+        for i in range(10):
+            answer(log, f"s{i % 3}", "algebra", i % 2)
+        seq = log.snapshot()
+        answer(log, "s0", "geometry", 1.0)
+    assert seq == 10
+    assert [os.path.basename(p) for p in glob.glob(str(tmp_path / "snapshot-*.json"))] == ["snapshot-000000000010.json"]
+    assert all(int(os.path.basename(p)[7:19]) > seq for p in glob.glob(str(tmp_path / "events-*.jsonl")))
+
+    store = MasteryStore()
+    with EventLog(str(tmp_path), store=store, snapshot_every=None) as log:
+        assert log.recovered == {**log.recovered, "snapshot_seq": 10, "replayed": 1}
+        assert store.stats("s0", "algebra").count == 4
+        assert store.get("s0", "geometry") == 1.0
+
+
+def test_torn_last_line_is_dropped(tmp_path):
+    with EventLog(str(tmp_path), snapshot_every=None) as log:
+        answer(log, "s1", "algebra", 1.0)
+    (segment,) = glob.glob(str(tmp_path / "events-*.jsonl"))
+    with open(segment, "a") as f:
+        f.write('{"seq":2,"type":"answer","sid":"s1","skill":"alg')
+    assert [e["seq"] for e in read_segment(segment)] == [1]
+
+    store = MasteryStore()
+    with EventLog(str(tmp_path), store=store, snapshot_every=None) as log:
+        assert log.seq == 1
+        assert store.stats("s1", "algebra").count == 1
+
+
+def test_one_writer_per_directory(tmp_path):
+    with EventLog(str(tmp_path), snapshot_every=None):
+        with pytest.raises(RuntimeError):
+            EventLog(str(tmp_path))
+
+
+def test_evicted_sessions_survive_snapshot_and_reopen(tmp_path, monkeypatch):
+    monkeypatch.setenv("EDUAGENTS_EVENT_LOG", str(tmp_path))
+    pool = llm_agent.SessionPool
+    monkeypatch.setattr(llm_agent, "SessionPool", lambda **kw: pool(**{**kw, "max_sessions": 2}))
+    a = handlers.Agents()
+    monkeypatch.setattr(handlers, "_agents", a)
+    states = [handlers.init_state() for _ in range(3)]
+    for state, score in zip(states, (0.0, 1.0, 0.5)):
+        handlers.submit_answer("algebra", score, state)
+    first = handlers.session_id(states[0])
+    assert first not in a.llm.sessions and first not in a.scheduler
+    a.events.snapshot()
+    a.events.close()
+
+    b = handlers.Agents()
+    monkeypatch.setattr(handlers, "_agents", b)
+    try:
+        # Restoring mastery opens no sessions
+        assert len(b.llm.sessions) == 0
+        assert len(b.skill.store) == 3
+        assert b.skill.store.get(first, "algebra") == 0.0
+        assert b.skill.store.get(handlers.session_id(states[1]), "algebra") == 1.0
+        # The evicted student picks up where they left off
+        handlers.submit_answer("algebra", 1.0, states[0])
+        assert b.skill.store.stats(first, "algebra").count == 2
+    finally:
+        b.events.close()
@@ -0,0 +1,55 @@
+# tests/test_given_problems.py
+import json
+import random
+
+from agents.given_problems import GivenProblems
+from agents.llm_agent import LLMAgent
+from agents.problem_bank import ProblemBank
+
+KEY = "Math|fractions"
+BANK = ProblemBank.from_pools({KEY: [(f"q{i}", f"h{i}") for i in range(6)]})
+
+
+def test_windowed_state_survives_a_json_round_trip():
+    rng = random.Random(0)
+    given = GivenProblems(window=3)
+    for _ in range(5):
+        given.draw(BANK, KEY, rng)
+
+    restored = GivenProblems.from_dict(json.loads(json.dumps(given.to_dict())))
+    assert restored.window == 3
+    assert restored.masks == given.masks
+    # the restored record forgets the same problems in the same order
+    for _ in range(10):
+        pos = rng.randrange(6)
+        given.add(KEY, pos)
+        restored.add(KEY, pos)
+        assert restored.masks == given.masks
+
+
+def test_restored_session_does_not_repeat_the_window():
+    given = GivenProblems(window=3)
+    served = [given.draw(BANK, KEY).question for _ in range(3)]
+    restored = GivenProblems.from_dict(given.to_dict())
+    # a drawn problem can only be one the window excludes
+    assert restored.draw(BANK, KEY).question not in served
+
+
+def test_legacy_masks_and_smaller_windows():
+    assert GivenProblems.from_dict({KEY: 0b101}).masks == {KEY: 0b101}
+
+    given = GivenProblems(window=4)
+    for pos in (0, 1, 2, 3):
+        given.add(KEY, pos)
+    smaller = GivenProblems.from_dict(given.to_dict(), window=2)
+    assert smaller.window == 2
+    assert smaller.masks == {KEY: 0b1100}  # only the two most recent remain
+
+
+def test_agent_sessions_use_the_given_window():
+    agent = LLMAgent(problem_bank=BANK, given_window=2)
+    context = {"session_id": "s1", "subject": "Math", "topic": "fractions"}
+    for _ in range(4):
+        agent.generate("Give me a practice problem", context)
+    assert agent.sessions.get("s1").given_problems.window == 2
+    assert agent.sessions.get("s1").given_problems.count(KEY) == 2
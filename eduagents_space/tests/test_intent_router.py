@@ -0,0 +1,124 @@
+# tests/test_intent_router.py
+import random
+
+import pytest
+
+from agents.intent_router import IntentRouter
+from agents.llm_agent import DIRECT_ANSWERS, EXPLAIN_TRIGGERS, PRACTICE_TRIGGERS, RECOMMEND_TRIGGERS, build_default_router
+
+
+def legacy_route(prompt):
+    # The if chain LLMAgent._mock_response used before the router
+    lower = prompt.lower().strip()
+    if any(t in lower for t in PRACTICE_TRIGGERS):
+        return "practice"
+    if any(t in lower for t in EXPLAIN_TRIGGERS):
+        if "newton" in lower and "law" in lower:
+            return "answer:newton"
+        if "what is integration" in lower:
+            return "answer:integration"
+        if "what is derivative" in lower:
+            return "answer:derivative"
+        return "explain"
+    if "generate a practice" in lower:
+        return "recommend"
+    return None
+
+
+def routed(router, prompt):
+    # How _mock_response reads a RouteMatch
+    route = router.match(prompt)
+    if "practice" in route:
+        return "practice"
+    if "explain" in route:
+        return next((intent for intent, _, _ in DIRECT_ANSWERS if intent in route), "explain")
+    if "recommend" in route:
+        return "recommend"
+    return None
+
+
+@pytest.mark.parametrize("prompt, expected", [
+    ("Give me a practice problem.", "practice"),
+    ("ANOTHER PROBLEM please", "practice"),
+    ("Explain Newton's second law", "answer:newton"),
+    ("What is integration?", "answer:integration"),
+    ("what is derivative of x^2", "answer:derivative"),
+    ("Explain more", "explain"),
+    ("can you show me the solution", "explain"),
+    ("the law of newton", None),  # all_of alone is not an explanation request
+    ("thanks, that makes sense", None),
+    ("", None),
+    # practice wins over explain and recommend
+    ("Explain this practice problem", "practice"),
+    # overlapping triggers: "generate a practice" hides "practice exercise"
+    ("Generate a practice exercise for skill 'algebra'.", "practice"),
+    ("generate a practice set", "recommend"),
+    # "explain" inside "explain more", "what is" inside "what is integration"
+    ("what is integration, explain more", "answer:integration"),
+    ("definewton law", "answer:newton"),
+])
+def test_default_routes_match_the_old_if_chain(prompt, expected):
+    router = build_default_router()
+    assert legacy_route(prompt) == expected
+    assert routed(router, prompt) == expected
+
+
+def test_random_messages_match_the_old_if_chain():
+    rng = random.Random(0)
+    router = build_default_router()
+    pieces = [
+        *PRACTICE_TRIGGERS, *EXPLAIN_TRIGGERS, *RECOMMEND_TRIGGERS,
+        "practice", "exercise", "generate a", "problem", "what", "is integration", "newton", "law",
+        "explai", "n more", "show me", "the solution", "hello", "a", "e", "x",
+    ]
+    for _ in range(3000):
+        prompt = rng.choice(["", " "]).join(rng.choice(pieces) for _ in range(rng.randint(1, 5)))
+        if rng.random() < 0.3:
+            prompt = prompt.upper()
+        assert routed(router, prompt) == legacy_route(prompt), prompt
+
+
+def test_hits_finds_every_overlapping_term():
+    rng = random.Random(1)
+    terms = ["abc", "bcd", "cde", "abcde", "b", "dd", "cdd", "ddc"]
+    router = IntentRouter()
+    for i, term in enumerate(terms):
+        router.register(f"t{i}", [term])
+    for _ in range(2000):
+        text = "".join(rng.choice("abcdex") for _ in range(rng.randint(0, 12)))
+        assert router.hits(text) == {t for t in terms if t in text}, text
+
+
+def test_priority_and_all_of():
+    router = IntentRouter()
+    router.register("low", ["help"], priority=50)
+    router.register("high", ["help me"], priority=5)
+    router.register("both", all_of=["unit", "test"], priority=1)
+    assert router.route("please help") == "low"
+    assert router.route("please help me") == "high"
+    assert router.match("help me").intents == {"low", "high"}
+    assert router.route("unit help") == "low"
+    assert router.route("a test for this unit") == "both"
+    assert router.route("nothing here") is None
+    # equal priority: registration order
+    router.register("later", ["please"], priority=50)
+    assert router.route("please help") == "low"
+
+
+def test_register_recompiles():
+    router = IntentRouter().register("a", ["alpha"])
+    assert router.route("alpha beta") == "a"
+    router.register("b", ["beta"], priority=1)
+    assert router.route("alpha beta") == "b"
+    with pytest.raises(ValueError):
+        router.register("empty")
+
+
+def test_docstring_example():
+    router = IntentRouter()
+    router.register("practice", ["practice problem", "another problem"], priority=10)
+    router.register("explain", ["explain", "what is"], priority=20)
+    router.register("answer:newton", all_of=["newton", "law"])
+    assert router.route("Explain Newton's second law") == "explain"
+    assert repr(router.match("Explain Newton's second law")) == \
+        "RouteMatch(best='explain', intents=['answer:newton', 'explain'])"
@@ -0,0 +1,83 @@
+# tests/test_knowledge_tracing.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from agents.knowledge_tracing import PARAM_NAMES, KnowledgeTracer, Sequences
+from agents.skill_agent import ALL_SKILLS
+
+SKILLS = list(ALL_SKILLS)[:4]
+
+
+def small_log(seed=0, rows=120):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "student_id": rng.choice(["s1", "s2", "s3", "s4", "s5"], rows),
+        # one unknown skill, which every path must skip
+        "skill": rng.choice(SKILLS + ["not_a_skill"], rows),
+        # few distinct times, so file order breaks ties
+        "timestamp": rng.integers(0, 15, rows),
+        "score": rng.choice([0, 1, 0.5, 80], rows),
+    })
+    return df
+
+
+def tracer_with_random_params(seed=0):
+    rng = np.random.default_rng(seed)
+    tracer = KnowledgeTracer(skills=SKILLS)
+    tracer.params = {
+        "p_init": rng.uniform(0.1, 0.9, len(SKILLS)),
+        "p_learn": rng.uniform(0.01, 0.4, len(SKILLS)),
+        "p_slip": rng.uniform(0.01, 0.4, len(SKILLS)),
+        "p_guess": rng.uniform(0.01, 0.4, len(SKILLS)),
+    }
+    return tracer
+
+
+def reference(tracer, df):
+    # one answer at a time per (student, skill), in time then file order
+    ref = KnowledgeTracer(skills=SKILLS)
+    ref.params = {name: tracer.params[name].copy() for name in PARAM_NAMES}
+    pred = np.full(len(df), np.nan)
+    for row in df.assign(row=np.arange(len(df))).sort_values(["timestamp", "row"], kind="stable").itertuples():
+        if row.skill not in ref.index:
+            continue
+        init, _, slip, guess = ref.params_for(row.skill)
+        p = ref.state.get(row.student_id, {}).get(row.skill, init)
+        pred[row.row] = p * (1 - slip) + (1 - p) * guess
+        ref.update(row.student_id, row.skill, row.score)
+    return ref.state, pred
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_flat_sequences_match_a_per_student_loop(seed):
+    df = small_log(seed)
+    tracer = tracer_with_random_params(seed)
+    expected_state, expected_pred = reference(tracer, df)
+
+    got = tracer.trace(df)
+    assert got.keys() == expected_state.keys()
+    for sid, skills in expected_state.items():
+        assert got[sid].keys() == skills.keys()
+        for skill, p in skills.items():
+            assert got[sid][skill] == pytest.approx(p, abs=1e-12)
+    np.testing.assert_allclose(tracer.predict(df), expected_pred, atol=1e-12)
+
+
+def test_sequences_are_longest_first_and_skip_unknown_skills():
+    df = small_log()
+    seq = Sequences(df, SKILLS)
+    assert len(seq) == int(df["skill"].isin(SKILLS).sum())
+    assert list(seq.lengths) == sorted(seq.lengths, reverse=True)
+    assert seq.active[0] == len(seq.lengths)
+
+
+def test_trace_state_continues_with_online_updates():
+    df = small_log(rows=60)
+    tracer = tracer_with_random_params()
+    tracer.trace(df)
+    extra = pd.DataFrame({"student_id": ["s1"], "skill": [SKILLS[0]], "timestamp": [99], "score": [1]})
+    online = tracer.update("s1", SKILLS[0], 1)
+
+    batch = tracer_with_random_params().trace(pd.concat([df, extra], ignore_index=True))
+    assert online == pytest.approx(batch["s1"][SKILLS[0]], abs=1e-12)
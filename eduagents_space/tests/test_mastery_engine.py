@@ -0,0 +1,55 @@
+# tests/test_mastery_engine.py
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agents.cohort import CohortMatrix
+from agents.mastery_engine import aggregate_mastery, timestamp_values
+
+DAY = 86400
+
+
+def test_numeric_timestamps_are_epoch_seconds():
+    now = time.time()
+    secs = timestamp_values(pd.DataFrame({"timestamp": [now, now + 60]}))
+    assert secs == pytest.approx([now, now + 60])
+
+
+def test_numeric_strings_are_epoch_seconds():
+    secs = timestamp_values(pd.DataFrame({"timestamp": ["1700000000", None]}))
+    assert secs[0] == 1_700_000_000
+    assert np.isnan(secs[1])
+
+
+def test_mixed_utc_offsets_are_parsed():
+    secs = timestamp_values(pd.DataFrame({
+        "timestamp": ["2025-01-01T10:00:00Z", "2025-01-01T12:00:00+02:00", "2025-01-01 10:00:00", "not a date"],
+    }))
+    expected = pd.Timestamp("2025-01-01T10:00:00Z").timestamp()
+    assert secs[:3] == pytest.approx([expected] * 3)
+    assert np.isnan(secs[3])
+
+
+def test_datetime_columns():
+    secs = timestamp_values(pd.DataFrame({"timestamp": pd.to_datetime([1_700_000_000, None], unit="s")}))
+    assert secs[0] == 1_700_000_000
+    assert np.isnan(secs[1])
+
+
+def test_last_seen_from_epoch_log():
+    now = time.time()
+    df = pd.DataFrame({"student_id": ["s1", "s1"], "skill": ["algebra"] * 2, "score": [1.0, 0.0], "timestamp": [now - 60, now]})
+    assert aggregate_mastery(df)["last_seen"].iloc[0] == pytest.approx(now)
+
+
+def test_cohort_trend_buckets_epoch_log_like_live_answers():
+    now = time.time()
+    cohort = CohortMatrix()
+    cohort.ingest(pd.DataFrame({"student_id": ["s1"], "skill": ["algebra"], "score": [1.0], "timestamp": [now]}))
+    cohort.record("s2", "algebra", 0.0, now)
+    trend = cohort.trend()
+    assert len(trend) == 1
+    assert trend[0]["bucket_start"] == (now // DAY) * DAY
+    assert trend[0]["answers"] == 2
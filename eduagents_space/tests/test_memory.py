@@ -0,0 +1,109 @@
+# tests/test_memory.py
+import sqlite3
+
+from memory import InMemoryBackend, MemoryBank, SQLiteBackend
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_custom_ttl_survives_reopen(tmp_path):
+    path = str(tmp_path / "memory.db")
+    clock = Clock()
+    bank = MemoryBank(SQLiteBackend(path), ttl=10, clock=clock)
+    long_lived = bank.create({"q": 1}, ttl=1000)
+    short_lived = bank.create({"q": 2})
+    bank.close()
+
+    clock.now += 50
+    reopened = MemoryBank(SQLiteBackend(path), ttl=10, clock=clock)
+    assert reopened.get(short_lived) is None
+    assert reopened.get(long_lived)["data"] == {"q": 1}
+    clock.now += 990
+    assert reopened.get(long_lived) is not None
+    clock.now += 1001
+    assert reopened.get(long_lived) is None
+    reopened.close()
+
+
+def test_in_memory_backend_keeps_custom_ttl():
+    clock = Clock()
+    backend = InMemoryBackend()
+    sid = MemoryBank(backend, ttl=10, clock=clock).create({"q": 1}, ttl=1000)
+    clock.now += 50
+    assert MemoryBank(backend, ttl=10, clock=clock).get(sid) is not None
+
+
+def test_sqlite_file_without_ttl_column_is_migrated(tmp_path):
+    path = str(tmp_path / "old.db")
+    db = sqlite3.connect(path)
+    db.execute('CREATE TABLE sessions (sid TEXT PRIMARY KEY, created_at REAL, touched_at REAL, data TEXT, size INTEGER)')
+    db.execute("INSERT INTO sessions VALUES ('old', 1000.0, 1000.0, '{}', 2)")
+    db.commit()
+    db.close()
+
+    clock = Clock()
+    bank = MemoryBank(SQLiteBackend(path), ttl=10, clock=clock)
+    assert bank.get("old")["data"] == {}
+    clock.now += 11
+    assert bank.get("old") is None
+    sid = bank.create({"q": 1}, ttl=100)
+    bank.close()
+    clock.now += 50
+    assert MemoryBank(SQLiteBackend(path), ttl=10, clock=clock).get(sid) is not None
+
+
+def test_reads_extend_the_ttl_across_restarts(tmp_path):
+    path = str(tmp_path / "memory.db")
+    clock = Clock()
+    bank = MemoryBank(SQLiteBackend(path), ttl=10, clock=clock)
+    read, idle = bank.create({"q": 1}), bank.create({"q": 2})
+    clock.now += 8
+    assert bank.get(read) is not None
+    bank.close()
+
+    clock.now += 7
+    reopened = MemoryBank(SQLiteBackend(path), ttl=10, clock=clock)
+    assert reopened.get(idle) is None
+    assert reopened.get(read)["data"] == {"q": 1}
+    reopened.close()
+
+
+def test_reads_keep_lru_order_across_restarts(tmp_path):
+    path = str(tmp_path / "memory.db")
+    clock = Clock()
+    bank = MemoryBank(SQLiteBackend(path), clock=clock)
+    first, second = bank.create({"q": 1}), bank.create({"q": 2})
+    clock.now += 1
+    bank.get(first)
+    bank.close()
+
+    size = len('{"q": 1}')
+    reopened = MemoryBank(SQLiteBackend(path), max_bytes=2 * size, clock=clock)
+    reopened.create({"q": 3})
+    # second was used least recently, so it goes first
+    assert reopened.get(second) is None
+    assert reopened.get(first) is not None
+    reopened.close()
+
+
+def test_touches_are_written_in_batches(tmp_path, monkeypatch):
+    import memory
+
+    monkeypatch.setattr(memory, "TOUCH_BATCH", 3)
+    backend = SQLiteBackend(str(tmp_path / "memory.db"))
+    clock = Clock()
+    bank = MemoryBank(backend, ttl=100, clock=clock)
+    sids = [bank.create({"q": i}) for i in range(3)]
+    clock.now += 1
+    for sid in sids[:2]:
+        bank.get(sid)
+    assert {sid: t for sid, t, _, _ in backend.scan()} == dict.fromkeys(sids, 1000.0)
+    bank.get(sids[2])
+    assert {sid: t for sid, t, _, _ in backend.scan()} == dict.fromkeys(sids, 1001.0)
+    bank.close()
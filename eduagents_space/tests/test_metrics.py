@@ -0,0 +1,115 @@
+# tests/test_metrics.py
+import threading
+import time
+
+import pytest
+
+from agents import metrics
+from agents.metrics import BUCKETS, Metrics, SamplingProfiler
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_counters_in_prometheus_text():
+    m = Metrics(enabled=True)
+    m.inc("llm_cache_total", result="hit")
+    m.inc("llm_cache_total", 2, result="miss")
+    m.inc("llm_cache_total", result="hit")
+    m.inc("requests_total", 1234567)
+    assert m.prometheus() == (
+        "# TYPE eduagents_llm_cache_total counter\n"
+        'eduagents_llm_cache_total{result="hit"} 2\n'
+        'eduagents_llm_cache_total{result="miss"} 2\n'
+        "# TYPE eduagents_requests_total counter\n"
+        "eduagents_requests_total 1234567\n"
+    )
+
+
+def test_histograms_in_prometheus_text():
+    m = Metrics(enabled=True)
+    # a value equal to a bound falls in that bucket (le = less or equal)
+    for seconds in (0.001, 0.003, 0.003, 7.0):
+        m.observe("recommend_seconds", seconds, stage="prompts")
+    lines = m.prometheus().splitlines()
+    assert lines[0] == "# TYPE eduagents_recommend_seconds histogram"
+    buckets = {line.split('le="')[1].split('"')[0]: int(line.rsplit(" ", 1)[1]) for line in lines[1:-2]}
+    assert list(buckets) == [f"{b:g}" for b in BUCKETS] + ["+Inf"]
+    assert buckets["0.0005"] == 0
+    assert buckets["0.001"] == 1
+    assert buckets["0.0025"] == 1
+    assert buckets["0.005"] == 3
+    assert buckets["5"] == 3
+    assert buckets["+Inf"] == 4
+    assert lines[1] == 'eduagents_recommend_seconds_bucket{stage="prompts",le="0.0001"} 0'
+    assert lines[-2] == 'eduagents_recommend_seconds_sum{stage="prompts"} 7.007'
+    assert lines[-1] == 'eduagents_recommend_seconds_count{stage="prompts"} 4'
+
+
+def test_label_values_are_escaped():
+    m = Metrics(enabled=True)
+    m.inc("api_requests_total", path='/a"b\\c\nd')
+    assert m.prometheus().splitlines()[1] == 'eduagents_api_requests_total{path="/a\\"b\\\\c\\nd"} 1'
+
+
+def test_span_and_timed_record_elapsed_time(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(metrics.time, "perf_counter", clock)
+    m = Metrics(enabled=True)
+    with m.span("api_request_seconds", path="/chat"):
+        clock.now += 0.25
+    with pytest.raises(RuntimeError):
+        with m.span("api_request_seconds", path="/chat"):
+            clock.now += 0.75
+            raise RuntimeError
+
+    @m.timed("memory_bank_seconds", op="get")
+    def get():
+        clock.now += 0.5
+        raise KeyError
+
+    with pytest.raises(KeyError):
+        get()
+    assert m.snapshot()["timers"] == {
+        'api_request_seconds{path="/chat"}': {"count": 2, "sum": 1.0, "mean": 0.5, "max": 0.75},
+        'memory_bank_seconds{op="get"}': {"count": 1, "sum": 0.5, "mean": 0.5, "max": 0.5},
+    }
+
+
+def test_disabled_metrics_record_nothing():
+    m = Metrics()
+    m.inc("requests_total")
+    m.observe("recommend_seconds", 1.0)
+    with m.span("api_request_seconds"):
+        pass
+    m.timed("memory_bank_seconds")(lambda: None)()
+    assert m.snapshot() == {"counters": {}, "timers": {}}
+    assert m.prometheus() == "\n"
+
+
+def busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampling_profiler_sees_a_busy_thread():
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_loop, args=(stop,))
+    worker.start()
+    try:
+        with SamplingProfiler(interval=0.001) as prof:
+            deadline = time.time() + 5
+            while prof.samples < 20 and time.time() < deadline:
+                time.sleep(0.01)
+    finally:
+        stop.set()
+        worker.join()
+    assert prof.samples >= 20
+    assert any(stack.endswith("test_metrics.py:busy_loop") for stack in prof.stacks)
+    assert "test_metrics.py:busy_loop" in dict(prof.top(50))
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in prof.folded().splitlines())
@@ -0,0 +1,80 @@
+# tests/test_packed_bank.py
+import random
+
+import pytest
+
+from agents.catalog import ContentCatalog
+from agents.given_problems import GivenProblems
+from agents.packed_bank import PackedCatalog, PackedProblemBank, build_from_catalog, pack_info, write_pack
+from agents.problem_bank import FALLBACK_PROBLEM, Problem, ProblemBank
+from agents.skill_agent import ALL_SKILLS
+
+
+@pytest.fixture
+def packed(tmp_path):
+    catalog = ContentCatalog()
+    path = str(tmp_path / "content.pack")
+    build_from_catalog(path, catalog)
+    pack = PackedCatalog(path)
+    yield catalog, pack
+    pack.pack.close()
+
+
+def test_round_trip_keeps_every_lookup(packed):
+    catalog, pack = packed
+    bank, unpacked = catalog.problem_bank, pack.problem_bank
+    assert len(unpacked) == len(bank)
+    assert unpacked.problems == bank.problems
+    assert unpacked.keys() == bank.keys()
+    for key in bank.keys():
+        assert key in unpacked
+        assert unpacked.pool(key) == bank.pool(key)
+        for pos, p in enumerate(bank.pool(key)):
+            assert unpacked.position(key, (p.question, p.hint)) == pos
+    assert "No|such topic" not in unpacked
+    assert unpacked.pool("No|such topic") == bank.pool("No|such topic")
+    assert unpacked.position("No|such topic", FALLBACK_PROBLEM) == 0
+    for skill in {p.skill for p in bank.problems} | {"unknown"}:
+        assert unpacked.for_skill(skill) == bank.for_skill(skill)
+
+    assert dict(pack.explanations) == catalog.content.explanations
+    for skill in list(ALL_SKILLS) + ["Fractions and decimals", "unknown skill"]:
+        assert pack.sample_for_skill(skill) == catalog.sample_for_skill(skill)
+        assert pack.explanation(None, skill) == catalog.explanation(None, skill)
+
+    info = pack_info(pack.path)
+    assert (info["problems"], info["pools"]) == (len(bank), len(bank.keys()))
+
+
+def test_draws_match_the_json_catalog(packed):
+    catalog, pack = packed
+    for key in catalog.problem_bank.keys() + ["No|such topic"]:
+        a, b = random.Random(key), random.Random(key)
+        given_json, given_pack = GivenProblems(window=3), GivenProblems(window=3)
+        for _ in range(2 * len(catalog.problem_bank.pool(key)) + 1):
+            assert given_pack.draw(pack.problem_bank, key, b) == given_json.draw(catalog.problem_bank, key, a)
+            assert given_pack.masks == given_json.masks
+
+
+def test_difficulty_groups(tmp_path):
+    bank = ProblemBank([
+        Problem(0, "Math|algebra", "q0", "h0", "algebra", "Easy"),
+        Problem(1, "Math|algebra", "q1", "h1", "algebra", None),
+        Problem(2, "Math|geometry", "q2", "h2", "geometry", "Hard"),
+        Problem(3, "Math|algebra", "q3", "h3", "algebra", "Easy"),
+        Problem(4, "Math|algebra", "q4", "h4", "algebra", "Hard"),
+    ])
+    path = str(tmp_path / "small.pack")
+    write_pack(path, bank)
+    unpacked = PackedProblemBank(path)
+    for skill in ("algebra", "geometry", "optics"):
+        for difficulty in (None, "Easy", "Hard", "Medium"):
+            assert unpacked.for_skill(skill, difficulty) == bank.for_skill(skill, difficulty)
+    unpacked.pack.close()
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not.pack"
+    path.write_bytes(b"{}" * 16)
+    with pytest.raises(ValueError):
+        PackedProblemBank(str(path))
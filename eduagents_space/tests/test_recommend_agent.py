@@ -0,0 +1,48 @@
+# tests/test_recommend_agent.py
+import random
+
+import pytest
+
+from agents.recommend_agent import CandidateIndex, mastery_to_difficulty
+from agents.skill_agent import ALL_SKILLS, SKILL_CATALOG
+
+
+def reference(estimates, top_k, subject=None, difficulty=None):
+    # the plain sort select() replaced
+    allowed = set(SKILL_CATALOG.get(subject, ())) if subject else None
+    rows = sorted(estimates.items(), key=lambda x: x[1])
+    rows = [(s, m) for s, m in rows if allowed is None or s in allowed]
+    rows = [(s, m) for s, m in rows if difficulty is None or mastery_to_difficulty(m) == difficulty]
+    return [(s, m, mastery_to_difficulty(m)) for s, m in rows[:top_k]]
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("difficulty", [None, "Easy", "Medium"])
+def test_select_matches_sorting_with_ties(seed, difficulty):
+    rng = random.Random(seed)
+    skills = list(ALL_SKILLS)
+    rng.shuffle(skills)
+    # few distinct values, so most subjects have ties
+    estimates = {s: rng.choice([0.1, 0.2, 0.45, 0.65]) for s in skills}
+    index = CandidateIndex()
+    for subject in SKILL_CATALOG:
+        for k in (1, 2, 5):
+            assert index.select(estimates, k, subject, difficulty) == reference(estimates, k, subject, difficulty)
+    assert index.select(estimates, 5, None, difficulty) == reference(estimates, 5, None, difficulty)
+
+
+def test_difficulty_bounds_match_mastery_to_difficulty():
+    from agents.cohort import WEAK_BELOW
+    from agents.recommend_agent import DIFFICULTY_BOUNDS, EASY_BELOW, MEDIUM_BELOW
+
+    for m in [i / 100 for i in range(-10, 111)] + [EASY_BELOW, MEDIUM_BELOW]:
+        (bucket,) = [name for name, (low, high) in DIFFICULTY_BOUNDS.items() if low <= m < high]
+        assert bucket == mastery_to_difficulty(m)
+    assert WEAK_BELOW == DIFFICULTY_BOUNDS["Easy"][1]
+
+
+def test_select_with_default_estimates():
+    # every skill ties at the default: estimates order, like the old sort
+    estimates = dict.fromkeys(reversed(ALL_SKILLS), 0.65)
+    got = CandidateIndex().select(estimates, 3, "Physics")
+    assert [s for s, _, _ in got] == [s for s in estimates if s in SKILL_CATALOG["Physics"]][:3]
@@ -0,0 +1,52 @@
+# tests/test_response_cache.py
+from agents.llm_agent import LLMAgent
+from agents.response_cache import ResponseCache, cache_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_hits_misses_and_lru_eviction():
+    cache = ResponseCache(max_entries=2)
+    assert cache.get("a") is None
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"  # a is now the most recently used
+    cache.put("c", "C")
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("A", "C")
+    assert cache.stats() == {
+        "size": 2, "hits": 3, "misses": 2, "bypasses": 0, "evictions": 1, "hit_rate": 0.6,
+    }
+
+
+def test_ttl_expiry_counts_as_a_miss():
+    clock = Clock()
+    cache = ResponseCache(ttl=10, clock=clock)
+    cache.put("a", "A")
+    clock.now = 9
+    assert cache.get("a") == "A"
+    clock.now = 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_keys_normalize_whitespace_and_case_but_not_fields():
+    assert cache_key("  Explain   Fractions ", {"topic": "x"}) == cache_key("explain fractions", {"topic": "x"})
+    assert cache_key("explain fractions", {"topic": "x"}) != cache_key("explain fractions", {"topic": "y"})
+
+
+def test_bypasses_are_counted_from_batch_threads():
+    agent = LLMAgent()
+    prompts = ["Give me a practice problem"] * 40 + ["Explain fractions"] * 40
+    contexts = [{"session_id": f"s{i}", "given_problems": None} for i in range(len(prompts))]
+    agent.generate_batch(prompts, contexts, max_concurrency=8)
+    stats = agent.cache.stats()
+    assert stats["bypasses"] == 40
+    assert stats["hits"] + stats["misses"] == 40
@@ -0,0 +1,53 @@
+# tests/test_retrieval.py
+import pytest
+
+from agents.llm_agent import LLMAgent
+
+
+@pytest.fixture(scope="module")
+def retriever():
+    return LLMAgent().retriever
+
+
+@pytest.mark.parametrize("subject,topic,expected", [
+    ("Mathematics", "fraction", "Math|fractions"),
+    ("Math", "fracton", "Math|fractions"),
+    ("Physics", "motion", "Physics|mechanics"),
+    (None, "motion", "Physics|mechanics"),
+    ("Biology", "genes", "Biology|genetics"),
+])
+def test_resolve_pool_finds_close_topics(retriever, subject, topic, expected):
+    assert retriever.resolve_pool(subject, topic) == expected
+
+
+@pytest.mark.parametrize("subject,topic", [
+    ("Mathematics", "Trigonometry"),
+    ("Mathematics", "Integration"),
+    ("Chemistry", "Electrolysis"),
+    (None, "optics"),
+])
+def test_resolve_pool_rejects_topics_not_in_catalog(retriever, subject, topic):
+    assert retriever.resolve_pool(subject, topic) is None
+
+
+@pytest.mark.parametrize("topic,expected", [
+    ("integrals", "integration"),
+    ("derivatives", "calculus"),
+    ("biologi", "biology"),
+    ("motion", "mechanics"),
+])
+def test_resolve_explanation_finds_close_topics(retriever, topic, expected):
+    assert retriever.resolve_explanation(None, topic) == expected
+
+
+@pytest.mark.parametrize("topic", ["trigonometry", "electrolysis"])
+def test_resolve_explanation_rejects_topics_not_in_catalog(retriever, topic):
+    assert retriever.resolve_explanation(None, topic) is None
+
+
+def test_unknown_topic_gets_generic_practice_problem():
+    text = LLMAgent().generate(
+        "Give practice problem for Trigonometry",
+        context={"subject": "Mathematics", "topic": "Trigonometry"},
+    )["text"]
+    assert "1/2 + 3/4" not in text
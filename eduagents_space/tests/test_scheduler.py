@@ -0,0 +1,83 @@
+# tests/test_scheduler.py
+import random
+
+import pytest
+
+from agents.recommend_agent import mastery_to_difficulty
+from agents.scheduler import DAY, LEITNER_INTERVALS, ReviewScheduler
+from agents.skill_agent import ALL_SKILLS, SKILL_CATALOG, SKILL_SUBJECT
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_sm2_intervals():
+    clock = Clock()
+    sched = ReviewScheduler(clock=clock)
+    intervals = [sched.record("s1", "algebra", 1.0).interval for _ in range(4)]
+    # 1 day, 6 days, then times the ease (2.5 + 0.1 per perfect answer)
+    assert intervals == [1.0, 6.0, 16.2, round(16.2 * 2.8, 2)]
+    item = sched.record("s1", "algebra", 0.2)
+    assert (item.interval, item.reps) == (1.0, 0)
+    assert item.due == clock.now + DAY
+    assert item.ease >= 1.3
+
+
+def test_leitner_boxes():
+    sched = ReviewScheduler(mode="leitner", clock=Clock())
+    boxes = [(i.box, i.interval) for i in (sched.record("s1", "motion", 1.0) for _ in range(8))]
+    assert boxes[:3] == [(1, 2.0), (2, 4.0), (3, 8.0)]
+    assert boxes[-1] == (len(LEITNER_INTERVALS) - 1, float(LEITNER_INTERVALS[-1]))
+    item = sched.record("s1", "motion", 0.5)
+    assert (item.box, item.interval) == (0, float(LEITNER_INTERVALS[0]))
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        ReviewScheduler(mode="fsrs")
+
+
+def reference(sched, sid, now, k, subject, difficulty):
+    rows = [
+        i for i in sched.items(sid)
+        if i.due <= now
+        and (not subject or SKILL_SUBJECT.get(i.skill) == subject)
+        and (not difficulty or mastery_to_difficulty(i.mastery) == difficulty)
+    ]
+    return [i.skill for i in sorted(rows, key=lambda i: i.mastery)[:k]]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_filtered_due_matches_sorting(seed):
+    rng = random.Random(seed)
+    clock = Clock()
+    sched = ReviewScheduler(clock=clock)
+    sched.seed("s1", {s: rng.random() for s in ALL_SKILLS})
+    # Some skills move to the future queue, others get new masteries while due
+    for skill in rng.sample(ALL_SKILLS, 20):
+        sched.record("s1", skill, rng.random())
+    sched.seed("s1", {s: rng.random() for s in rng.sample(ALL_SKILLS, 15)})
+    clock.now += rng.choice([0, 1.5 * DAY])
+
+    for subject in [None, *SKILL_CATALOG]:
+        for difficulty in (None, "Easy", "Medium", "Hard"):
+            for k in (1, 3, 8):
+                got = [d.skill for d in sched.due("s1", k, subject, difficulty)]
+                assert got == reference(sched, "s1", clock.now, k, subject, difficulty)
+    # due() doesn't consume anything
+    assert sched.due("s1", 5) == sched.due("s1", 5)
+
+
+def test_due_skips_stale_entries_and_keeps_heaps_bounded():
+    sched = ReviewScheduler(clock=Clock())
+    sched.seed("s1", {"algebra": 0.1, "geometry": 0.5, "motion": 0.9})
+    for step in range(500):
+        sched.seed("s1", {"algebra": 0.1 + step / 10000})
+    assert [d.skill for d in sched.due("s1", 5, "Mathematics")][:1] == ["algebra"]
+    schedule = sched._students["s1"]
+    assert sum(map(len, schedule.heaps())) <= 2 * len(schedule.items) + 64
@@ -0,0 +1,55 @@
+# tests/test_server.py
+import asyncio
+
+import pytest
+
+import handlers
+import server
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_answer_and_chat_with_one_worker():
+    sid = run(server.new_session({}))["session_id"]
+    assert "Recorded" in run(server.answer({"session_id": sid, "skill": "algebra", "score": 1}))["text"]
+    assert run(server.chat({"session_id": sid, "message": "Explain fractions"}))["text"]
+
+
+def test_per_process_endpoints_refused_with_shared_sessions(tmp_path, monkeypatch):
+    shared = server.SharedSessions(str(tmp_path / "sessions.db"))
+    monkeypatch.setattr(server, "_shared", shared)
+    try:
+        sid = run(server.new_session({}))["session_id"]
+        # Shared state is read and written from executor threads
+        run(server.set_topic({"session_id": sid, "subject": "Math", "topic": "fractions"}))
+        assert "fractions" in run(server.practice({"session_id": sid, "skill": "fractions"}))["text"]
+        for route in (server.answer, server.cohort):
+            with pytest.raises(server.HTTPError) as err:
+                run(route({"session_id": sid, "skill": "algebra", "score": 1}))
+            assert err.value.status == 409
+    finally:
+        shared.close()
+
+
+def test_shutdown_closes_the_backend_on_its_own_loop(monkeypatch):
+    from agents.backends import LLMBackend
+
+    class Backend(LLMBackend):
+        async def complete(self, prompt, max_tokens=200, context=None):
+            return prompt
+
+        async def aclose(self):
+            closed_on.append(asyncio.get_running_loop())
+
+    closed_on = []
+    a = handlers.Agents()
+    a.llm.backend = backend = Backend()
+    monkeypatch.setattr(handlers, "_agents", a)
+    assert backend.complete_sync("ping") == "ping"
+    loop = backend.loop
+
+    run(server.TutorAPI().shutdown())
+    assert closed_on == [loop]
+    assert loop.is_closed()
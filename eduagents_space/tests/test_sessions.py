@@ -0,0 +1,89 @@
+# tests/test_sessions.py
+import pytest
+
+import handlers
+from agents.scheduler import ReviewScheduler
+from agents.session import SessionPool
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.delenv("EDUAGENTS_EVENT_LOG", raising=False)
+    a = handlers.Agents()
+    clock = Clock()
+    a.llm.sessions.clock = clock
+    a.llm.sessions.ttl = 100
+    a.llm.sessions.max_sessions = 3
+    monkeypatch.setattr(handlers, "_agents", a)
+    return a, clock
+
+
+def test_pool_reports_every_removed_session():
+    removed = []
+    clock = Clock()
+    pool = SessionPool(max_sessions=2, ttl=10, clock=clock, on_evict=removed.append)
+    for sid in ("a", "b", "c"):
+        pool.get(sid)
+    assert removed == ["a"]  # LRU
+    clock.now = 20
+    pool.get("d")
+    assert removed == ["a", "b", "c"]  # TTL
+    pool.drop("d")
+    assert removed[-1] == "d"
+
+
+def test_lru_eviction_releases_schedule_but_keeps_mastery(app):
+    a, _ = app
+    states = [handlers.init_state() for _ in range(4)]
+    for state in states:
+        handlers.submit_answer("algebra", 1.0, state)
+    first = handlers.session_id(states[0])
+    assert first not in a.scheduler
+    assert len(a.scheduler) == 3
+    assert a.skill.store.stats(first, "algebra").count == 1
+    assert len(a.skill.store) == 4
+
+
+def test_ttl_eviction_releases_schedule_but_keeps_mastery(app):
+    a, clock = app
+    old, new = handlers.init_state(), handlers.init_state()
+    handlers.submit_answer("algebra", 1.0, old)
+    clock.now = 500
+    handlers.submit_answer("algebra", 0.0, new)
+    assert handlers.session_id(old) not in a.scheduler
+    assert handlers.session_id(old) in a.skill.store
+    assert handlers.session_id(new) in a.scheduler
+
+
+def test_answers_keep_the_session_alive(app):
+    a, clock = app
+    state = handlers.init_state()
+    for step in range(5):
+        clock.now = step * 90
+        handlers.submit_answer("algebra", 1.0, state)
+    assert a.skill.store.stats(handlers.session_id(state), "algebra").count == 5
+
+
+def test_scheduler_forget():
+    scheduler = ReviewScheduler()
+    scheduler.seed("s1", {"algebra": 0.2})
+    scheduler.forget("s1")
+    scheduler.forget("unknown")
+    assert "s1" not in scheduler
+
+
+def test_recommendations_fall_back_when_nothing_is_due(app):
+    a, _ = app
+    state = handlers.init_state()
+    for skill in a.skill.estimate_for_student(handlers.session_id(state)):
+        handlers.submit_answer(skill, 1.0, state)
+    assert a.scheduler.due(handlers.session_id(state), 5) == []
+    assert len(handlers.recommendation_cards(None, None, state, top_k=3)) == 3